@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+note自動投稿システム - 記事データ管理ツール
+記事ストレージの変換（JSON ⇔ SQLite）、記事の一括インポート/エクスポート、記事の版の圧縮保存、投稿履歴の集計、LLM応答キャッシュ・準備済み記事キューの管理、負荷試験用のフェイクLLMサーバーなどのメンテナンス操作
+"""
+
+import argparse
+import itertools
+import sys
+from datetime import datetime, timedelta
+
+# パスを追加
+sys.path.append('src')
+
+from modules.contents.article_io import IMPORT_FORMATS, iter_import_articles, write_jsonl_articles
+from modules.contents.article_storage import create_storage, convert_storage
+from modules.contents.data_manager import DataManager
+from modules.contents.fake_llm import FakeLLMBackend
+from modules.contents.fake_llm_server import DEFAULT_HOST, DEFAULT_PORT, FakeLLMServer
+from modules.contents.llm_cache import LLMResponseCache, get_llm_cache
+from modules.contents.posting_ledger import DEFAULT_LEDGER_PATH, PostingLedger
+from modules.contents.ready_queue import DEFAULT_READY_QUEUE_DIR, ReadyQueue
+
+
+def command_convert(args) -> bool:
+    """記事ストレージの変換（インポート/エクスポート）"""
+    source = create_storage(args.source, args.source_backend)
+    destination = create_storage(args.destination, args.destination_backend)
+    
+    try:
+        count = convert_storage(source, destination)
+        print(f"✅ {count}件の記事を変換しました: {source.path} ({source.backend_name}) → {destination.path} ({destination.backend_name})")
+        return True
+    except Exception as e:
+        print(f"❌ 記事データの変換エラー: {e}")
+        return False
+    finally:
+        source.close()
+        destination.close()
+
+
+def command_compact(args) -> bool:
+    """ジャーナルをスナップショットに畳み込む"""
+    data_manager = DataManager(args.path, backend="journal")
+    return data_manager.compact_storage()
+
+
+def command_import(args) -> bool:
+    """JSONL / CSV / Markdownフォルダから記事を一括追加"""
+    storage = create_storage(args.data, args.backend)
+    if not storage.exists():
+        storage.save_all({"articles": [], "settings": {}})
+        print(f"📁 記事データを新規作成しました: {storage.path}")
+    
+    data_manager = DataManager(storage=storage)
+    try:
+        result = data_manager.add_articles(iter_import_articles(args.source, args.format),
+                                           allow_duplicate=args.allow_duplicates)
+        return result is not None
+    except Exception as e:
+        print(f"❌ 記事のインポートエラー: {e}")
+        return False
+    finally:
+        storage.close()
+
+
+def command_export(args) -> bool:
+    """記事をJSONLに書き出し"""
+    data_manager = DataManager(args.data, backend=args.backend, lazy=True)
+    try:
+        status = None if args.status == "all" else args.status
+        count = write_jsonl_articles(args.destination, data_manager.find_articles(status=status))
+        print(f"✅ {count}件の記事を書き出しました: {args.destination}")
+        return True
+    except Exception as e:
+        print(f"❌ 記事のエクスポートエラー: {e}")
+        return False
+    finally:
+        data_manager.storage.close()
+
+
+def command_blobs(args) -> bool:
+    """記事の版の圧縮ブロブストアの状況表示（--trainで記事本文から共有辞書を学習）"""
+    data_manager = DataManager(args.data, backend=args.backend, lazy=True)
+    try:
+        blob_store = data_manager.get_blob_store()
+        if args.train:
+            samples = (article['content'] for article in data_manager.find_articles(status=None))
+            dictionary_id = blob_store.train_dictionary(itertools.islice(samples, args.samples))
+            if not dictionary_id:
+                return False
+            print(f"✅ 共有辞書を学習しました: {dictionary_id}（以後の書き込みに使用）")
+        
+        stats = blob_store.stats()
+        ratio = stats["stored_bytes"] / stats["raw_bytes"] if stats["raw_bytes"] else 0
+        print(f"📦 {blob_store.directory}: {stats['blobs']}件 {stats['raw_bytes']} → {stats['stored_bytes']}バイト"
+              f"（{ratio:.0%}、{stats['codec']}、辞書: {stats['dictionary'] or 'なし'}）")
+        return True
+    except Exception as e:
+        print(f"❌ ブロブストアの処理エラー: {e}")
+        return False
+    finally:
+        data_manager.storage.close()
+
+
+def parse_since(value: str) -> datetime:
+    """集計開始日時の指定（YYYY-MM-DD[THH:MM:SS] または 7d / 24h のような相対指定）"""
+    units = {"d": "days", "h": "hours", "m": "minutes"}
+    if value[-1:] in units and value[:-1].isdigit():
+        return datetime.now() - timedelta(**{units[value[-1]]: int(value[:-1])})
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日時の形式が正しくありません: {value}")
+
+
+def _format_seconds(value) -> str:
+    return "-" if value is None else f"{value:.1f}s"
+
+
+def command_ledger(args) -> bool:
+    """投稿履歴のスループット・工程ごとの所要時間（p50/p95）を表示"""
+    summary = PostingLedger(args.path).summarize(since=args.since, source=args.source)
+    if not summary["runs"]:
+        print(f"📭 投稿履歴がありません: {args.path}")
+        return True
+    
+    print(f"📊 投稿履歴: {summary['first_started_at']} 〜 {summary['last_finished_at']}")
+    print(f"   投稿数: {summary['runs']}件（成功 {summary['succeeded']} / 失敗 {summary['failed']}、"
+          f"成功率 {summary['success_rate']:.0%}）")
+    print(f"   スループット: {summary['posts_per_day']:.1f}件/日")
+    tokens = summary["tokens"]
+    print(f"   トークン: 入力 {tokens['input_tokens']}（うちキャッシュ {tokens['cached_input_tokens']}）"
+          f" / 出力 {tokens['output_tokens']}")
+    
+    print(f"\n{'stage':<12}{'count':>6}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}")
+    rows = list(summary["stages"].items()) + [("total", summary["total"])]
+    if summary["ttft"]["count"]:
+        rows.append(("ttft", summary["ttft"]))
+    for stage, stats in rows:
+        print(f"{stage:<12}{stats['count']:>6}{_format_seconds(stats['mean']):>10}{_format_seconds(stats['p50']):>10}"
+              f"{_format_seconds(stats['p95']):>10}{_format_seconds(stats['max']):>10}")
+    
+    speed = summary["tokens_per_second"]
+    if speed["count"]:
+        print(f"\n⚡ 生成速度: p50 {speed['p50']:.1f} / p95 {speed['p95']:.1f} tokens/秒")
+    
+    if summary["errors"]:
+        print("\n❌ 失敗の内訳:")
+        for error, count in sorted(summary["errors"].items(), key=lambda item: item[1], reverse=True):
+            print(f"   {count}件: {error}")
+    return True
+
+
+def command_llm_cache(args) -> bool:
+    """LLM応答キャッシュの状況表示・削除"""
+    cache = LLMResponseCache(args.path) if args.path else get_llm_cache()
+    if cache is None:
+        print("⚠️ LLM応答キャッシュは無効です（llm_config.json の llm_cache.enabled）")
+        return True
+    
+    try:
+        if args.clear:
+            print(f"🗑️ {cache.clear()}件のキャッシュを削除しました: {cache.path}")
+            return True
+        
+        stats = cache.stats()
+        print(f"💾 LLM応答キャッシュ: {cache.path}")
+        print(f"   件数: {stats['entries']}件（{', '.join(f'{name} {count}件' for name, count in stats['providers'].items()) or '-'}）")
+        print(f"   サイズ: {stats['size_bytes'] / 1024 / 1024:.1f}MB / 上限 {stats['max_size_bytes'] / 1024 / 1024:.0f}MB")
+        print(f"   有効期限: {stats['ttl_hours']:g}時間")
+        return True
+    except Exception as e:
+        print(f"❌ LLM応答キャッシュの操作エラー: {e}")
+        return False
+    finally:
+        cache.close()
+
+
+def command_ready_queue(args) -> bool:
+    """準備済み記事キューの一覧表示"""
+    queue = ReadyQueue(args.path)
+    items = queue.items()
+    print(f"📦 準備済み記事キュー: {len(items)}件 ({args.path})")
+    for item in items:
+        stages = item.get('stages', {})
+        print(f"   {item.get('prepared_at')}  {item.get('title')}  "
+              f"({len(item.get('content', ''))}文字, 編集: {item.get('editor') or '-'}, "
+              f"準備 {sum(stages.values()):.1f}s)")
+    return True
+
+
+def command_fake_llm_server(args) -> bool:
+    """OpenAI / Anthropic APIの形で応答するフェイクLLMサーバーを起動"""
+    backend = FakeLLMBackend(args.seed, args.latency, args.tokens_per_second, args.error_rate)
+    try:
+        server = FakeLLMServer(backend, args.host, args.port)
+    except OSError as e:
+        print(f"❌ フェイクLLMサーバーを起動できません: {e}")
+        return False
+    server.serve_forever()
+    return True
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """コマンドライン引数の定義"""
+    parser = argparse.ArgumentParser(description="note自動投稿システム 記事データ管理ツール")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    convert_parser = subparsers.add_parser("convert", help="記事ストレージを変換（例: data/articles.json → data/articles.db）")
+    convert_parser.add_argument("source", help="変換元のパス")
+    convert_parser.add_argument("destination", help="変換先のパス")
+    convert_parser.add_argument("--source-backend", choices=["json", "journal", "sqlite"], help="変換元のバックエンド（省略時は拡張子から判定）")
+    convert_parser.add_argument("--destination-backend", choices=["json", "journal", "sqlite"], help="変換先のバックエンド（省略時は拡張子から判定）")
+    convert_parser.set_defaults(handler=command_convert)
+    
+    compact_parser = subparsers.add_parser("compact", help="ジャーナルをスナップショットに畳み込む")
+    compact_parser.add_argument("path", nargs="?", default="data/articles.json", help="スナップショットのパス")
+    compact_parser.set_defaults(handler=command_compact)
+    
+    import_parser = subparsers.add_parser("import", help="JSONL / CSV / Markdownフォルダから記事を一括追加")
+    import_parser.add_argument("source", help="入力ファイル（.jsonl, .csv）またはMarkdownフォルダのパス")
+    import_parser.add_argument("--format", choices=IMPORT_FORMATS, help="入力形式（省略時はパスから判定）")
+    import_parser.add_argument("--data", default="data/articles.json", help="追加先の記事データのパス")
+    import_parser.add_argument("--backend", choices=["json", "journal", "sqlite"], help="追加先のバックエンド（省略時は拡張子から判定）")
+    import_parser.add_argument("--allow-duplicates", action="store_true", help="同じ本文の記事があっても追加する")
+    import_parser.set_defaults(handler=command_import)
+    
+    export_parser = subparsers.add_parser("export", help="記事をJSONLに書き出し")
+    export_parser.add_argument("destination", help="出力ファイル（.jsonl）のパス")
+    export_parser.add_argument("--data", default="data/articles.json", help="記事データのパス")
+    export_parser.add_argument("--backend", choices=["json", "journal", "sqlite"], help="記事データのバックエンド（省略時は拡張子から判定）")
+    export_parser.add_argument("--status", default="all", help="書き出す記事のステータス（allで全件）")
+    export_parser.set_defaults(handler=command_export)
+    
+    blobs_parser = subparsers.add_parser("blobs", help="記事の版の圧縮ブロブストアの状況表示・共有辞書の学習")
+    blobs_parser.add_argument("--data", default="data/articles.json", help="記事データのパス")
+    blobs_parser.add_argument("--backend", choices=["json", "journal", "sqlite"], help="記事データのバックエンド（省略時は拡張子から判定）")
+    blobs_parser.add_argument("--train", action="store_true", help="記事本文から圧縮用の共有辞書を学習する")
+    blobs_parser.add_argument("--samples", type=int, default=1000, help="辞書の学習に使う記事数")
+    blobs_parser.set_defaults(handler=command_blobs)
+    
+    ledger_parser = subparsers.add_parser("ledger", help="投稿履歴のスループット・所要時間（p50/p95）を集計")
+    ledger_parser.add_argument("--path", default=DEFAULT_LEDGER_PATH, help="投稿履歴のパス")
+    ledger_parser.add_argument("--since", type=parse_since, help="集計開始日時（YYYY-MM-DD または 7d / 24h）")
+    ledger_parser.add_argument("--source", help="投稿処理の種類で絞り込み（full_auto, auto_posting）")
+    ledger_parser.set_defaults(handler=command_ledger)
+    
+    cache_parser = subparsers.add_parser("llm-cache", help="LLM応答キャッシュの状況表示・削除")
+    cache_parser.add_argument("--path", help="キャッシュのパス（省略時は llm_config.json の設定）")
+    cache_parser.add_argument("--clear", action="store_true", help="キャッシュを全て削除する")
+    cache_parser.set_defaults(handler=command_llm_cache)
+    
+    queue_parser = subparsers.add_parser("ready-queue", help="準備済み記事キューの一覧表示")
+    queue_parser.add_argument("--path", default=DEFAULT_READY_QUEUE_DIR, help="キューのディレクトリ")
+    queue_parser.set_defaults(handler=command_ready_queue)
+    
+    fake_parser = subparsers.add_parser("fake-llm-server", help="負荷試験用にOpenAI / Anthropic APIの形で応答するフェイクLLMサーバーを起動")
+    fake_parser.add_argument("--host", default=DEFAULT_HOST, help="待ち受けるアドレス")
+    fake_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="待ち受けるポート")
+    fake_parser.add_argument("--seed", type=int, default=42, help="応答を決める乱数のシード")
+    fake_parser.add_argument("--latency", type=float, default=0.5, help="最初のトークンまでの秒数")
+    fake_parser.add_argument("--tokens-per-second", type=float, default=150, help="生成速度（0なら待たない）")
+    fake_parser.add_argument("--error-rate", type=float, default=0.0, help="APIエラー（429 / 500）を返す割合（0〜1）")
+    fake_parser.set_defaults(handler=command_fake_llm_server)
+    
+    return parser
+
+
+def main():
+    """メイン関数"""
+    args = build_parser().parse_args()
+    success = args.handler(args)
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
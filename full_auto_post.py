@@ -4,6 +4,7 @@ note自動投稿システム - 完全自動実行スクリプト
 記事生成 → 校閲 → 投稿まで完全自動化
 """
 
+import argparse
 import sys
 import os
 import time
@@ -35,86 +36,161 @@ def print_warning(text):
     """警告メッセージ"""
     print(f"\033[1;31m⚠️  {text}\033[0m")
 
-def auto_generate_and_post():
-    """完全自動記事生成・投稿"""
+DEFAULT_TEMPLATE_TYPE = 'tech_tutorial'
+# 記事の生成方法（template: 定型文、llm: LLM、auto: LLMが使えればLLM）。既定はLLMのAPIを呼ばないテンプレート
+GENERATION_METHODS = ('template', 'llm', 'auto')
+DEFAULT_GENERATION_METHOD = 'template'
+
+class PreparedArticleSource:
+    """
+    準備済みの記事を NotePoster に渡すための記事生成器
+    
+    NotePoster は投稿ページを開いた後に article_generator.generate_article() で投稿する記事を取得するため、
+    用意した記事をそのまま返す（データファイルの記事ではないためテンプレートの描画はしない）
+    """
+    
+    def __init__(self, title, content):
+        self.article = {
+            'id': 999,  # 一時ID
+            'title': title,
+            'content': content,
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'method': 'full_auto'
+        }
+    
+    def generate_article(self):
+        return self.article
+
+def _apply_prepared_article(run, item):
+    """準備済みの記事の工程時間・トークン数・編集エージェントを投稿履歴に記録"""
+    run.add_stages(item['stages'])
+    run.add_usage(item.get('usage'))
+    if item.get('stream_stats'):
+        run.record(stream_stats=item['stream_stats'])
+    if item.get('editor'):
+        run.record(editor=item['editor'])
+    run.record(title=item['title'], content_hash=item.get('content_hash'))
+
+def _skip_duplicate(data_manager, item, run):
+    """投稿する本文と同じ内容の記事が既に保存されていれば、投稿履歴に記録して True を返す"""
+    from modules.contents.article_pipeline import find_duplicate
+    
+    duplicate = find_duplicate(data_manager, item)
+    if not duplicate:
+        return False
+    article, score = duplicate
+    message = f"既存記事と重複するため投稿しません: ID {article['id']}（類似度 {score:.2f}）"
+    print_warning(message)
+    run.record(error=message)
+    return True
+
+def _save_posted_article(data_manager, item, run):
+    """投稿した記事を記事データに保存し、生成・校閲の途中の版をブロブストアに残す"""
+    if not data_manager.add_article(item['title'], item['content'], "自動生成", ["AI", "自動投稿"],
+                                    source_content=item['source_content']):
+        return
+    print_success("記事データを保存しました")
+    saved_article = data_manager.find_article_by_content(item['content'])
+    if saved_article:
+        run.record(article_id=saved_article['id'])
+        # 記事データにはブロブのキーのみを保存する
+        data_manager.add_article_revisions(saved_article['id'], item.get('revisions', {}), editor=item.get('editor'))
+
+def auto_generate_and_post(use_ready_queue=True, queue_size=None, method=DEFAULT_GENERATION_METHOD,
+                           use_llm_cache=False):
+    """
+    完全自動記事生成・投稿
+    
+    準備済み記事キューに記事があればそれを投稿し（ブラウザ操作の時間だけで済む）、
+    投稿している間にバックグラウンドでキューを補充する。キューが空ならその場で生成する
+    
+    Args:
+        use_ready_queue: 準備済み記事キューを使うかどうか
+        queue_size: キューに保つ件数（省略時は既定値）
+        method: 記事の生成方法（GENERATION_METHODS のいずれか）
+        use_llm_cache: LLM応答キャッシュを読むかどうか（失敗した実行のやり直し用。既定では毎回APIを呼ぶ）
+    """
     
     print_header("note自動投稿システム - 完全自動実行")
     
+    run = None
+    ready_queue = None
+    claim = None
+    filler = None
     try:
         # モジュールのインポート
+        from modules.contents.article_pipeline import find_duplicate, make_article_producer, prepare_article
         from modules.contents.content_generator import ContentGenerator
         from modules.contents.data_manager import DataManager
+        from modules.contents.ready_queue import DEFAULT_READY_QUEUE_SIZE, ReadyQueue, ReadyQueueFiller
         from modules.post.driver_manager import DriverManager
         from modules.post.note_login import NoteLogin
         from modules.post.note_poster import NotePoster
         from modules.config_manager import ConfigManager
+        from modules.contents.posting_ledger import PostingLedger
+        
+        # 投稿履歴（工程ごとの所要時間・トークン数・投稿URL）の記録を開始
+        run = PostingLedger().start_run("full_auto")
         
         print_step("システム初期化中...")
         
         # 各コンポーネントの初期化
-        data_manager = DataManager()
+        data_manager = DataManager(lazy=True)
         content_generator = ContentGenerator(data_manager)
         config_manager = ConfigManager()
         
         print_success("システム初期化完了")
         
-        # ステップ1: 記事生成
-        print_step("AI記事生成を実行...")
-        
-        # 自動テンプレート選択（tech_tutorialを使用）
-        template_type = 'tech_tutorial'
-        print_info(f"テンプレート: {template_type} を自動選択")
-        
-        title, content = content_generator.generate_templated_content(template_type)
-        
-        print_success(f"記事生成完了")
-        print_info(f"タイトル: {title}")
-        print_info(f"文字数: {len(content)}文字")
-        
-        # ステップ2: AI校閲・改善
-        print_step("AI校閲・改善を実行...")
-        
-        improvement_result = content_generator.improve_with_fallback(
-            title, content, 'comprehensive'
-        )
-        
-        if improvement_result and 'error' not in improvement_result:
-            final_content = improvement_result.get('final_content', content)
-            editor_used = improvement_result.get('editor', 'Unknown')
-            
-            print_success(f"AI校閲完了 (使用エディター: {editor_used})")
-            print_info(f"改善後文字数: {len(final_content)}文字")
+        # ステップ1〜3: 準備済み記事の取り出し、なければ 記事生成 → AI校閲・改善 → フォーマット調整
+        item = None
+        if use_ready_queue:
+            ready_queue = ReadyQueue()
+            while item is None:
+                claimed = ready_queue.pop()
+                if not claimed:
+                    break
+                claim, item = claimed
+                # キューに入れた後に同じ・類似した記事が投稿・保存されていることがあるため確認し直す
+                duplicate = find_duplicate(data_manager, item)
+                if duplicate:
+                    article, score = duplicate
+                    print_warning(f"準備済みの記事が既存記事と重複するため破棄します: ID {article['id']}（類似度 {score:.2f}）")
+                    ready_queue.ack(claim)
+                    claim, item = None, None
+                    continue
+                print_success(f"準備済みの記事を使用します（{item.get('prepared_at')} 作成、残り {len(ready_queue)}件）")
+                run.record(ready_queue=True)
             
-            # タイトル改善案から自動選択（最初の案を使用）
-            if 'title_suggestions' in improvement_result and improvement_result['title_suggestions']:
-                suggestions = improvement_result['title_suggestions']
-                if suggestions:
-                    # 最初の改善案を選択（番号と説明を除去）
-                    new_title = suggestions[0].split(' - ')[0].strip('123456789. ')
-                    title = new_title
-                    print_success(f"タイトル自動選択: {title}")
-            
-            content = final_content
-        else:
-            print_warning("AI校閲をスキップ（元の記事を使用）")
+            # 投稿している間に次回以降の記事をバックグラウンドで用意する
+            filler = ReadyQueueFiller(ready_queue, make_article_producer(DEFAULT_TEMPLATE_TYPE, method, use_llm_cache),
+                                      target_size=queue_size or DEFAULT_READY_QUEUE_SIZE)
+            filler.start()
         
-        # ステップ3: note用フォーマット調整
-        print_step("note用フォーマット調整を実行...")
+        if item is None:
+            print_step("AI記事生成・校閲・フォーマット調整を実行...")
+            print_info(f"テンプレート: {DEFAULT_TEMPLATE_TYPE} を自動選択")
+            # 既存記事と同じ・類似した内容なら校閲・投稿の前に作り直す
+            item = prepare_article(content_generator, DEFAULT_TEMPLATE_TYPE, method=method, use_llm_cache=use_llm_cache)
+            if item is None:
+                run.lap("generate")
+                print_warning("重複しない記事を生成できなかったため投稿を中止します")
+                run.record(error="重複しない記事を生成できませんでした")
+                return False
+        _apply_prepared_article(run, item)
+        
+        # 重複の確認は投稿する本文（校閲・フォーマット調整後）で行う
+        if _skip_duplicate(data_manager, item, run):
+            return False
         
-        content = content_generator.format_for_note(content)
-        print_success(f"フォーマット調整完了 ({len(content)}文字)")
+        title = item['title']
+        content = item['content']
+        print_success("記事の準備完了")
         
         # ステップ4: 投稿準備
         print_step("note投稿準備...")
         
         # 一時記事データ作成
-        temp_article = {
-            'id': 999,  # 一時ID
-            'title': title,
-            'content': content,
-            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'method': 'full_auto'
-        }
+        article_source = PreparedArticleSource(title, content)
         
         print_info("投稿内容プレビュー:")
         print("-" * 50)
@@ -130,7 +206,9 @@ def auto_generate_and_post():
         driver_manager = DriverManager()
         if not driver_manager.setup_driver():
             print_warning("WebDriver初期化に失敗しました")
+            run.record(error="WebDriver初期化に失敗しました")
             return False
+        run.lap("setup")
         
         # ログイン処理
         note_login = NoteLogin(driver_manager, config_manager)
@@ -138,16 +216,23 @@ def auto_generate_and_post():
         
         if not note_login.login():
             print_warning("ログインに失敗しました")
+            run.record(error="ログインに失敗しました")
             driver_manager.cleanup()
             return False
         
         print_success("ログイン成功")
+        run.lap("login")
         
         # 記事投稿処理
-        note_poster = NotePoster(driver_manager, temp_article)
+        note_poster = NotePoster(driver_manager, article_source)
         print_info("記事投稿中...")
         
         if note_poster.create_and_publish_article():
+            run.lap("post")
+            run.record(status="success", note_url=note_poster.published_url)
+            if claim:
+                ready_queue.ack(claim)
+                claim = None
             print_success("記事投稿完了！")
             
             # 投稿成功時の処理
@@ -157,11 +242,13 @@ def auto_generate_and_post():
             print(f"✅ 投稿時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             
             # データファイルに保存（オプション）
-            if data_manager.add_article(title, content, "自動生成", ["AI", "自動投稿"]):
-                print_success("記事データを保存しました")
+            _save_posted_article(data_manager, item, run)
+            run.lap("save")
             
             result = True
         else:
+            run.lap("post")
+            run.record(error="記事投稿に失敗しました")
             print_warning("記事投稿に失敗しました")
             result = False
         
@@ -169,15 +256,171 @@ def auto_generate_and_post():
         driver_manager.cleanup()
         
         return result
-        
+    
     except Exception as e:
         print_warning(f"エラーが発生しました: {e}")
         import traceback
         traceback.print_exc()
+        if run:
+            run.record(error=str(e))
         return False
+    finally:
+        if run:
+            run.finish()
+        if claim:
+            # 投稿できなかった準備済み記事は次回に回す
+            ready_queue.release(claim)
+        if filler:
+            print_info("準備中の記事がキューに入るのを待っています...")
+            filler.stop()
+
+def auto_generate_and_post_many(count, generate_workers=1, edit_workers=1, buffer_size=1,
+                                method=DEFAULT_GENERATION_METHOD, use_llm_cache=False):
+    """
+    複数記事を工程ごとに並行して生成・校閲・投稿
+    
+    記事iを投稿している間に記事i+1の校閲・記事i+2の生成を進める（工程間は容量付きのキュー）。
+    ブラウザの起動・ログインは最初の記事の生成と並行して行い、全記事で同じセッションを使う
+    
+    Args:
+        count: 投稿する記事数
+        generate_workers: 同時に記事を生成する数
+        edit_workers: 同時に校閲する数
+        buffer_size: 工程間のキューの容量
+        method: 記事の生成方法（GENERATION_METHODS のいずれか）
+        use_llm_cache: LLM応答キャッシュを読むかどうか（失敗した実行のやり直し用。既定では毎回APIを呼ぶ）
+    
+    Returns:
+        bool: 全ての記事を投稿できたかどうか
+    """
+    print_header(f"note自動投稿システム - {count}記事のパイプライン実行")
+    
+    from modules.contents.article_pipeline import ArticlePipeline
+    from modules.contents.data_manager import DataManager
+    from modules.contents.posting_ledger import PostingLedger
+    from modules.contents.ready_queue import ReadyQueue
+    from modules.post.driver_manager import DriverManager
+    from modules.post.note_login import NoteLogin
+    from modules.post.note_poster import NotePoster
+    from modules.config_manager import ConfigManager
+    
+    ledger = PostingLedger()
+    data_manager = DataManager(lazy=True)
+    config_manager = ConfigManager()
+    pipeline = ArticlePipeline(count, DEFAULT_TEMPLATE_TYPE, generate_workers, edit_workers, buffer_size,
+                               method=method, use_llm_cache=use_llm_cache)
+    print_info(f"生成 {generate_workers} / 校閲 {edit_workers} / 投稿 1 の並行数、工程間のキュー容量 {buffer_size}")
+    pipeline.start()
+    
+    driver_manager = None
+    posted = 0
+    stage_totals = {}
+    try:
+        # ブラウザの起動・ログイン（この間も記事の生成は進む）
+        session_started = time.perf_counter()
+        driver_manager = DriverManager()
+        if not driver_manager.setup_driver():
+            print_warning("WebDriver初期化に失敗しました")
+            return False
+        session_stages = {"setup": time.perf_counter() - session_started}
+        
+        login_started = time.perf_counter()
+        if not NoteLogin(driver_manager, config_manager).login():
+            print_warning("ログインに失敗しました")
+            return False
+        session_stages["login"] = time.perf_counter() - login_started
+        print_success("ログイン成功")
+        
+        for item in pipeline:
+            run = ledger.start_run("full_auto")
+            run.record(pipeline_index=item['index'])
+            try:
+                # ブラウザの起動・ログインは最初に投稿した記事の記録に含める
+                if session_stages:
+                    run.add_stages(session_stages)
+                    session_stages = {}
+                
+                if item.get('error'):
+                    run.add_stages(item['stages'])
+                    run.record(error=item['error'])
+                    print_warning(f"[{item['index']}/{count}] {item['error']}")
+                    continue
+                
+                _apply_prepared_article(run, item)
+                # 他のプロセスや、このパイプラインで先に投稿した記事と重複していないか投稿の直前に確認し直す
+                if _skip_duplicate(data_manager, item, run):
+                    continue
+                print_step(f"[{item['index']}/{count}] 投稿中: {item['title']}")
+                note_poster = NotePoster(driver_manager, PreparedArticleSource(item['title'], item['content']))
+                
+                if note_poster.create_and_publish_article():
+                    run.lap("post")
+                    run.record(status="success", note_url=note_poster.published_url)
+                    print_success(f"[{item['index']}/{count}] 記事投稿完了: {item['title']}")
+                    _save_posted_article(data_manager, item, run)
+                    run.lap("save")
+                    posted += 1
+                else:
+                    run.lap("post")
+                    run.record(error="記事投稿に失敗しました")
+                    # 用意した記事は準備済み記事キューに回し、次回の投稿で使う
+                    ReadyQueue().put(item)
+                    print_warning(f"[{item['index']}/{count}] 記事投稿に失敗しました（準備済み記事キューに保存）")
+            finally:
+                run.finish()
+                for stage, seconds in run.entry['stages'].items():
+                    stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+    
+    except Exception as e:
+        print_warning(f"エラーが発生しました: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        pipeline.stop()
+        if driver_manager:
+            driver_manager.cleanup()
+    
+    # 工程を順に実行した場合の合計時間と比べて表示
+    wall_seconds = time.perf_counter() - pipeline.started_at
+    sequential_seconds = sum(stage_totals.values())
+    print_info(f"投稿 {posted}/{count}件、所要時間 {wall_seconds:.1f}秒（工程を順に実行した場合 {sequential_seconds:.1f}秒）")
+    for stage, seconds in stage_totals.items():
+        print(f"   {stage}: 合計 {seconds:.1f}秒")
+    return posted == count
+
+def fill_ready_queue(queue_size=None, workers=1, method=DEFAULT_GENERATION_METHOD, use_llm_cache=False):
+    """準備済み記事キューを指定件数に保ち続ける（投稿とは別のプロセスで実行する）"""
+    from modules.contents.article_pipeline import make_article_producer
+    from modules.contents.ready_queue import DEFAULT_READY_QUEUE_SIZE, ReadyQueue, ReadyQueueFiller
+    
+    print_header("準備済み記事キューの補充")
+    filler = ReadyQueueFiller(ReadyQueue(), make_article_producer(DEFAULT_TEMPLATE_TYPE, method, use_llm_cache),
+                              target_size=queue_size or DEFAULT_READY_QUEUE_SIZE, workers=workers)
+    filler.run_forever()
 
 def main():
     """メイン関数"""
+    parser = argparse.ArgumentParser(description="完全自動note投稿システム")
+    parser.add_argument("--fill-queue", action="store_true",
+                        help="投稿せず、準備済み記事キューを --queue-size 件に保ち続ける（Ctrl+C で終了）")
+    parser.add_argument("--queue-size", type=int, help="準備済み記事キューに保つ件数（既定: 2）")
+    parser.add_argument("--workers", type=int, default=1, help="--fill-queue で同時に記事を用意する数")
+    parser.add_argument("--no-queue", action="store_true", help="準備済み記事キューを使わず、その場で生成して投稿する")
+    parser.add_argument("--count", type=int, default=1,
+                        help="投稿する記事数（2以上で生成・校閲・投稿を並行して進めるパイプライン実行）")
+    parser.add_argument("--generate-workers", type=int, default=1, help="--count で同時に記事を生成する数")
+    parser.add_argument("--edit-workers", type=int, default=1, help="--count で同時に校閲する数")
+    parser.add_argument("--buffer", type=int, default=1, help="--count で工程間のキューに置ける記事数")
+    parser.add_argument("--method", choices=GENERATION_METHODS, default=DEFAULT_GENERATION_METHOD,
+                        help="記事の生成方法（template: テンプレート、llm: LLM、auto: LLMが使えればLLM。既定: template）")
+    parser.add_argument("--use-llm-cache", action="store_true",
+                        help="LLM応答キャッシュの応答を使う（失敗した実行のやり直し用。llm_cache.enabled が必要）")
+    args = parser.parse_args()
+    
+    if args.fill_queue:
+        fill_ready_queue(args.queue_size, args.workers, args.method, args.use_llm_cache)
+        return
+    
     print_header("完全自動note投稿システム")
     
     print_info("このスクリプトは以下を自動実行します:")
@@ -194,7 +437,14 @@ def main():
         time.sleep(1)
     
     # 自動実行
-    if auto_generate_and_post():
+    if args.count > 1:
+        succeeded = auto_generate_and_post_many(args.count, args.generate_workers, args.edit_workers, args.buffer,
+                                                method=args.method, use_llm_cache=args.use_llm_cache)
+    else:
+        succeeded = auto_generate_and_post(use_ready_queue=not args.no_queue, queue_size=args.queue_size,
+                                           method=args.method, use_llm_cache=args.use_llm_cache)
+    
+    if succeeded:
         print_header("🎉 完全自動投稿成功！")
         print_success("記事の生成から投稿まで全て完了しました")
     else:
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+記事入出力モジュール
+JSONL / CSV / Markdownフォルダからの記事の読み込みとJSONLへの書き出し
+（いずれも1件ずつストリーミングで処理する）
+"""
+
+import csv
+import json
+import os
+from typing import Dict, Iterable, Iterator
+
+IMPORT_FORMATS = ("jsonl", "csv", "markdown")
+MARKDOWN_EXTENSIONS = ('.md', '.markdown')
+
+
+def iter_jsonl_articles(path: str) -> Iterator[Dict]:
+    """
+    JSONL（1行1記事）から記事を読み込み
+    
+    Args:
+        path: JSONLファイルのパス
+    
+    Yields:
+        Dict: 記事データ
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                article = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"⚠️ JSONLの{line_number}行目を読み込めません: {e}")
+                continue
+            if isinstance(article, dict):
+                yield article
+            else:
+                print(f"⚠️ JSONLの{line_number}行目が記事オブジェクトではありません")
+
+
+def iter_csv_articles(path: str) -> Iterator[Dict]:
+    """
+    CSV（ヘッダー行: title, content, category, tags）から記事を読み込み
+    
+    tags列はカンマ区切り、本文中の改行はCSVの引用符で囲んで記述する
+    
+    Args:
+        path: CSVファイルのパス
+    
+    Yields:
+        Dict: 記事データ
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            yield {
+                "title": row.get('title'),
+                "content": row.get('content'),
+                "category": row.get('category') or "",
+                "tags": row.get('tags') or ""
+            }
+
+
+def _parse_markdown_article(text: str, fallback_title: str) -> Dict:
+    """
+    Markdown1ファイルを記事に変換
+    
+    先頭の front matter（--- で囲んだ key: value 行）から category と tags を、
+    最初の「# 見出し」からタイトルを取得する（front matterにもなければファイル名）
+    """
+    article = {"title": fallback_title, "category": "", "tags": ""}
+    lines = text.splitlines()
+    
+    if lines and lines[0].strip() == '---':
+        for index in range(1, len(lines)):
+            line = lines[index].strip()
+            if line == '---':
+                lines = lines[index + 1:]
+                break
+            key, separator, value = line.partition(':')
+            if separator and key.strip() in ('title', 'category', 'tags'):
+                article[key.strip()] = value.strip()
+    
+    for index, line in enumerate(lines):
+        if not line.strip():
+            continue
+        if line.startswith('# '):
+            if article["title"] == fallback_title:
+                article["title"] = line[2:].strip()
+            lines = lines[index + 1:]
+        break
+    
+    article["content"] = '\n'.join(lines).strip()
+    return article
+
+
+def iter_markdown_articles(directory: str) -> Iterator[Dict]:
+    """
+    フォルダ内のMarkdownファイル（.md）を1ファイル1記事として読み込み（ファイル名順）
+    
+    Args:
+        directory: フォルダのパス
+    
+    Yields:
+        Dict: 記事データ
+    """
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for filename in sorted(files):
+            if not filename.lower().endswith(MARKDOWN_EXTENSIONS):
+                continue
+            with open(os.path.join(root, filename), 'r', encoding='utf-8') as f:
+                text = f.read()
+            yield _parse_markdown_article(text, os.path.splitext(filename)[0])
+
+
+def detect_import_format(path: str) -> str:
+    """パスから入力形式を判定（フォルダはmarkdown、.csvはcsv、それ以外はjsonl）"""
+    if os.path.isdir(path):
+        return "markdown"
+    if path.lower().endswith('.csv'):
+        return "csv"
+    return "jsonl"
+
+
+def iter_import_articles(path: str, import_format: str = None) -> Iterator[Dict]:
+    """
+    入力形式に応じて記事を読み込み
+    
+    Args:
+        path: 入力ファイルまたはフォルダのパス
+        import_format: 入力形式（jsonl, csv, markdown）。省略時はパスから判定
+    
+    Returns:
+        Iterator[Dict]: 記事データのイテレータ
+    """
+    import_format = import_format or detect_import_format(path)
+    readers = {
+        "jsonl": iter_jsonl_articles,
+        "csv": iter_csv_articles,
+        "markdown": iter_markdown_articles
+    }
+    if import_format not in readers:
+        raise ValueError(f"未対応の入力形式: {import_format}")
+    return readers[import_format](path)
+
+
+def write_jsonl_articles(path: str, articles: Iterable[Dict]) -> int:
+    """
+    記事をJSONL（1行1記事）に書き出し
+    
+    Args:
+        path: 出力ファイルのパス
+        articles: 記事のイテラブル（遅延読み込みの記事は本文を読み込んで書き出す）
+    
+    Returns:
+        int: 書き出した件数
+    """
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for article in articles:
+            record = dict(article)
+            record['content'] = article['content']
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+    return count
@@ -19,6 +19,7 @@ class ArticleManager:
         """
         self.data_manager = data_manager or DataManager()
         self.selected_article = None  # 特定記事投稿用
+        self.current_article_id = None  # 投稿中の記事ID（データファイルの記事の場合）
 
     def generate_article_content(self):
         """
@@ -30,8 +31,12 @@ class ArticleManager:
         Returns:
             tuple: (タイトル, 内容)
         """
+        self.current_article_id = None
+        
         # 特定記事が設定されている場合はそれを使用
         if self.selected_article:
+            # 生成直後の一時記事はID 0（データファイル未登録）
+            self.current_article_id = self.selected_article.get('id') or None
             title, content = self.data_manager.format_article_content(self.selected_article)
             print(f"📝 指定された記事を使用します:")
             print(f"   タイトル: {title}")
@@ -44,6 +49,7 @@ class ArticleManager:
         try:
             article = self.data_manager.get_random_article()
             if article:
+                self.current_article_id = article['id']
                 title, content = self.data_manager.format_article_content(article)
                 print(f"📝 データファイルから記事を生成しました:")
                 print(f"   タイトル: {title}")
@@ -56,6 +62,20 @@ class ArticleManager:
         print("📝 フォールバック記事生成を使用します...")
         return self._generate_fallback_content()
 
+    def mark_article_posted(self) -> bool:
+        """
+        投稿した記事の投稿日時をデータファイルに記録
+        
+        Returns:
+            bool: 記録したかどうか（データファイルの記事でない場合はFalse）
+        """
+        if self.current_article_id is None:
+            return False
+        
+        article_id = self.current_article_id
+        self.current_article_id = None
+        return self.data_manager.mark_posted(article_id)
+
     def _generate_fallback_content(self):
         """フォールバック用の記事生成（元のコードを完全再現）"""
         titles = [
@@ -127,13 +147,76 @@ class ArticleManager:
             print(f"❌ 記事取得エラー: {e}")
             return None
     
-    def list_available_articles(self):
-        """利用可能な記事一覧を表示"""
+    def list_available_articles(self, page_size: int = 20, category: str = None, tag: str = None):
+        """
+        利用可能な記事一覧をページ送りで表示
+        
+        Args:
+            page_size: 1ページの表示件数
+            category: カテゴリで絞り込み
+            tag: タグで絞り込み
+        """
         try:
-            self.data_manager.list_articles()
+            offset = 0
+            while True:
+                has_more = self.data_manager.list_articles(offset, page_size, category=category, tag=tag)
+                if not has_more and offset == 0:
+                    return
+                
+                options = []
+                if has_more:
+                    options.append("n: 次のページ")
+                if offset > 0:
+                    options.append("p: 前のページ")
+                options.append("Enter: 一覧を閉じる")
+                command = input(f"\n{' / '.join(options)}: ").strip().lower()
+                
+                if command == "n" and has_more:
+                    offset += page_size
+                elif command == "p" and offset > 0:
+                    offset = max(0, offset - page_size)
+                elif command == "":
+                    return
         except Exception as e:
             print(f"❌ 記事一覧表示エラー: {e}")
 
+    def search_articles(self, query: str = "", category: str = None, tag: str = None, limit: int = 20):
+        """
+        記事を全文検索して結果とカテゴリ・タグの件数を表示
+        
+        Args:
+            query: 検索キーワード
+            category: カテゴリで絞り込み
+            tag: タグで絞り込み
+            limit: 表示件数
+            
+        Returns:
+            list: ヒットした記事のリスト（スコア順、最大limit件）
+        """
+        try:
+            result = self.data_manager.search_articles(query, category=category, tag=tag, limit=limit)
+        except Exception as e:
+            print(f"❌ 記事検索エラー: {e}")
+            return []
+        
+        if not result["total"]:
+            print("❌ 条件に一致する記事がありません")
+            return []
+        
+        print(f"\n🔍 検索結果: {result['total']}件（上位{len(result['results'])}件を表示）")
+        print("=" * 60)
+        for article, score in result["results"]:
+            title = self.data_manager.format_article_title(article)
+            print(f"ID: {article['id']:2d} | {title}" + (f"  (スコア {score:.2f})" if score else ""))
+            print(f"        カテゴリ: {article.get('category', '未分類')} | タグ: {', '.join(article.get('tags', []))}")
+        print("-" * 60)
+        
+        facets = result["facets"]
+        print("📂 カテゴリ: " + ", ".join(f"{name}({count})" for name, count in list(facets["category"].items())[:10]))
+        print("🏷️ タグ: " + ", ".join(f"{name}({count})" for name, count in list(facets["tags"].items())[:10]))
+        
+        return [article for article, _ in result["results"]]
+
     def generate_article(self):
         """完全な記事（タイトル + 内容）を生成"""
         title, content = self.generate_article_content()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+記事準備パイプラインモジュール
+AI記事生成 → AI校閲・改善 → note用フォーマット調整 の各工程を、投稿処理から切り離して実行する
+（各工程は記事1件分の辞書を受け取って更新し、工程ごとの所要時間とトークン数を記録する）
+複数記事の場合は工程ごとのワーカーを容量付きのキューでつなぎ、記事iの投稿中に次の記事の校閲・生成を進める
+"""
+
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from .content_generator import ContentGenerator
+from .content_hash import compute_content_hash
+from .data_manager import DataManager
+from .llm_cache import bypass_llm_cache
+from .llm_clients import load_llm_config_file
+from .llm_usage import merge_usage
+
+
+def _record_stage(item: Dict, stage: str, started: float) -> None:
+    item["stages"][stage] = round(item["stages"].get(stage, 0.0) + time.perf_counter() - started, 3)
+
+
+def generate_article(content_generator: ContentGenerator, template_type: str = None,
+                     topic: str = None, claim: Callable[[str], bool] = None,
+                     method: str = "template") -> Optional[Dict]:
+    """
+    記事を生成（LLMの下書きが既存記事と同じ・類似した内容なら作り直す）
+    
+    Args:
+        content_generator: 記事生成器
+        template_type: 生成テンプレートのタイプ
+        topic: 記事のトピック
+        claim: 並行して生成している他のワーカーと重複しないよう本文を確保する関数（generate_unique_content を参照）
+        method: 生成方法 ("template", "llm", "auto")。既定はテンプレート（LLMのAPIを呼ばない）
+    
+    Returns:
+        Optional[Dict]: 記事（title, content, source_content, template_type, usage, stream_stats, stages）。
+                        重複しない記事を生成できなかった場合は None。
+                        source_content はLLMの下書きのみ（定型文のテンプレートの本文は重複判定に使わない）
+    """
+    started = time.perf_counter()
+    kwargs = {"template_type": template_type}
+    if topic:
+        kwargs["topic"] = topic
+    generated = content_generator.generate_unique_content(method, claim=claim, **kwargs)
+    if not generated:
+        return None
+    
+    title, content = generated
+    item = {
+        "template_type": template_type,
+        "title": title,
+        "content": content,
+        "source_content": content if content_generator.last_method == "llm" else None,
+        "editor": None,
+        "usage": merge_usage(content_generator.last_usage),
+        "stream_stats": dict(content_generator.last_stream_stats),
+        "revisions": {"generated": content},
+        "stages": {}
+    }
+    _record_stage(item, "generate", started)
+    print(f"✅ 記事生成完了: {title} ({len(content)}文字)")
+    return item
+
+
+def edit_article(content_generator: ContentGenerator, item: Dict) -> Dict:
+    """
+    記事をAIで校閲・改善し、タイトル改善案の最初の案をタイトルにする（失敗時は元の記事のまま）
+    
+    Args:
+        content_generator: 記事生成器（編集エージェントを持つもの）
+        item: generate_article で生成した記事
+    
+    Returns:
+        Dict: 更新した記事
+    """
+    started = time.perf_counter()
+    improvement_result = content_generator.improve_with_fallback(item["title"], item["content"], 'comprehensive')
+    
+    if improvement_result and 'error' not in improvement_result:
+        item["content"] = improvement_result.get('final_content', item["content"])
+        item["editor"] = improvement_result.get('editor', 'Unknown')
+        item["usage"] = merge_usage(item["usage"], improvement_result.get('usage'))
+        item["revisions"].update({
+            "proofread": improvement_result.get('proofread_content'),
+            "buzz": improvement_result.get('buzz_content'),
+            "final": improvement_result.get('final_content')
+        })
+        print(f"✅ AI校閲完了 (使用エディター: {item['editor']}, {len(item['content'])}文字)")
+        
+        # タイトル改善案から最初の案を選択（番号と説明を除去）
+        suggestions = improvement_result.get('title_suggestions')
+        if suggestions:
+            item["title"] = suggestions[0].split(' - ')[0].strip('123456789. ')
+            print(f"✅ タイトル自動選択: {item['title']}")
+    else:
+        print("⚠️ AI校閲をスキップ（元の記事を使用）")
+    
+    _record_stage(item, "edit", started)
+    return item
+
+
+def format_article(content_generator: ContentGenerator, item: Dict) -> Dict:
+    """
+    記事をnote用にフォーマット調整
+    
+    Args:
+        content_generator: 記事生成器
+        item: 校閲済みの記事
+    
+    Returns:
+        Dict: 更新した記事（content_hash と prepared_at を追加）
+    """
+    started = time.perf_counter()
+    item["content"] = content_generator.format_for_note(item["content"])
+    item["content_hash"] = compute_content_hash(item["content"])
+    item["prepared_at"] = datetime.now().isoformat(timespec='seconds')
+    _record_stage(item, "format", started)
+    return item
+
+
+def find_duplicate(data_manager: DataManager, item: Dict, threshold: float = None) -> Optional[Tuple[Dict, float]]:
+    """
+    投稿の直前に、投稿する本文（校閲・フォーマット調整後）と同じ・類似した記事が保存されていないか確認
+    
+    他のプロセス・スレッドが保存した記事も対象にするため、記事データが更新されていれば読み込み直してから確認する
+    
+    Args:
+        data_manager: データマネージャー
+        item: 投稿する記事
+        threshold: 類似度のしきい値（省略時は llm_config.json の llm_settings.similarity_check.threshold、なければ0.8）
+    
+    Returns:
+        Optional[Tuple[Dict, float]]: (既存記事, 類似度)。完全一致の類似度は 1.0、重複がなければ None
+    """
+    duplicate = data_manager.find_article_by_content(item["content"])
+    if duplicate:
+        return duplicate, 1.0
+    
+    if threshold is None:
+        similarity_config = load_llm_config_file().get("llm_settings", {}).get("similarity_check", {})
+        threshold = similarity_config.get("threshold", 0.8)
+    similar = data_manager.find_similar_articles(item["content"], threshold)
+    return similar[0] if similar else None
+
+
+def prepare_article(content_generator: ContentGenerator, template_type: str = None,
+                    topic: str = None, method: str = "template", use_llm_cache: bool = False) -> Optional[Dict]:
+    """
+    投稿できる状態の記事を用意（生成 → 校閲・改善 → フォーマット調整）
+    
+    Args:
+        content_generator: 記事生成器
+        template_type: 生成テンプレートのタイプ
+        topic: 記事のトピック
+        method: 生成方法 ("template", "llm", "auto")
+        use_llm_cache: LLM応答キャッシュを読むかどうか（既定では読まずに毎回APIを呼び、
+                       同じプロンプトから同じ下書き・校閲結果を作らない。失敗した実行のやり直し用）
+    
+    Returns:
+        Optional[Dict]: 記事（生成できなかった場合は None）
+    """
+    with bypass_llm_cache(not use_llm_cache):
+        item = generate_article(content_generator, template_type, topic, method=method)
+        if item is None:
+            return None
+        return format_article(content_generator, edit_article(content_generator, item))
+
+
+def make_article_producer(template_type: str = None, method: str = "template",
+                          use_llm_cache: bool = False) -> Callable[[], Optional[Dict]]:
+    """
+    バックグラウンドのワーカー用に、投稿準備済みの記事を1件用意する関数を作成
+    
+    記事生成器は直前の生成のトークン数などの状態を持つため、スレッドごとに作る
+    
+    Args:
+        template_type: 生成テンプレートのタイプ
+        method: 生成方法 ("template", "llm", "auto")
+        use_llm_cache: LLM応答キャッシュを読むかどうか（prepare_article を参照）
+    
+    Returns:
+        Callable[[], Optional[Dict]]: 記事を用意する関数
+    """
+    get_generator = thread_local_generator()
+    
+    def produce() -> Optional[Dict]:
+        return prepare_article(get_generator(), template_type, method=method, use_llm_cache=use_llm_cache)
+    
+    return produce
+
+
+def thread_local_generator() -> Callable[[], ContentGenerator]:
+    """
+    スレッドごとに1つの記事生成器を返す関数を作成
+    
+    記事生成器は直前の生成のトークン数などの状態を持つため、ワーカースレッド間で共有しない
+    （スレッドごとのデータマネージャーは、他のスレッド・プロセスが保存した記事を重複確認の前に読み込み直す）
+    
+    Returns:
+        Callable[[], ContentGenerator]: 呼び出したスレッドの記事生成器を返す関数
+    """
+    local = threading.local()
+    
+    def get_generator() -> ContentGenerator:
+        if not hasattr(local, 'content_generator'):
+            local.content_generator = ContentGenerator(DataManager(lazy=True))
+        return local.content_generator
+    
+    return get_generator
+
+
+class ArticlePipeline:
+    """
+    複数記事の生成・校閲を工程ごとのワーカーで並行に進め、用意できた記事から順に渡す
+    
+    生成ワーカー → [容量付きキュー] → 校閲・フォーマット調整ワーカー → [容量付きキュー] → 呼び出し側（投稿）
+    の順につなぐ。キューが一杯なら前の工程は空くまで待つ（バックプレッシャー）ため、
+    投稿が遅くても生成・校閲が先に進みすぎず、記事iの投稿中に記事i+1の校閲・記事i+2の生成が進む。
+    生成・校閲に失敗した記事は error を入れた辞書として渡すため、反復は必ず count 回で終わる。
+    
+    ワーカーごとのデータマネージャーには、まだ投稿・保存していない他のワーカーの記事が見えないため、
+    LLMの下書きと校閲・フォーマット調整後の本文のハッシュを全ワーカーで共有して確保し、同じ本文を二重に用意しない
+    """
+    
+    def __init__(self, count: int, template_type: str = None, generate_workers: int = 1, edit_workers: int = 1,
+                 buffer_size: int = 1, get_generator: Callable[[], ContentGenerator] = None,
+                 method: str = "template", use_llm_cache: bool = False):
+        """
+        Args:
+            count: 用意する記事数
+            template_type: 生成テンプレートのタイプ
+            generate_workers: 同時に記事を生成する数
+            edit_workers: 同時に校閲する数
+            buffer_size: 工程間のキューの容量
+            get_generator: 記事生成器を返す関数（省略時はスレッドごとに作成）
+            method: 生成方法 ("template", "llm", "auto")
+            use_llm_cache: LLM応答キャッシュを読むかどうか（prepare_article を参照）
+        """
+        self.count = count
+        self.template_type = template_type
+        self.method = method
+        self.use_llm_cache = use_llm_cache
+        self.generate_workers = max(generate_workers, 1)
+        self.edit_workers = max(edit_workers, 1)
+        self.get_generator = get_generator or thread_local_generator()
+        self._generated = queue.Queue(maxsize=max(buffer_size, 1))
+        self._prepared = queue.Queue(maxsize=max(buffer_size, 1))
+        self._next_index = 0
+        self._running_generators = self.generate_workers
+        self._claimed_hashes: Dict[str, int] = {}  # 本文のハッシュ → 確保した記事の番号
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self.started_at: Optional[float] = None
+    
+    def _put(self, target: queue.Queue, item) -> bool:
+        """キューに空きができるまで待って追加（停止した場合は False）"""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _get(self, source: queue.Queue):
+        """キューから取り出す（停止した場合は None）"""
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return None
+    
+    def _claim(self, content: str, index: int) -> bool:
+        """本文を記事 index のものとして確保（他の記事が確保済みなら False）"""
+        content_hash = compute_content_hash(content)
+        with self._lock:
+            return self._claimed_hashes.setdefault(content_hash, index) == index
+    
+    def _take_index(self) -> Optional[int]:
+        with self._lock:
+            if self._next_index >= self.count or self._stop.is_set():
+                return None
+            self._next_index += 1
+            return self._next_index
+    
+    def _generate_loop(self) -> None:
+        # キャッシュを読まない指定はスレッドごとの値のため、ワーカースレッドの中で指定する
+        with bypass_llm_cache(not self.use_llm_cache):
+            self._generate_articles()
+    
+    def _generate_articles(self) -> None:
+        try:
+            while True:
+                index = self._take_index()
+                if index is None:
+                    break
+                try:
+                    item = generate_article(self.get_generator(), self.template_type,
+                                            claim=lambda content: self._claim(content, index), method=self.method)
+                    if item is None:
+                        item = {"error": "重複しない記事を生成できませんでした", "stages": {}}
+                except Exception as e:
+                    item = {"error": f"記事生成エラー: {e}", "stages": {}}
+                item["index"] = index
+                if not self._put(self._generated, item):
+                    break
+        finally:
+            with self._lock:
+                self._running_generators -= 1
+                last = self._running_generators == 0
+            if last:
+                # 全ての生成ワーカーが終わったら校閲ワーカーに終了を知らせる
+                for _ in range(self.edit_workers):
+                    self._put(self._generated, None)
+    
+    def _edit_loop(self) -> None:
+        with bypass_llm_cache(not self.use_llm_cache):
+            self._edit_articles()
+    
+    def _edit_articles(self) -> None:
+        while True:
+            item = self._get(self._generated)
+            if item is None:
+                break
+            if not item.get("error"):
+                try:
+                    generator = self.get_generator()
+                    item = format_article(generator, edit_article(generator, item))
+                    if not self._claim(item["content"], item["index"]):
+                        item["error"] = "並行して用意した記事と同じ内容のため投稿しません"
+                except Exception as e:
+                    item["error"] = f"記事校閲エラー: {e}"
+            if not self._put(self._prepared, item):
+                break
+    
+    def start(self) -> None:
+        """ワーカースレッドを開始"""
+        self.started_at = time.perf_counter()
+        workers = [("generate", self._generate_loop, self.generate_workers), ("edit", self._edit_loop, self.edit_workers)]
+        for stage, target, count in workers:
+            for index in range(count):
+                thread = threading.Thread(target=target, name=f"article-pipeline-{stage}-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+    
+    def __iter__(self) -> Iterator[Dict]:
+        """用意できた記事を順に返す（index 付き。失敗した記事は error 付き）"""
+        for _ in range(self.count):
+            item = self._get(self._prepared)
+            if item is None:
+                return
+            yield item
+    
+    def stop(self) -> None:
+        """新しい記事の生成をやめ、ワーカースレッドの終了を待つ"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+記事選択モジュール
+投稿する記事の選択ポリシー（一様・重み付き・ローテーション）
+"""
+
+import heapq
+import random
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class IndexedIdSet:
+    """
+    記事IDの集合（O(1)で追加・削除・ランダム選択が可能）
+    
+    リストと位置辞書を併用し、削除時は末尾要素と入れ替えて詰める
+    """
+    
+    def __init__(self):
+        self._ids: List[int] = []
+        self._positions: Dict[int, int] = {}
+    
+    def add(self, article_id: int) -> None:
+        if article_id in self._positions:
+            return
+        self._positions[article_id] = len(self._ids)
+        self._ids.append(article_id)
+    
+    def discard(self, article_id: int) -> None:
+        position = self._positions.pop(article_id, None)
+        if position is None:
+            return
+        last_id = self._ids.pop()
+        if position < len(self._ids):
+            self._ids[position] = last_id
+            self._positions[last_id] = position
+    
+    def choice(self) -> int:
+        return random.choice(self._ids)
+    
+    def __contains__(self, article_id: int) -> bool:
+        return article_id in self._positions
+    
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class SelectionPolicy:
+    """
+    記事選択ポリシーの基底クラス
+    
+    候補記事は追加・削除・更新のたびに差分で反映し、選択のたびに候補一覧を作り直さない
+    """
+    
+    policy_name = None
+    
+    def add(self, article: Dict) -> None:
+        """候補に記事を追加"""
+        raise NotImplementedError
+    
+    def remove(self, article_id: int) -> None:
+        """候補から記事を削除"""
+        raise NotImplementedError
+    
+    def update(self, article: Dict) -> None:
+        """記事の変更（重み・投稿日時など）を反映"""
+        self.remove(article['id'])
+        self.add(article)
+    
+    def select(self) -> Optional[int]:
+        """
+        記事を1件選択
+        
+        Returns:
+            Optional[int]: 選択された記事ID（候補がない場合は None）
+        """
+        raise NotImplementedError
+    
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class UniformSelectionPolicy(SelectionPolicy):
+    """全候補から一様ランダムに選択（O(1)）"""
+    
+    policy_name = "uniform"
+    
+    def __init__(self):
+        self._ids = IndexedIdSet()
+    
+    def add(self, article: Dict) -> None:
+        self._ids.add(article['id'])
+    
+    def remove(self, article_id: int) -> None:
+        self._ids.discard(article_id)
+    
+    def update(self, article: Dict) -> None:
+        pass
+    
+    def select(self) -> Optional[int]:
+        return self._ids.choice() if self._ids else None
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class WeightedSelectionPolicy(SelectionPolicy):
+    """
+    記事の weight フィールドに比例して選択（Walkerのエイリアス法）
+    
+    エイリアス表は候補が変わった後の最初の選択時にだけO(n)で作り直し、選択自体はO(1)。
+    weight未設定の記事は1.0、0以下の記事は選択されない
+    """
+    
+    policy_name = "weighted"
+    
+    def __init__(self):
+        self._weights: Dict[int, float] = {}
+        self._table: Optional[Tuple[List[int], List[float], List[int]]] = None
+    
+    def add(self, article: Dict) -> None:
+        weight = float(article.get('weight', 1.0))
+        if weight > 0:
+            self._weights[article['id']] = weight
+        else:
+            self._weights.pop(article['id'], None)
+        self._table = None
+    
+    def remove(self, article_id: int) -> None:
+        if self._weights.pop(article_id, None) is not None:
+            self._table = None
+    
+    def update(self, article: Dict) -> None:
+        if self._weights.get(article['id']) != float(article.get('weight', 1.0)):
+            self.add(article)
+    
+    def _build_table(self) -> Tuple[List[int], List[float], List[int]]:
+        """エイリアス表（ID、採択確率、別名の位置）を作成"""
+        ids = list(self._weights)
+        count = len(ids)
+        total = sum(self._weights.values())
+        scaled = [self._weights[article_id] * count / total for article_id in ids]
+        probabilities = [1.0] * count
+        aliases = list(range(count))
+        
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            probabilities[less] = scaled[less]
+            aliases[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        
+        return ids, probabilities, aliases
+    
+    def select(self) -> Optional[int]:
+        if not self._weights:
+            return None
+        
+        if self._table is None:
+            self._table = self._build_table()
+        ids, probabilities, aliases = self._table
+        
+        position = random.randrange(len(ids))
+        if random.random() < probabilities[position]:
+            return ids[position]
+        return ids[aliases[position]]
+    
+    def __len__(self) -> int:
+        return len(self._weights)
+
+
+class RotationSelectionPolicy(SelectionPolicy):
+    """
+    最後に投稿された日時（last_posted_at）が最も古い記事を選択
+    
+    未投稿の記事を優先し、同順位はランダムに並べる。
+    ヒープは更新時に新しい項目を積み、古い項目は取り出し時に読み捨てる
+    """
+    
+    policy_name = "rotation"
+    
+    def __init__(self):
+        self._heap: List[Tuple[str, float, int]] = []
+        self._entries: Dict[int, Tuple[str, float, int]] = {}
+    
+    def add(self, article: Dict) -> None:
+        entry = (article.get('last_posted_at') or "", random.random(), article['id'])
+        self._entries[article['id']] = entry
+        heapq.heappush(self._heap, entry)
+        
+        # 読み捨て待ちの項目が増えすぎたらヒープを作り直す
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = list(self._entries.values())
+            heapq.heapify(self._heap)
+    
+    def remove(self, article_id: int) -> None:
+        self._entries.pop(article_id, None)
+    
+    def update(self, article: Dict) -> None:
+        entry = self._entries.get(article['id'])
+        if entry is not None and entry[0] != (article.get('last_posted_at') or ""):
+            self.add(article)
+    
+    def select(self) -> Optional[int]:
+        heap = self._heap
+        while heap:
+            entry = heap[0]
+            if self._entries.get(entry[2]) is entry:
+                return entry[2]
+            heapq.heappop(heap)
+        return None
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+SELECTION_POLICIES = {
+    UniformSelectionPolicy.policy_name: UniformSelectionPolicy,
+    WeightedSelectionPolicy.policy_name: WeightedSelectionPolicy,
+    RotationSelectionPolicy.policy_name: RotationSelectionPolicy
+}
+
+
+def create_selection_policy(name: str = None) -> SelectionPolicy:
+    """
+    名前から記事選択ポリシーを生成
+    
+    Args:
+        name: ポリシー名（uniform, weighted, rotation）。省略時はuniform
+    
+    Returns:
+        SelectionPolicy: 記事選択ポリシー
+    """
+    name = name or UniformSelectionPolicy.policy_name
+    if name not in SELECTION_POLICIES:
+        raise ValueError(f"未対応の記事選択ポリシー: {name}")
+    return SELECTION_POLICIES[name]()
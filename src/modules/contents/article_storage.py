@@ -0,0 +1,806 @@
+#!/usr/bin/env python3
+"""
+記事ストレージモジュール
+記事データの永続化バックエンド（JSONファイル / ジャーナル付きJSON / SQLite）
+"""
+
+import codecs
+import json
+import os
+import re
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from .content_hash import compute_content_hash
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+JOURNAL_SUFFIX = '.journal.jsonl'
+
+# SQLiteで専用カラムを持つ記事フィールド（それ以外はextraカラムにJSONで保存）
+ARTICLE_COLUMNS = ('id', 'title', 'content', 'category', 'status', 'created_at')
+
+# 遅延読み込みのスキャン用（スナップショット先頭の "articles" 配列と記事間の区切り）
+ARTICLES_HEADER_PATTERN = re.compile(r'\s*\{\s*"articles"\s*:\s*\[')
+SEPARATOR_PATTERN = re.compile(r'[\s,]*')
+SCAN_CHUNK_SIZE = 1 << 20
+
+
+class LazyArticle(dict):
+    """
+    本文（content）を必要になった時点でストレージから読み込む記事
+    
+    メタデータ（id, title, status, tags, category等）だけを保持し、
+    article['content'] / article.get('content') で本文をその都度ディスクから読む。
+    本文を代入した場合はその値を保持する
+    """
+    
+    def __init__(self, metadata: Dict, content_loader: Callable[[int], str]):
+        super().__init__(metadata)
+        self._content_loader = content_loader
+    
+    def __missing__(self, key):
+        if key == 'content':
+            return self._content_loader(self['id'])
+        raise KeyError(key)
+    
+    def get(self, key, default=None):
+        if key == 'content' and not dict.__contains__(self, 'content'):
+            return self['content']
+        return super().get(key, default)
+    
+    def materialize(self) -> Dict:
+        """本文を含む通常の辞書に変換"""
+        article = dict(self)
+        article['content'] = self['content']
+        return article
+
+
+class FileLock:
+    """
+    プロセス間の排他制御用アドバイザリロック（ロックファイルを使用）
+    
+    同一インスタンス内では再入可能
+    """
+    
+    def __init__(self, lock_path: str):
+        """
+        Args:
+            lock_path: ロックファイルのパス
+        """
+        self.lock_path = lock_path
+        self._fd = None
+        self._depth = 0
+    
+    def acquire(self) -> None:
+        if self._depth == 0:
+            directory = os.path.dirname(self.lock_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            except Exception:
+                os.close(fd)
+                raise
+            self._fd = fd
+        self._depth += 1
+    
+    def release(self) -> None:
+        if self._depth == 0:
+            return
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                if fcntl:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(self._fd, 0, os.SEEK_SET)
+                    msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+def _fsync_directory(directory: str) -> None:
+    """リネーム結果を永続化するためディレクトリをfsync（非対応環境では何もしない）"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory or '.', os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, writer: Callable) -> None:
+    """
+    ファイルをクラッシュセーフに書き込み
+    
+    同じディレクトリの一時ファイルに書き出してfsyncし、os.replaceで置き換える。
+    途中でクラッシュしても元のファイルは壊れない
+    
+    Args:
+        path: 書き込み先のパス
+        writer: バイナリモードのファイルオブジェクトを受け取り内容を書き込む関数
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            writer(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    _fsync_directory(directory)
+
+
+def atomic_write_json(path: str, data) -> None:
+    """JSONデータをクラッシュセーフに書き込み"""
+    atomic_write(path, lambda f: f.write(json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')))
+
+
+def _file_signature(path: str) -> Optional[tuple]:
+    """変更検知用のファイル署名（mtime, サイズ）"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class ArticleStorage:
+    """記事ストレージの基底クラス"""
+    
+    backend_name = "base"
+    
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 保存先ファイルのパス
+        """
+        self.path = path
+        self._file_lock = FileLock(path + '.lock')
+        self._synced_signature = None
+    
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """
+        読み込み→変更→書き込みをプロセス間で排他するロック
+        
+        使用例:
+            with storage.lock():
+                ...
+        """
+        with self._file_lock:
+            yield
+    
+    def _current_signature(self):
+        """ストレージの現在の状態を表す署名（他プロセスによる変更検知用）"""
+        return _file_signature(self.path)
+    
+    def mark_synced(self) -> None:
+        """メモリ上のデータがストレージと一致した時点の署名を記録"""
+        self._synced_signature = self._current_signature()
+    
+    def has_changed(self) -> bool:
+        """最後の読み込み・書き込み以降に他プロセスが変更したかチェック"""
+        return self._current_signature() != self._synced_signature
+    
+    def exists(self) -> bool:
+        """保存先が存在するかチェック"""
+        return os.path.exists(self.path)
+    
+    def load(self, lazy: bool = False) -> Optional[Dict]:
+        """
+        記事データ全体を読み込み
+        
+        Args:
+            lazy: Trueの場合は本文を読み込まず、記事をLazyArticleとして返す
+            
+        Returns:
+            Optional[Dict]: {"articles": [...], "settings": {...}} 形式のデータ、または None
+        """
+        raise NotImplementedError
+    
+    def read_content(self, article_id: int) -> str:
+        """遅延読み込みされた記事の本文をストレージから読み込み"""
+        raise NotImplementedError
+    
+    def save_all(self, articles_data: Dict) -> None:
+        """記事データ全体を保存"""
+        raise NotImplementedError
+    
+    def insert_article(self, articles_data: Dict, article: Dict) -> None:
+        """
+        記事1件を追加保存（デフォルトは全体保存）
+        
+        Args:
+            articles_data: 追加後の記事データ全体
+            article: 追加された記事
+        """
+        self.save_all(articles_data)
+    
+    def insert_articles(self, articles_data: Dict, articles: List[Dict]) -> None:
+        """
+        複数の記事をまとめて追加保存（デフォルトは全体保存1回）
+        
+        Args:
+            articles_data: 追加後の記事データ全体
+            articles: 追加された記事のリスト
+        """
+        self.save_all(articles_data)
+    
+    def update_article(self, articles_data: Dict, article: Dict, fields: List[str] = None) -> None:
+        """
+        記事1件の変更を保存（デフォルトは全体保存）
+        
+        Args:
+            articles_data: 変更後の記事データ全体
+            article: 変更された記事
+            fields: 変更されたフィールド名（省略時は記事全体）
+        """
+        self.save_all(articles_data)
+    
+    def query_article_ids(self, status: str = None, category: str = None, tag: str = None) -> Optional[List[int]]:
+        """
+        条件に一致する記事IDをストレージ側で検索
+        
+        Returns:
+            Optional[List[int]]: 記事IDのリスト（ストレージが検索に対応しない場合は None）
+        """
+        return None
+    
+    def close(self) -> None:
+        """リソースを解放"""
+        pass
+
+
+class JsonArticleStorage(ArticleStorage):
+    """JSONファイル1つに記事データ全体を保存するストレージ（デフォルト）"""
+    
+    backend_name = "json"
+    
+    def __init__(self, path: str):
+        super().__init__(path)
+        # 遅延読み込み時の記事ID→(開始, 終了)バイト位置
+        self._offsets: Dict[int, Tuple[int, int]] = {}
+        self._offsets_signature = None
+    
+    def load(self, lazy: bool = False) -> Optional[Dict]:
+        if not os.path.exists(self.path):
+            return None
+        
+        if lazy:
+            return self._scan_snapshot()
+        
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _scan_snapshot(self) -> Dict:
+        """
+        スナップショットをチャンク単位でストリーミング走査し、メタデータとバイト位置だけを取得
+        
+        記事は1件ずつデコードしてすぐ本文を捨てるため、メモリ使用量は記事数に比例しない
+        """
+        decoder = json.JSONDecoder()
+        utf8_decoder = codecs.getincrementaldecoder('utf-8')()
+        signature = _file_signature(self.path)
+        articles = []
+        offsets = {}
+        
+        with open(self.path, 'rb') as f:
+            # 先頭チャンクはヘッダー判定に十分な長さを確保する
+            buffer = utf8_decoder.decode(f.read(max(SCAN_CHUNK_SIZE, 4096)))
+            eof = False
+            
+            header = ARTICLES_HEADER_PATTERN.match(buffer)
+            if not header:
+                # 想定外のレイアウト（articlesが先頭にない等）は通常読み込みにフォールバック
+                print(f"⚠️ 遅延読み込みに対応していない形式のため通常読み込みします: {self.path}")
+                f.seek(0)
+                self._offsets = {}
+                return json.loads(f.read().decode('utf-8'))
+            
+            pos = header.end()
+            byte_pos = len(buffer[:pos].encode('utf-8'))
+            
+            while True:
+                separator = SEPARATOR_PATTERN.match(buffer, pos)
+                byte_pos += separator.end() - pos  # 空白とカンマはASCII
+                pos = separator.end()
+                
+                if pos < len(buffer) and buffer[pos] == ']':
+                    pos += 1
+                    break
+                
+                try:
+                    if pos >= len(buffer):
+                        raise ValueError("buffer exhausted")
+                    article, end = decoder.raw_decode(buffer, pos)
+                except ValueError:
+                    # 記事がチャンク境界をまたいでいる場合は次のチャンクを読み足す
+                    if eof:
+                        raise
+                    chunk = f.read(SCAN_CHUNK_SIZE)
+                    eof = not chunk
+                    buffer = buffer[pos:] + utf8_decoder.decode(chunk, final=eof)
+                    pos = 0
+                    continue
+                
+                length = len(buffer[pos:end].encode('utf-8'))
+                offsets[article['id']] = (byte_pos, byte_pos + length)
+                byte_pos += length
+                pos = end
+                
+                # 本文を捨てる前に重複判定用のハッシュだけ残す
+                content = article.pop('content', None)
+                if 'content_hash' not in article:
+                    article['content_hash'] = compute_content_hash(content)
+                articles.append(LazyArticle(article, self.read_content))
+            
+            # 記事配列以降（settings等）は小さいのでまとめて読む
+            rest = buffer[pos:] + utf8_decoder.decode(f.read(), final=True)
+        
+        articles_data = {"articles": articles}
+        articles_data.update(json.loads('{' + rest.strip().lstrip(',')))
+        
+        self._offsets = offsets
+        self._offsets_signature = signature
+        return articles_data
+    
+    def read_content(self, article_id: int) -> str:
+        if self._offsets_signature != _file_signature(self.path):
+            # スナップショットが書き換えられていればバイト位置を取り直す
+            self._scan_snapshot()
+        
+        start, end = self._offsets[article_id]
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            return json.loads(f.read(end - start).decode('utf-8'))['content']
+    
+    def _write_snapshot(self, f, articles_data: Dict) -> Dict[int, Tuple[int, int]]:
+        """
+        json.dump(indent=2)と同じ形式で記事を1件ずつ書き出し、各記事のバイト位置を返す
+        
+        遅延読み込みの記事は書き出す直前に本文を読むため、全件を同時にメモリへ載せない
+        """
+        offsets = {}
+        position = 0
+        
+        def write(text: str) -> None:
+            nonlocal position
+            data = text.encode('utf-8')
+            f.write(data)
+            position += len(data)
+        
+        write('{')
+        for key_index, (key, value) in enumerate(articles_data.items()):
+            write(',\n  ' if key_index else '\n  ')
+            write(json.dumps(key, ensure_ascii=False) + ': ')
+            if key == 'articles' and value:
+                write('[')
+                for index, article in enumerate(value):
+                    write(',\n    ' if index else '\n    ')
+                    if isinstance(article, LazyArticle):
+                        article = article.materialize()
+                    start = position
+                    write(json.dumps(article, ensure_ascii=False, indent=2).replace('\n', '\n    '))
+                    offsets[article['id']] = (start, position)
+                write('\n  ]')
+            else:
+                write(json.dumps(value, ensure_ascii=False, indent=2).replace('\n', '\n  '))
+        write('\n}' if articles_data else '}')
+        
+        return offsets
+    
+    def save_all(self, articles_data: Dict) -> None:
+        with self.lock():
+            offsets = {}
+            atomic_write(self.path, lambda f: offsets.update(self._write_snapshot(f, articles_data)))
+            self._offsets = offsets
+            self._offsets_signature = _file_signature(self.path)
+
+
+class JournalArticleStorage(JsonArticleStorage):
+    """
+    ジャーナル付きJSONストレージ
+    
+    記事の追加・変更はスナップショット（articles.json）の隣のジャーナルに1行追記し、
+    読み込み時にスナップショットへジャーナルを再生する。
+    ジャーナルが一定件数を超えるか compact() を呼ぶとスナップショットに畳み込む
+    """
+    
+    backend_name = "journal"
+    
+    def __init__(self, path: str, compact_threshold: int = 1000):
+        """
+        Args:
+            path: スナップショットファイルのパス
+            compact_threshold: 自動コンパクションを行うジャーナル件数
+        """
+        super().__init__(path)
+        self.journal_path = journal_path_for(path)
+        self.compact_threshold = compact_threshold
+        self.journal_entries = 0
+    
+    def exists(self) -> bool:
+        return os.path.exists(self.path) or os.path.exists(self.journal_path)
+    
+    def _current_signature(self):
+        return (_file_signature(self.path), _file_signature(self.journal_path))
+    
+    def load(self, lazy: bool = False) -> Optional[Dict]:
+        if not self.exists():
+            return None
+        
+        articles_data = super().load(lazy) or {"articles": [], "settings": {}}
+        self.journal_entries = self._replay_journal(articles_data)
+        return articles_data
+    
+    def _replay_journal(self, articles_data: Dict) -> int:
+        """
+        ジャーナルをスナップショットに再生し、再生した件数を返す
+        
+        ロックを取らずに読むため、不完全な行（他のプロセスが追記中の行を含む）は読み飛ばすだけでファイルは変更しない
+        """
+        if not os.path.exists(self.journal_path):
+            return 0
+        
+        articles = articles_data.setdefault('articles', [])
+        articles_by_id = {article['id']: article for article in articles}
+        replayed = 0
+        
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    # 書き込み途中でクラッシュした行・他のプロセスが追記中の末尾行は無視
+                    print(f"⚠️ 不完全なジャーナル行をスキップしました: {self.journal_path}")
+                    continue
+                
+                if entry.get('op') == 'add':
+                    article = entry['article']
+                    if article['id'] in articles_by_id:
+                        articles_by_id[article['id']].clear()
+                        articles_by_id[article['id']].update(article)
+                    else:
+                        articles.append(article)
+                        articles_by_id[article['id']] = article
+                elif entry.get('op') == 'update':
+                    article = articles_by_id.get(entry['id'])
+                    if article is not None:
+                        article.update(entry['fields'])
+                replayed += 1
+        
+        return replayed
+    
+    def _append_journal(self, entry: Dict) -> None:
+        """ジャーナルに1行追記（1回のwriteで書き込みfsyncする）"""
+        self._append_journal_entries([entry])
+    
+    def _append_journal_entries(self, entries: List[Dict]) -> None:
+        """ジャーナルに複数行を追記（まとめて1回のwriteで書き込みfsyncする）"""
+        data = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries).encode('utf-8')
+        with self.lock():
+            with open(self.journal_path, 'a+b') as f:
+                # ロック中に改行で終わっていなければ書き込み途中でクラッシュした行のため、
+                # 追記する行が連結されないよう改行で区切る（壊れた行は再生時に読み飛ばされる）
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        data = b'\n' + data
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        self.journal_entries += len(entries)
+    
+    def save_all(self, articles_data: Dict) -> None:
+        # 全体保存はスナップショットの書き出し＋ジャーナルの破棄（コンパクション）
+        with self.lock():
+            super().save_all(articles_data)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+        self.journal_entries = 0
+    
+    def compact(self, articles_data: Dict) -> None:
+        """ジャーナルをスナップショットに畳み込む"""
+        self.save_all(articles_data)
+    
+    def _compact_if_needed(self, articles_data: Dict) -> None:
+        if self.compact_threshold and self.journal_entries >= self.compact_threshold:
+            print(f"🗜️ ジャーナルが{self.journal_entries}件に達したためコンパクションします")
+            self.compact(articles_data)
+    
+    def insert_article(self, articles_data: Dict, article: Dict) -> None:
+        self._append_journal({"op": "add", "article": article})
+        self._compact_if_needed(articles_data)
+    
+    def insert_articles(self, articles_data: Dict, articles: List[Dict]) -> None:
+        if self.compact_threshold and self.journal_entries + len(articles) >= self.compact_threshold:
+            # どうせコンパクションになる大量追加はジャーナルを経由せずスナップショットに直接書く
+            self.compact(articles_data)
+            return
+        self._append_journal_entries([{"op": "add", "article": article} for article in articles])
+    
+    def update_article(self, articles_data: Dict, article: Dict, fields: List[str] = None) -> None:
+        if fields is None:
+            entry = {"op": "add", "article": article}
+        else:
+            entry = {"op": "update", "id": article['id'],
+                     "fields": {field: article.get(field) for field in fields}}
+        self._append_journal(entry)
+        self._compact_if_needed(articles_data)
+
+
+class SqliteArticleStorage(ArticleStorage):
+    """
+    SQLiteに記事データを保存するストレージ
+    
+    WALモードで動作し、記事の追加・更新は1行単位のトランザクションで行う
+    """
+    
+    backend_name = "sqlite"
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            content TEXT NOT NULL,
+            category TEXT,
+            status TEXT NOT NULL DEFAULT 'active',
+            created_at TEXT,
+            tags TEXT NOT NULL DEFAULT '[]',
+            extra TEXT NOT NULL DEFAULT '{}'
+        );
+        CREATE INDEX IF NOT EXISTS idx_articles_status ON articles(status);
+        CREATE INDEX IF NOT EXISTS idx_articles_category ON articles(category);
+        CREATE TABLE IF NOT EXISTS article_tags (
+            article_id INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (article_id, tag)
+        );
+        CREATE INDEX IF NOT EXISTS idx_article_tags_tag ON article_tags(tag);
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+    
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._conn = None
+    
+    def _current_signature(self):
+        # 他の接続がコミットするとdata_versionが変わる（自接続の書き込みでは変わらない）
+        return self._connect().execute("PRAGMA data_version").fetchone()[0]
+    
+    def _connect(self) -> sqlite3.Connection:
+        """接続を取得（初回はスキーマを作成）"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+    
+    @staticmethod
+    def _row_to_article(row) -> Dict:
+        """DB行を記事辞書に変換"""
+        article_id, title, content, category, status, created_at, tags, extra = row
+        article = {
+            "id": article_id,
+            "title": title,
+            "content": content,
+            "tags": json.loads(tags),
+            "category": category,
+            "created_at": created_at,
+            "status": status
+        }
+        article.update(json.loads(extra))
+        return article
+    
+    @staticmethod
+    def _article_to_row(article: Dict) -> tuple:
+        """記事辞書をDB行に変換"""
+        extra = {key: value for key, value in article.items()
+                 if key not in ARTICLE_COLUMNS and key != 'tags'}
+        return (
+            article['id'],
+            article.get('title', ''),
+            article.get('content', ''),
+            article.get('category', ''),
+            article.get('status', 'active'),
+            article.get('created_at'),
+            json.dumps(article.get('tags', []), ensure_ascii=False),
+            json.dumps(extra, ensure_ascii=False)
+        )
+    
+    def _write_article(self, conn: sqlite3.Connection, article: Dict) -> None:
+        """記事1件とタグインデックスを書き込み（トランザクション内で呼ぶ）"""
+        conn.execute(
+            "INSERT OR REPLACE INTO articles (id, title, content, category, status, created_at, tags, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            self._article_to_row(article)
+        )
+        conn.execute("DELETE FROM article_tags WHERE article_id = ?", (article['id'],))
+        conn.executemany(
+            "INSERT OR IGNORE INTO article_tags (article_id, tag) VALUES (?, ?)",
+            [(article['id'], tag) for tag in article.get('tags', [])]
+        )
+    
+    def load(self, lazy: bool = False) -> Optional[Dict]:
+        conn = self._connect()
+        
+        if lazy:
+            articles = [LazyArticle(self._row_to_article(row), self.read_content) for row in conn.execute(
+                "SELECT id, title, NULL, category, status, created_at, tags, extra FROM articles ORDER BY id"
+            )]
+            for article in articles:
+                del article['content']
+        else:
+            articles = [self._row_to_article(row) for row in conn.execute(
+                "SELECT id, title, content, category, status, created_at, tags, extra FROM articles ORDER BY id"
+            )]
+        settings = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM settings")}
+        
+        return {"articles": articles, "settings": settings}
+    
+    def read_content(self, article_id: int) -> str:
+        row = self._connect().execute("SELECT content FROM articles WHERE id = ?", (article_id,)).fetchone()
+        if row is None:
+            raise KeyError(article_id)
+        return row[0]
+    
+    def save_all(self, articles_data: Dict) -> None:
+        conn = self._connect()
+        with conn:
+            # 遅延読み込みの記事は自身の行から本文を読むため、全削除せず置き換え→不要行の削除の順で行う
+            article_ids = set()
+            for article in articles_data.get('articles', []):
+                self._write_article(conn, article)
+                article_ids.add(article['id'])
+            stale_ids = [(article_id,) for (article_id,) in conn.execute("SELECT id FROM articles")
+                         if article_id not in article_ids]
+            conn.executemany("DELETE FROM article_tags WHERE article_id = ?", stale_ids)
+            conn.executemany("DELETE FROM articles WHERE id = ?", stale_ids)
+            conn.execute("DELETE FROM settings")
+            conn.executemany(
+                "INSERT INTO settings (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value, ensure_ascii=False))
+                 for key, value in articles_data.get('settings', {}).items()]
+            )
+    
+    def insert_article(self, articles_data: Dict, article: Dict) -> None:
+        conn = self._connect()
+        with conn:
+            self._write_article(conn, article)
+    
+    def insert_articles(self, articles_data: Dict, articles: List[Dict]) -> None:
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO articles (id, title, content, category, status, created_at, tags, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._article_to_row(article) for article in articles)
+            )
+            conn.executemany("DELETE FROM article_tags WHERE article_id = ?",
+                             ((article['id'],) for article in articles))
+            conn.executemany(
+                "INSERT OR IGNORE INTO article_tags (article_id, tag) VALUES (?, ?)",
+                ((article['id'], tag) for article in articles for tag in article.get('tags', []))
+            )
+    
+    def update_article(self, articles_data: Dict, article: Dict, fields: List[str] = None) -> None:
+        self.insert_article(articles_data, article)
+    
+    def query_article_ids(self, status: str = None, category: str = None, tag: str = None) -> Optional[List[int]]:
+        conn = self._connect()
+        
+        sql = "SELECT a.id FROM articles a"
+        conditions = []
+        params = []
+        if tag is not None:
+            sql += " JOIN article_tags t ON t.article_id = a.id"
+            conditions.append("t.tag = ?")
+            params.append(tag)
+        if status is not None:
+            conditions.append("a.status = ?")
+            params.append(status)
+        if category is not None:
+            conditions.append("a.category = ?")
+            params.append(category)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY a.id"
+        
+        return [row[0] for row in conn.execute(sql, params)]
+    
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+STORAGE_BACKENDS = {
+    JsonArticleStorage.backend_name: JsonArticleStorage,
+    JournalArticleStorage.backend_name: JournalArticleStorage,
+    SqliteArticleStorage.backend_name: SqliteArticleStorage
+}
+
+
+def journal_path_for(path: str) -> str:
+    """スナップショットのパスからジャーナルのパスを求める（data/articles.json → data/articles.journal.jsonl）"""
+    return os.path.splitext(path)[0] + JOURNAL_SUFFIX
+
+
+def create_storage(path: str, backend: str = None) -> ArticleStorage:
+    """
+    パスとバックエンド名からストレージを生成
+    
+    Args:
+        path: 保存先ファイルのパス
+        backend: バックエンド名（json, journal, sqlite）。省略時は拡張子から判定
+    
+    Returns:
+        ArticleStorage: ストレージインスタンス
+    """
+    if not backend:
+        if path.lower().endswith(SQLITE_EXTENSIONS):
+            backend = "sqlite"
+        elif os.path.exists(journal_path_for(path)):
+            # 未コンパクションのジャーナルが残っている場合は取りこぼさないようジャーナルモードで開く
+            backend = "journal"
+        else:
+            backend = "json"
+    
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"未対応のストレージバックエンド: {backend}")
+    
+    return STORAGE_BACKENDS[backend](path)
+
+
+def convert_storage(source: ArticleStorage, destination: ArticleStorage) -> int:
+    """
+    ストレージ間で記事データを変換（インポート/エクスポート）
+    
+    Args:
+        source: 変換元ストレージ
+        destination: 変換先ストレージ
+    
+    Returns:
+        int: 変換した記事数
+    """
+    articles_data = source.load()
+    if articles_data is None:
+        raise FileNotFoundError(f"変換元の記事データが見つかりません: {source.path}")
+    
+    destination.save_all(articles_data)
+    return len(articles_data.get('articles', []))
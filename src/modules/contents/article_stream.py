@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+生成ストリーム解析モジュール
+ストリーミング生成中のテキストからタイトルと本文のブロックを逐次取り出す
+"""
+
+from typing import Callable, List, Optional
+
+TITLE_PREFIXES = ("タイトル:", "# ")
+
+
+class IncrementalArticleParser:
+    """
+    生成テキストの差分を受け取り、行単位でタイトルと本文を解析する
+    
+    最初の空でない行（「タイトル:」「# 」があれば除去）をタイトルとして確定した時点で通知し、
+    本文は空行で区切られたブロック（コードブロックは閉じるまで1ブロック）ごとに通知する。
+    行の扱いは ContentGenerator._parse_generated_content と同じく前後の空白を除去する
+    """
+    
+    def __init__(self, on_title: Callable[[str], None] = None, on_block: Callable[[str], None] = None):
+        """
+        Args:
+            on_title: タイトル確定時に呼ばれる関数
+            on_block: 本文のブロックが揃うたびに呼ばれる関数
+        """
+        self.on_title = on_title
+        self.on_block = on_block
+        self.title: Optional[str] = None
+        self._parts: List[str] = []
+        self._pending = ""
+        self._block_lines: List[str] = []
+        self._in_code_block = False
+    
+    def feed(self, delta: str) -> None:
+        """
+        生成テキストの差分を追加
+        
+        Args:
+            delta: 差分テキスト
+        """
+        self._parts.append(delta)
+        self._pending += delta
+        if '\n' not in delta:
+            return
+        
+        *lines, self._pending = self._pending.split('\n')
+        for line in lines:
+            self._process_line(line.strip())
+    
+    def _process_line(self, line: str) -> None:
+        if self.title is None:
+            if not line:
+                return
+            for prefix in TITLE_PREFIXES:
+                if line.startswith(prefix):
+                    line = line[len(prefix):].strip()
+                    break
+            self.title = line
+            if self.on_title:
+                self.on_title(line)
+            return
+        
+        if line.startswith("```"):
+            self._in_code_block = not self._in_code_block
+        if not line and not self._in_code_block:
+            self._flush_block()
+            return
+        self._block_lines.append(line)
+    
+    def _flush_block(self) -> None:
+        if not self._block_lines:
+            return
+        block = '\n'.join(self._block_lines)
+        self._block_lines = []
+        if self.on_block:
+            self.on_block(block)
+    
+    def close(self) -> str:
+        """
+        ストリームの終了（途中の行・ブロックを確定）
+        
+        Returns:
+            str: 生成テキスト全体
+        """
+        if self._pending:
+            self._process_line(self._pending.strip())
+            self._pending = ""
+        self._flush_block()
+        return ''.join(self._parts)
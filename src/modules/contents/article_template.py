@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+記事テンプレートモジュール
+記事タイトル・本文のプレースホルダー（{date}, {weekday}, 設定の独自変数）の置換
+"""
+
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# {name} 形式と、article_templates.txt で使われている [name] 形式
+PLACEHOLDER_PATTERN = re.compile(r'\{(\w+)\}|\[([^\[\]\n]+)\]')
+WEEKDAY_NAMES = ['月', '火', '水', '木', '金', '土', '日']
+DEFAULT_DATE_FORMAT = '%Y年%m月%d日'
+
+
+class CompiledTemplate:
+    """
+    プレースホルダーの位置を解析済みのテンプレート
+    
+    固定文字列と変数名のスロットに分割しておき、描画は変数を埋めて1回joinするだけで行う
+    """
+    
+    __slots__ = ('source', '_parts', '_slots')
+    
+    def __init__(self, source: str, parts: List[str], slots: List[Tuple[int, str]]):
+        self.source = source
+        self._parts = parts
+        self._slots = slots
+    
+    @property
+    def placeholders(self) -> List[str]:
+        """テンプレート中の変数名（出現順）"""
+        return [name for _, name in self._slots]
+    
+    def render(self, variables: Dict[str, str]) -> str:
+        """
+        変数を埋め込んで文字列を生成
+        
+        Args:
+            variables: 変数名→値
+        
+        Returns:
+            str: 描画結果（プレースホルダーがない場合は元の文字列そのもの）
+        """
+        if not self._slots:
+            return self.source
+        
+        parts = self._parts[:]
+        for position, name in self._slots:
+            parts[position] = variables[name]
+        return ''.join(parts)
+
+
+class TemplateEngine:
+    """
+    記事データの設定（date_format, template_variables）に基づくテンプレートエンジン
+    
+    組み込み変数は {date}（date_formatで整形した今日の日付）と {weekday}（曜日）。
+    settings.template_variables の独自変数は {name} と [name] のどちらでも参照でき、
+    未定義の名前は置換せずそのまま残す
+    """
+    
+    BUILTIN_VARIABLES = ('date', 'weekday')
+    
+    def __init__(self, date_format: str = DEFAULT_DATE_FORMAT, variables: Dict[str, str] = None):
+        """
+        Args:
+            date_format: {date} の日付フォーマット
+            variables: 独自変数（変数名→値）
+        """
+        self.date_format = date_format
+        self.custom_variables = {name: str(value) for name, value in (variables or {}).items()}
+        self._variable_names = set(self.BUILTIN_VARIABLES) | set(self.custom_variables)
+        self._variables_cache: Optional[Tuple[str, Dict[str, str]]] = None
+    
+    @classmethod
+    def from_settings(cls, settings: Dict) -> 'TemplateEngine':
+        """記事データの settings からテンプレートエンジンを生成"""
+        return cls(settings.get('date_format', DEFAULT_DATE_FORMAT),
+                   settings.get('template_variables', {}))
+    
+    def compile(self, text: str) -> CompiledTemplate:
+        """
+        文字列をテンプレートとして解析
+        
+        Args:
+            text: タイトルまたは本文
+        
+        Returns:
+            CompiledTemplate: 解析済みテンプレート
+        """
+        parts = []
+        slots = []
+        last_end = 0
+        
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            if match.group(1) is not None:
+                name = match.group(1)
+                if name not in self._variable_names:
+                    continue
+            else:
+                name = match.group(2)
+                if name not in self.custom_variables:
+                    continue
+            if match.start() > last_end:
+                parts.append(text[last_end:match.start()])
+            slots.append((len(parts), name))
+            parts.append('')
+            last_end = match.end()
+        
+        if not slots:
+            return CompiledTemplate(text, [], [])
+        
+        if last_end < len(text):
+            parts.append(text[last_end:])
+        return CompiledTemplate(text, parts, slots)
+    
+    def variables(self, now: datetime = None) -> Tuple[str, Dict[str, str]]:
+        """
+        指定日時の変数一覧を取得（同じ日付の間は同じ辞書を返す）
+        
+        Args:
+            now: 日時（省略時は現在日時）
+        
+        Returns:
+            Tuple[str, Dict[str, str]]: (日付キー YYYY-MM-DD, 変数名→値)
+        """
+        now = now or datetime.now()
+        date_key = now.strftime('%Y-%m-%d')
+        
+        if self._variables_cache is None or self._variables_cache[0] != date_key:
+            variables = dict(self.custom_variables)
+            variables['date'] = now.strftime(self.date_format)
+            variables['weekday'] = WEEKDAY_NAMES[now.weekday()]
+            self._variables_cache = (date_key, variables)
+        
+        return self._variables_cache
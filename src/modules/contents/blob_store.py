@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+圧縮ブロブストアモジュール
+記事本文の版（生成直後・校閲後・バズ要素追加後など）をハッシュで参照する圧縮ファイルとして保存する
+（zstandardがあればzstd、なければzlib。どちらも記事コーパスから学習した共有辞書を使う）
+"""
+
+import hashlib
+import os
+import re
+import struct
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+from .article_storage import atomic_write
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+BLOB_STORE_SUFFIX = '.blobs'
+
+# ブロブのヘッダー（マジック, 圧縮方式, 辞書ID, 元のバイト数）
+BLOB_HEADER = struct.Struct('>2s1s8sI')
+BLOB_MAGIC = b'NB'
+CODEC_ZLIB = b'z'
+CODEC_ZSTD = b's'
+NO_DICTIONARY = b'0' * 8
+
+# 辞書の学習では本文を行・文（。！？の後）単位に区切る
+SEGMENT_PATTERN = re.compile(r'[^\n。！？]*[。！？]?')
+
+# zlibの辞書は末尾32KBまでしか参照されない
+ZLIB_DICTIONARY_SIZE = 32 * 1024
+ZSTD_DICTIONARY_SIZE = 112 * 1024
+
+
+def train_zlib_dictionary(samples: Iterable[str], size: int = ZLIB_DICTIONARY_SIZE) -> bytes:
+    """
+    zlib用の共有辞書を学習
+    
+    複数の記事に共通して現れる行・文（見出し・定型文など）を「出現記事数 × バイト数」の順に選び、
+    価値の高いものほど辞書の末尾（圧縮時に近い距離で参照できる位置）に置く
+    
+    Args:
+        samples: 記事本文のサンプル
+        size: 辞書の最大バイト数
+    
+    Returns:
+        bytes: 辞書（共通する行がない場合は空）
+    """
+    document_frequency = Counter()
+    for text in samples:
+        segments = {segment.strip() for segment in SEGMENT_PATTERN.findall(text)}
+        document_frequency.update(segment for segment in segments if 4 <= len(segment) <= 256)
+    
+    ranked = sorted(((count * len(segment.encode('utf-8')), segment)
+                     for segment, count in document_frequency.items() if count >= 2), reverse=True)
+    chosen = []
+    total = 0
+    for _, segment in ranked:
+        data = segment.encode('utf-8')
+        if total + len(data) > size:
+            continue
+        chosen.append(data)
+        total += len(data)
+    
+    return b''.join(reversed(chosen))
+
+
+class BlobStore:
+    """
+    内容アドレス方式（本文のSHA-256がキー）の圧縮ブロブストア
+    
+    ブロブは <ディレクトリ>/<キー先頭2文字>/<キー> に1ファイルずつ保存し、同じ内容は1回だけ書く。
+    各ブロブには圧縮方式と辞書IDを記録するため、辞書を学習し直しても古いブロブは読める
+    """
+    
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: 保存先のディレクトリ（記事データのパス + .blobs）
+        """
+        self.directory = directory
+        self.codec = CODEC_ZSTD if ZSTD_AVAILABLE else CODEC_ZLIB
+        self._dictionaries: Dict[Tuple[bytes, bytes], bytes] = {}
+        self._current_dictionary_id: Optional[bytes] = None
+    
+    @staticmethod
+    def key_for(text: str) -> str:
+        """本文のキー（SHA-256の16進数）"""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    def _blob_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+    
+    def _dictionary_path(self, codec: bytes, dictionary_id: bytes) -> str:
+        return os.path.join(self.directory, 'dictionaries', f"{codec.decode()}-{dictionary_id.decode()}.dict")
+    
+    def _current_dictionary_path(self) -> str:
+        return os.path.join(self.directory, 'dictionaries', f"current-{self.codec.decode()}")
+    
+    def _load_dictionary(self, codec: bytes, dictionary_id: bytes) -> bytes:
+        cache_key = (codec, dictionary_id)
+        if cache_key not in self._dictionaries:
+            with open(self._dictionary_path(codec, dictionary_id), 'rb') as f:
+                self._dictionaries[cache_key] = f.read()
+        return self._dictionaries[cache_key]
+    
+    def current_dictionary_id(self) -> bytes:
+        """書き込みに使う辞書のID（未学習の場合は NO_DICTIONARY）"""
+        if self._current_dictionary_id is None:
+            try:
+                with open(self._current_dictionary_path(), 'rb') as f:
+                    self._current_dictionary_id = f.read().strip() or NO_DICTIONARY
+            except FileNotFoundError:
+                self._current_dictionary_id = NO_DICTIONARY
+        return self._current_dictionary_id
+    
+    def train_dictionary(self, samples: Iterable[str]) -> Optional[str]:
+        """
+        記事本文のサンプルから共有辞書を学習し、以後の書き込みに使う
+        
+        Args:
+            samples: 記事本文のサンプル
+        
+        Returns:
+            Optional[str]: 辞書ID（学習できなかった場合は None）
+        """
+        samples = [text for text in samples if text]
+        if self.codec == CODEC_ZSTD:
+            try:
+                dictionary = zstandard.train_dictionary(
+                    ZSTD_DICTIONARY_SIZE, [text.encode('utf-8') for text in samples]).as_bytes()
+            except Exception as e:
+                print(f"⚠️ zstd辞書の学習に失敗しました（サンプル不足など）: {e}")
+                return None
+        else:
+            dictionary = train_zlib_dictionary(samples)
+        
+        if not dictionary:
+            print("⚠️ 辞書に使える共通部分が見つかりませんでした")
+            return None
+        
+        dictionary_id = hashlib.sha256(dictionary).hexdigest()[:8].encode()
+        os.makedirs(os.path.dirname(self._dictionary_path(self.codec, dictionary_id)), exist_ok=True)
+        atomic_write(self._dictionary_path(self.codec, dictionary_id), lambda f: f.write(dictionary))
+        atomic_write(self._current_dictionary_path(), lambda f: f.write(dictionary_id))
+        self._dictionaries[(self.codec, dictionary_id)] = dictionary
+        self._current_dictionary_id = dictionary_id
+        return dictionary_id.decode()
+    
+    def _compress(self, data: bytes, dictionary_id: bytes) -> bytes:
+        dictionary = None if dictionary_id == NO_DICTIONARY else self._load_dictionary(self.codec, dictionary_id)
+        if self.codec == CODEC_ZSTD:
+            dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            return zstandard.ZstdCompressor(level=10, dict_data=dict_data).compress(data)
+        
+        compressor = zlib.compressobj(9, zdict=dictionary) if dictionary else zlib.compressobj(9)
+        return compressor.compress(data) + compressor.flush()
+    
+    @staticmethod
+    def _decompress(codec: bytes, payload: bytes, dictionary: Optional[bytes]) -> bytes:
+        if codec == CODEC_ZSTD:
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstdで圧縮されたブロブの読み込みにはzstandardが必要です")
+            dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(payload)
+        
+        decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+        return decompressor.decompress(payload) + decompressor.flush()
+    
+    def put(self, text: str) -> str:
+        """
+        本文を圧縮して保存（同じ内容が保存済みなら書き込まない）
+        
+        Args:
+            text: 本文
+        
+        Returns:
+            str: キー
+        """
+        key = self.key_for(text)
+        path = self._blob_path(key)
+        if os.path.exists(path):
+            return key
+        
+        data = text.encode('utf-8')
+        dictionary_id = self.current_dictionary_id()
+        payload = self._compress(data, dictionary_id)
+        header = BLOB_HEADER.pack(BLOB_MAGIC, self.codec, dictionary_id, len(data))
+        
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, lambda f: f.write(header + payload))
+        return key
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        本文を読み込み
+        
+        Args:
+            key: キー
+        
+        Returns:
+            Optional[str]: 本文（保存されていない・読めない場合は None）
+        """
+        try:
+            with open(self._blob_path(key), 'rb') as f:
+                blob = f.read()
+            magic, codec, dictionary_id, _ = BLOB_HEADER.unpack_from(blob)
+            if magic != BLOB_MAGIC:
+                raise ValueError("ブロブの形式が正しくありません")
+            dictionary = None if dictionary_id == NO_DICTIONARY else self._load_dictionary(codec, dictionary_id)
+            return self._decompress(codec, blob[BLOB_HEADER.size:], dictionary).decode('utf-8')
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"❌ ブロブの読み込みエラー ({key}): {e}")
+            return None
+    
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._blob_path(key))
+    
+    def stats(self) -> Dict:
+        """
+        保存状況を集計（ヘッダーだけを読む）
+        
+        Returns:
+            Dict: blobs（件数）, raw_bytes（元のバイト数）, stored_bytes（保存バイト数）,
+                  codec（書き込みの圧縮方式）, dictionary（書き込みに使う辞書ID）
+        """
+        blobs = 0
+        raw_bytes = 0
+        stored_bytes = 0
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                shard = os.path.join(self.directory, name)
+                if len(name) != 2 or not os.path.isdir(shard):
+                    continue
+                for key in os.listdir(shard):
+                    path = os.path.join(shard, key)
+                    with open(path, 'rb') as f:
+                        header = f.read(BLOB_HEADER.size)
+                    if len(header) < BLOB_HEADER.size:
+                        continue
+                    blobs += 1
+                    raw_bytes += BLOB_HEADER.unpack(header)[3]
+                    stored_bytes += os.path.getsize(path)
+        
+        dictionary_id = self.current_dictionary_id()
+        return {
+            "blobs": blobs,
+            "raw_bytes": raw_bytes,
+            "stored_bytes": stored_bytes,
+            "codec": "zstd" if self.codec == CODEC_ZSTD else "zlib",
+            "dictionary": None if dictionary_id == NO_DICTIONARY else dictionary_id.decode()
+        }
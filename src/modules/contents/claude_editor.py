@@ -1,24 +1,29 @@
 #!/usr/bin/env python3
 """
 Claude記事編集エージェント
-LangChainを使用してClaude APIで記事の校閲・改善を行う
+LangChainのプロンプトテンプレートとAnthropic SDKを使用してClaude APIで記事の校閲・改善を行う
 """
 
+import importlib.util
 import os
-import json
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Tuple
 from datetime import datetime
+from .editor_prompts import BUZZ_SYSTEM_PROMPT, PROOFREAD_SYSTEM_PROMPT, TITLE_SYSTEM_PROMPT
+from .llm_cache import cached_completion
+from .llm_clients import cache_provider_name, get_anthropic_client, requires_api_key
+from .llm_usage import log_prompt_cache, merge_usage, usage_from_anthropic
+from .local_llm import complete_with_local_llm
+from .token_budget import plan_max_tokens
 
 try:
-    from langchain_anthropic import ChatAnthropic
-    from langchain_core.messages import HumanMessage, SystemMessage
     from langchain_core.prompts import ChatPromptTemplate
-    from langchain_core.output_parsers import StrOutputParser
     LANGCHAIN_AVAILABLE = True
 except ImportError:
     LANGCHAIN_AVAILABLE = False
     print("⚠️ LangChain関連ライブラリがインストールされていません")
 
+ANTHROPIC_AVAILABLE = importlib.util.find_spec("anthropic") is not None
+
 class ClaudeEditor:
     """Claude APIを使った記事編集エージェント"""
     
@@ -32,36 +37,102 @@ class ClaudeEditor:
         """
         self.config = config or {}
         self.api_key = api_key or self.config.get("api_key") or os.getenv("ANTHROPIC_API_KEY")
+        self.provider = self.config.get("provider", "anthropic")
         self.client = None
         self.is_available = False
         
         if not LANGCHAIN_AVAILABLE:
             print("❌ LangChain関連ライブラリが不足しています")
             return
+        
+        if not ANTHROPIC_AVAILABLE and self.provider != "fake":
+            print("❌ anthropicライブラリがインストールされていません")
+            return
             
-        if not self.api_key:
+        if not self.api_key and requires_api_key(self.provider):
             print("❌ Anthropic APIキーが設定されていません")
             return
             
         try:
             # 設定から値を取得（デフォルト値付き）
-            model = self.config.get("model", "claude-3-5-sonnet-20241022")
-            temperature = self.config.get("temperature", 0.7)
-            max_tokens = self.config.get("max_tokens", 4000)
+            self.model = self.config.get("model", "claude-3-5-sonnet-20241022")
+            self.temperature = self.config.get("temperature", 0.7)
+            self.max_tokens = self.config.get("max_tokens", 4000)
+            # システムプロンプトにキャッシュの区切り（cache_control）を付けるか
+            self.prompt_caching = self.config.get("prompt_caching", True)
             
-            # Claude クライアントの初期化
-            self.client = ChatAnthropic(
-                model=model,
-                anthropic_api_key=self.api_key,
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
+            # Claude クライアント（同じ設定ならプロセス内で共有し接続を使い回す）
+            if self.provider == "fake":
+                from .fake_llm import FakeAnthropicClient, get_fake_llm_backend
+                
+                self.client = FakeAnthropicClient(get_fake_llm_backend())
+            else:
+                self.client = get_anthropic_client(self.api_key, self.config.get("base_url"))
             self.is_available = True
             print("✅ Claude編集エージェントが初期化されました")
-            print(f"🎨 設定: {model}, temp={temperature}, tokens={max_tokens}")
+            print(f"🎨 設定: {self.model}, temp={self.temperature}, tokens={self.max_tokens}")
         except Exception as e:
             print(f"❌ Claude編集エージェントの初期化に失敗: {e}")
     
+    def _complete(self, prompt: "ChatPromptTemplate", variables: Dict[str, str],
+                  stage: str = None) -> Tuple[str, Dict[str, int]]:
+        """
+        プロンプトに値を埋めてClaudeを呼び出し（同じリクエストの応答がキャッシュにあれば使う）
+        
+        max_tokens は設定値のまま、プロンプトと合わせてコンテキスト長を超える場合は減らす
+        
+        Args:
+            prompt: プロンプトテンプレート
+            variables: テンプレートに埋める値
+            stage: 工程（proofread, buzz, title）。ローカルLLMに割り当てられていればローカルLLMで実行する
+        
+        Returns:
+            Tuple[str, Dict[str, int]]: (応答テキスト, トークン使用量)
+        """
+        messages = prompt.format_messages(**variables)
+        request_messages = [{"role": message.type, "content": message.content} for message in messages]
+        if stage:
+            local_messages = [{"role": "user" if message.type == "human" else message.type, "content": message.content}
+                              for message in messages]
+            local_result = complete_with_local_llm(stage, local_messages)
+            if local_result:
+                return local_result
+        max_tokens = plan_max_tokens(request_messages, self.model, limit=self.max_tokens)
+        
+        system, conversation = self._to_anthropic_messages(messages)
+        
+        def complete():
+            response = self.client.messages.create(model=self.model, max_tokens=max_tokens, system=system,
+                                                   messages=conversation, temperature=self.temperature)
+            usage = usage_from_anthropic(response)
+            log_prompt_cache(usage)
+            text = "".join(block.text for block in response.content if getattr(block, "type", None) == "text")
+            return text, usage
+        
+        return cached_completion(cache_provider_name(dict(self.config, provider=self.provider)), self.model,
+                                 self.temperature, request_messages, complete, max_tokens=max_tokens)
+    
+    def _to_anthropic_messages(self, messages: List) -> Tuple[List[Dict], List[Dict]]:
+        """
+        プロンプトのメッセージをAnthropic Messages API の system と messages に分ける
+        
+        prompt_caching が有効ならシステムプロンプトの末尾にキャッシュ区切り（cache_control）を付ける。
+        システムプロンプトは固定の文字列なので、区切りまでの入力はキャッシュから読まれる
+        （モデルごとの最小トークン数に満たない場合、キャッシュはされない）
+        
+        Args:
+            messages: format_messages で値を埋めたメッセージ
+        
+        Returns:
+            Tuple[List[Dict], List[Dict]]: (system のテキストブロック, user / assistant のメッセージ)
+        """
+        system = [{"type": "text", "text": message.content} for message in messages if message.type == "system"]
+        if system and self.prompt_caching:
+            system[-1]["cache_control"] = {"type": "ephemeral"}
+        conversation = [{"role": "assistant" if message.type == "ai" else "user", "content": message.content}
+                        for message in messages if message.type != "system"]
+        return system, conversation
+    
     def proofread_article(self, title: str, content: str) -> Dict[str, str]:
         """
         記事の校閲を行う
@@ -81,32 +152,21 @@ class ClaudeEditor:
             
             # 校閲用プロンプトテンプレート
             proofreading_prompt = ChatPromptTemplate.from_messages([
-                ("system", """あなたは経験豊富な技術系編集者です。以下の技術記事を校閲してください。
-
-校閲の観点：
-1. 文章の読みやすさと流れ
-2. 技術的な正確性
-3. 誤字脱字・文法チェック
-4. 論理構成の改善
-5. 専門用語の適切な説明
-6. 読者にとっての分かりやすさ
-
-改善点があれば具体的に修正し、改善された記事全文を返してください。
-大幅な構成変更は避け、元の内容の意図を保ちながら品質を向上させてください。"""),
+                ("system", PROOFREAD_SYSTEM_PROMPT),
                 ("human", "タイトル: {title}\n\n記事内容:\n{content}")
             ])
             
             # 校閲実行
-            chain = proofreading_prompt | self.client | StrOutputParser()
-            proofread_content = chain.invoke({
+            proofread_content, usage = self._complete(proofreading_prompt, {
                 "title": title,
                 "content": content
-            })
+            }, "proofread")
             
             print("✅ 校閲完了")
             return {
                 "original_content": content,
                 "proofread_content": proofread_content,
+                "usage": usage,
                 "status": "success"
             }
             
@@ -133,38 +193,21 @@ class ClaudeEditor:
             
             # バズ要素追加プロンプト
             buzz_prompt = ChatPromptTemplate.from_messages([
-                ("system", """あなたは人気技術ブログのコンテンツマーケターです。以下の技術記事にバズ要素を追加してください。
-
-バズ要素の追加方針：
-1. 読者の興味を引く具体的な数値やデータ
-2. 「知らないと損する」「意外と知られていない」などの好奇心を刺激する表現
-3. 実際の開発現場での体験談や失敗談
-4. 最新トレンドとの関連性
-5. 読者が「シェアしたくなる」ような驚きの事実
-6. 具体的なメリット・デメリットの明示
-7. 他の開発者との差別化ポイント
-
-注意点：
-- 技術的な正確性は保つ
-- 過度に煽らない
-- 元の記事の品質を損なわない
-- 自然な文章の流れを保つ
-
-改善された記事全文を返してください。"""),
+                ("system", BUZZ_SYSTEM_PROMPT),
                 ("human", "タイトル: {title}\n\n記事内容:\n{content}")
             ])
             
             # バズ要素追加実行
-            chain = buzz_prompt | self.client | StrOutputParser()
-            buzz_content = chain.invoke({
+            buzz_content, usage = self._complete(buzz_prompt, {
                 "title": title,
                 "content": content
-            })
+            }, "buzz")
             
             print("✅ バズ要素追加完了")
             return {
                 "original_content": content,
                 "buzz_content": buzz_content,
+                "usage": usage,
                 "status": "success"
             }
             
@@ -191,37 +234,18 @@ class ClaudeEditor:
             
             # タイトル改善プロンプト
             title_prompt = ChatPromptTemplate.from_messages([
-                ("system", """あなたは技術ブログのタイトル専門家です。以下の記事に対して、より魅力的で効果的なタイトルを5つ提案してください。
-
-タイトル改善の観点：
-1. SEO効果の高いキーワードを含む
-2. 読者の興味を引く具体性
-3. クリックしたくなる魅力
-4. 技術レベルの明示（初心者向け、実践的など）
-5. 数値や期間の明示（「3分で理解」「5つの方法」など）
-6. 問題解決への期待感
-7. 最新性やトレンド感
-
-各タイトル案の後に、そのタイトルの狙いと効果を1行で説明してください。
-
-形式：
-1. [タイトル案] - [狙いと効果の説明]
-2. [タイトル案] - [狙いと効果の説明]
-...
-
-元のタイトル: {title}"""),
-                ("human", "記事内容の概要:\n{content_summary}")
+                ("system", TITLE_SYSTEM_PROMPT),
+                ("human", "元のタイトル: {title}\n\n記事内容の概要:\n{content_summary}")
             ])
             
             # 記事内容の要約（最初の500文字）
             content_summary = content[:500] + "..." if len(content) > 500 else content
             
             # タイトル改善実行
-            chain = title_prompt | self.client | StrOutputParser()
-            title_suggestions = chain.invoke({
+            title_suggestions, usage = self._complete(title_prompt, {
                 "title": title,
                 "content_summary": content_summary
-            })
+            }, "title")
             
             # 結果をパース
             suggestions = []
@@ -234,6 +258,7 @@ class ClaudeEditor:
                 "original_title": title,
                 "suggestions": suggestions,
                 "raw_response": title_suggestions,
+                "usage": usage,
                 "status": "success"
             }
             
@@ -260,7 +285,8 @@ class ClaudeEditor:
         results = {
             "original_title": title,
             "original_content": content,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "editor": "Claude"
         }
         
         # 1. 校閲
@@ -292,6 +318,8 @@ class ClaudeEditor:
             results["title_error"] = title_result["error"]
         
         results["final_content"] = final_content
+        results["usage"] = merge_usage(proofreading_result.get("usage"), buzz_result.get("usage"),
+                                       title_result.get("usage"))
         results["improvement_completed"] = True
         
         print("\n✅ 包括的改善完了！")
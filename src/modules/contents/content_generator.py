@@ -2,15 +2,24 @@
 """
 コンテンツ生成モジュール
 LLMを使用した記事の自動生成
-将来的にOpenAI API、Claude API、ローカルLLM等に対応予定
+OpenAI API と、OpenAI互換のローカルLLM（llama.cpp server / vLLM / Ollama）・負荷試験用のフェイクLLMに対応
 """
 
-import json
+import asyncio
 import random
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from .article_stream import IncrementalArticleParser
 from .data_manager import DataManager
 from .claude_editor import ClaudeEditor
+from .llm_cache import bypass_llm_cache, lookup_cached_response, store_cached_response
+from .llm_clients import (CHAT_COMPLETIONS_PROVIDERS, cache_provider_name, create_async_chat_client, get_chat_client,
+                          load_llm_config_file, requires_api_key)
+from .llm_usage import log_prompt_cache, merge_usage, usage_from_openai
+from .local_llm import llm_settings_for_stage
+from .template_registry import TemplateRegistry
+from .token_budget import plan_max_tokens
 
 try:
     from .openai_editor import OpenAIEditor
@@ -19,6 +28,34 @@ except ImportError:
     OPENAI_EDITOR_AVAILABLE = False
     print("⚠️ OpenAI編集機能が利用できません")
 
+# OpenAIでの記事生成に使うシステムプロンプト
+GENERATION_SYSTEM_PROMPT = """あなたは10年以上の経験を持つシニアソフトウェアエンジニアで、技術ブログの執筆とテクニカルライティングを専門としています。
+
+専門性と特徴:
+- 技術的に正確で実践的、かつ非常に詳細な内容を提供する
+- 複雑な技術概念を段階的に分かりやすく説明する高度な能力
+- 豊富なコード例、実装パターン、具体的な手順を含めた包括的な解説ができる
+- 初心者から上級者まで、読者のレベルに応じて適切な深さで内容を調整する
+- 最新の技術トレンドと豊富な実践的経験の両方を持つ
+- 実際のプロジェクトでの経験に基づいた具体的なアドバイスを提供できる
+
+記事執筆の品質基準（厳格に遵守）:
+- 技術的正確性と検証可能性を最優先する
+- 実際に動作し、読者が試せる具体的で詳細な例を豊富に提供する
+- 読者が記事を読んだ後、即座に実践できるような詳細なガイドを作成する
+- 専門用語は必ず詳細に説明し、初心者から上級者まで理解できるようにする
+- 論理的で構造化された、非常に読みやすい文章を書く
+- 背景情報、実装手順、ベストプラクティス、トラブルシューティングを包括的に含める
+- 文字数制限を意識し、指定された文字数範囲を必ず満たす
+- 実践的な価値が高く、読者の技術スキル向上に直接貢献する内容にする
+
+執筆スタイル:
+- 詳細で包括的、かつ実践的
+- 段階的で論理的な構成
+- 具体例とコードを豊富に使用
+- 読者との対話を意識した親しみやすさも保持"""
+
+
 class ContentGenerator:
     def __init__(self, data_manager: DataManager = None):
         """
@@ -29,34 +66,21 @@ class ContentGenerator:
         """
         self.data_manager = data_manager or DataManager()
         self.llm_config = self._load_llm_config()
-        self.generation_templates = self._load_generation_templates()
+        self.template_registry = TemplateRegistry()
         self.claude_editor = None
         self.openai_editor = None
+        self.last_usage: Dict[str, int] = {}  # 直前の記事生成で使ったトークン数
+        self.last_stream_stats: Dict[str, float] = {}  # 直前のストリーミング生成のTTFT・生成速度
+        self.last_method: Optional[str] = None  # 直前の記事生成で実際に使った生成方法（llm / template）
         self._init_claude_editor()
         self._init_openai_editor()
     
     def _load_llm_config(self) -> Dict:
         """LLM設定を読み込み"""
         try:
-            import os
-            import json
-            
-            # 設定ファイルのパスを確認
-            config_paths = [
-                "llm_config.json",
-                "../llm_config.json", 
-                "../../llm_config.json"
-            ]
-            
-            config_data = None
-            for config_path in config_paths:
-                if os.path.exists(config_path):
-                    with open(config_path, 'r', encoding='utf-8') as f:
-                        config_data = json.load(f)
-                    print(f"✅ LLM設定ファイルを読み込みました: {config_path}")
-                    break
+            config_data = load_llm_config_file()
             
-            if config_data and "llm_settings" in config_data:
+            if "llm_settings" in config_data:
                 llm_config = config_data["llm_settings"]
                 print(f"🤖 LLM設定: {llm_config['provider']}/{llm_config['model']} (有効: {llm_config.get('enabled', False)})")
                 return llm_config
@@ -74,161 +98,102 @@ class ContentGenerator:
             print(f"⚠️ LLM設定読み込みエラー: {e}")
             return {"enabled": False}
     
-    def _load_generation_templates(self) -> List[Dict]:
-        """記事生成テンプレートを読み込み（テックブログ向けに拡張）"""
-        return [
-            {
-                "type": "tech_tutorial",
-                "prompt": "特定の技術やツールの使い方を、実際のコード例や詳細な手順を交えて徹底的に解説してください。初心者から中級者が完全に理解し、実際に実践できるよう、非常に丁寧に説明してください。環境構築から実装、トラブルシューティングまで網羅してください。",
-                "style": "技術解説・教育的で非常に詳細な文体",
-                "length": "1500-2200文字"
-            },
-            {
-                "type": "tech_deep_dive",
-                "prompt": "特定の技術概念や仕組みについて、その背景、歴史、原理を非常に深く掘り下げて解説してください。技術的な正確性を最重視し、具体例、図解的説明、実装例を豊富に用いて、読者が完全に理解できるよう詳細に説明してください。",
-                "style": "技術的で分析的、非常に詳細な解説文体",
-                "length": "1800-2500文字"
-            },
-            {
-                "type": "dev_experience",
-                "prompt": "開発プロジェクトや技術的な課題解決の体験について、時系列での詳細なプロセス、遭遇した問題、試行錯誤の過程、最終的な解決策、学んだ教訓を非常に具体的に共有してください。他の開発者が同じ状況に遭遇した際の完全なガイドとなるような実践的な内容にしてください。",
-                "style": "体験談・実践的で非常に具体的な文体",
-                "length": "1400-1900文字"
-            },
-            {
-                "type": "tech_comparison",
-                "prompt": "複数の技術、ツール、フレームワークを詳細に比較し、それぞれの特徴、メリット・デメリット、パフォーマンス、学習コスト、適用場面、実装例を非常に詳しく分析してください。実際の使用経験に基づいた具体的な選択指針と、各技術の詳細な使用例を提供してください。",
-                "style": "比較分析・客観的で非常に詳細な文体",
-                "length": "1600-2300文字"
-            },
-            {
-                "type": "programming_tips",
-                "prompt": "効率的なプログラミング手法、コーディングのベストプラクティス、開発のコツについて、具体的なコード例、実装パターン、避けるべきアンチパターンを豊富に含めて詳しく解説してください。理論だけでなく、実際のプロジェクトで即座に活用できる実践的な内容を詳細に提供してください。",
-                "style": "実践的・教育的で非常に具体的な文体",
-                "length": "1300-1800文字"
-            },
-            {
-                "type": "tech_trends",
-                "prompt": "最新の技術トレンドや業界動向について、その背景、技術的詳細、現在の採用状況、将来への影響、実際の活用事例を非常に詳しく考察してください。技術者の視点から深い洞察と、実際の導入を検討する際の詳細な指針を提供してください。",
-                "style": "分析的・洞察的で非常に専門的な文体",
-                "length": "1500-2100文字"
-            },
-            # 従来のテンプレートも保持（テック向けに大幅拡張）
-            {
-                "type": "learning_share",
-                "prompt": "最近学んだ技術や開発手法について、その詳細な学習過程、使用した学習リソース、実践での具体的な活用方法、遭遇した困難と解決方法を非常に詳しく共有してください。他の開発者にとって完全な学習ガイドとなるような有益な情報と、実践的で具体的なアドバイスを豊富に含めてください。",
-                "style": "教育的・共有型で非常に詳細な文体",
-                "length": "1400-1900文字"
-            },
-            {
-                "type": "problem_solving",
-                "prompt": "開発中に遭遇した技術的な問題とその詳細な解決過程について、問題の発見から原因特定、解決策の検討、実装、検証までの全プロセスを時系列で詳しく解説してください。具体的なデバッグ手順、使用したツール、試行錯誤の詳細を含め、同じ問題に直面する他の開発者が完全に問題を解決できるような包括的な内容にしてください。",
-                "style": "問題解決・実践的で非常に詳細な文体",
-                "length": "1500-2000文字"
-            }
-        ]
+    @property
+    def generation_templates(self) -> List[Dict]:
+        """記事生成テンプレートの一覧（data/generation_templates.json。更新されていれば読み込み直す）"""
+        return self.template_registry.templates()
     
-    def generate_with_llm(self, topic: str = None, template_type: str = None) -> Optional[Tuple[str, str]]:
+    def generate_with_llm(self, topic: str = None, template_type: str = None, stream: bool = None,
+                          on_title: Callable[[str], None] = None,
+                          on_body_chunk: Callable[[str], None] = None) -> Optional[Tuple[str, str]]:
         """
         LLMを使用した記事生成
         
+        下書き生成（draft）がローカルLLMに割り当てられている場合はローカルLLMで生成し、
+        失敗したらクラウドのLLMで生成し直す（local_llm_settings の fallback_to_cloud）
+        
         Args:
             topic: 記事のトピック
             template_type: 生成テンプレートのタイプ
+            stream: ストリーミングで生成するか（省略時はllm_configのstream、なければFalse）
+            on_title: ストリーミング中にタイトルが確定した時点で呼ばれる関数
+            on_body_chunk: ストリーミング中に本文のブロックが揃うたびに、
+                           note用フォーマット調整済みのブロックを渡して呼ばれる関数
             
         Returns:
             Optional[Tuple[str, str]]: (タイトル, 内容) または None
         """
-        if not self.llm_config.get("enabled", False):
+        candidates = [settings for settings in llm_settings_for_stage("draft", self.llm_config)
+                      if settings.get("enabled", False)]
+        if not candidates:
             print("⚠️ LLM機能は現在無効です。フォールバック記事生成を使用します。")
             return None
         
+        for index, settings in enumerate(candidates):
+            if index:
+                print(f"🔁 {settings.get('provider')} で記事生成をやり直します")
+            try:
+                print(f"🤖 {settings.get('provider')} で記事生成を実行中...")
+                
+                # OpenAI API（またはChat Completions API互換のプロバイダー）を使用した記事生成
+                if settings.get("provider") in CHAT_COMPLETIONS_PROVIDERS:
+                    use_stream = settings.get("stream", False) if stream is None else stream
+                    if use_stream:
+                        result = self._generate_with_openai_stream(topic, template_type, on_title, on_body_chunk, settings)
+                    else:
+                        result = self._generate_with_openai(topic, template_type, settings)
+                    if result:
+                        return result
+                else:
+                    print(f"⚠️ 未対応のプロバイダー: {settings.get('provider')}")
+                
+            except Exception as e:
+                print(f"❌ LLM記事生成エラー: {e}")
+        return None
+    
+    def _get_llm_client(self, settings: Dict = None):
+        """記事生成用のクライアント（設定の provider に応じて選ぶ。使えない場合は None）"""
         try:
-            print("🤖 OpenAI APIで記事生成を実行中...")
-            
-            # OpenAI APIを使用した記事生成
-            if self.llm_config.get("provider") == "openai":
-                return self._generate_with_openai(topic, template_type)
-            else:
-                print(f"⚠️ 未対応のプロバイダー: {self.llm_config.get('provider')}")
-                return None
-            
-        except Exception as e:
-            print(f"❌ LLM記事生成エラー: {e}")
-            return None
+            # 共有のクライアント（接続プールを使い回す）
+            return get_chat_client(settings or self.llm_config)
+        except ImportError:
+            print("❌ OpenAIライブラリがインストールされていません。")
+            print("   pip install openai でインストールしてください。")
+        except ValueError as e:
+            print(f"❌ {e}")
+        return None
     
-    def _generate_with_openai(self, topic: str = None, template_type: str = None) -> Optional[Tuple[str, str]]:
-        """OpenAI APIを使用した記事生成"""
+    def _generate_with_openai(self, topic: str = None, template_type: str = None,
+                              settings: Dict = None) -> Optional[Tuple[str, str]]:
+        """OpenAI API（Chat Completions API互換）を使用した記事生成（settings 省略時は llm_config）"""
+        settings = settings or self.llm_config
         try:
-            # OpenAIライブラリのインポート
-            try:
-                import openai
-            except ImportError:
-                print("❌ OpenAIライブラリがインストールされていません。")
-                print("   pip install openai でインストールしてください。")
-                return None
-            
-            # APIキーの設定
-            api_key = self.llm_config.get("api_key")
-            if not api_key:
-                print("❌ OpenAI APIキーが設定されていません。")
+            client = self._get_llm_client(settings)
+            if client is None:
                 return None
             
-            # OpenAI クライアントの初期化
-            client = openai.OpenAI(api_key=api_key)
-            
             # プロンプトの構築
             prompt = self._build_prompt(topic, template_type)
             print(f"📝 プロンプト: {prompt[:100]}...")
             
-            # API呼び出し
-            response = client.chat.completions.create(
-                model=self.llm_config.get("model", "gpt-4o"),
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": """あなたは10年以上の経験を持つシニアソフトウェアエンジニアで、技術ブログの執筆とテクニカルライティングを専門としています。
-
-専門性と特徴:
-- 技術的に正確で実践的、かつ非常に詳細な内容を提供する
-- 複雑な技術概念を段階的に分かりやすく説明する高度な能力
-- 豊富なコード例、実装パターン、具体的な手順を含めた包括的な解説ができる
-- 初心者から上級者まで、読者のレベルに応じて適切な深さで内容を調整する
-- 最新の技術トレンドと豊富な実践的経験の両方を持つ
-- 実際のプロジェクトでの経験に基づいた具体的なアドバイスを提供できる
-
-記事執筆の品質基準（厳格に遵守）:
-- 技術的正確性と検証可能性を最優先する
-- 実際に動作し、読者が試せる具体的で詳細な例を豊富に提供する
-- 読者が記事を読んだ後、即座に実践できるような詳細なガイドを作成する
-- 専門用語は必ず詳細に説明し、初心者から上級者まで理解できるようにする
-- 論理的で構造化された、非常に読みやすい文章を書く
-- 背景情報、実装手順、ベストプラクティス、トラブルシューティングを包括的に含める
-- 文字数制限を意識し、指定された文字数範囲を必ず満たす
-- 実践的な価値が高く、読者の技術スキル向上に直接貢献する内容にする
-
-執筆スタイル:
-- 詳細で包括的、かつ実践的
-- 段階的で論理的な構成
-- 具体例とコードを豊富に使用
-- 読者との対話を意識した親しみやすさも保持"""
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
-                max_tokens=self.llm_config.get("max_tokens", 3500),
-                temperature=self.llm_config.get("temperature", 0.6)
-            )
-            
-            # レスポンスの解析
-            generated_text = response.choices[0].message.content.strip()
+            # API呼び出し（同じリクエストの応答がキャッシュにあれば使う）
+            request = self._build_openai_request(prompt, template_type, settings)
+            cache_key, generated_text = self._lookup_cached_openai_response(request, settings)
+            if generated_text is None:
+                response = client.chat.completions.create(**request)
+                self.last_usage = usage_from_openai(response)
+                log_prompt_cache(self.last_usage)
+                generated_text = response.choices[0].message.content
+            else:
+                self.last_usage = {}
             
             # タイトルと本文の分離
-            title, content = self._parse_generated_content(generated_text)
+            title, content = self._parse_generated_content(generated_text.strip())
             
             if title and content:
+                # 解析できた応答だけをキャッシュする
+                store_cached_response(cache_key, cache_provider_name(settings), request["model"], generated_text,
+                                      self.last_usage)
                 print(f"✅ OpenAI APIで記事生成完了:")
                 print(f"   タイトル: {title}")
                 print(f"   内容: {content[:50]}...")
@@ -241,6 +206,138 @@ class ContentGenerator:
             print(f"❌ OpenAI API呼び出しエラー: {e}")
             return None
     
+    def _generate_with_openai_stream(self, topic: str = None, template_type: str = None,
+                                     on_title: Callable[[str], None] = None,
+                                     on_body_chunk: Callable[[str], None] = None,
+                                     settings: Dict = None) -> Optional[Tuple[str, str]]:
+        """
+        OpenAI APIのストリーミングを使用した記事生成（settings 省略時は llm_config）
+        
+        トークンの差分を受け取りながらタイトルと本文のブロックを逐次解析し、
+        最初のトークンまでの時間（TTFT）と生成速度（tokens/秒）を last_stream_stats に記録する
+        """
+        settings = settings or self.llm_config
+        try:
+            client = self._get_llm_client(settings)
+            if client is None:
+                return None
+            
+            prompt = self._build_prompt(topic, template_type)
+            print(f"📝 プロンプト: {prompt[:100]}...")
+            
+            def emit_title(title: str) -> None:
+                print(f"📰 タイトル: {title}")
+                if on_title:
+                    on_title(title)
+            
+            def emit_block(block: str) -> None:
+                if on_body_chunk:
+                    on_body_chunk(self.format_for_note(block, verbose=False))
+            
+            parser = IncrementalArticleParser(on_title=emit_title, on_block=emit_block)
+            request = self._build_openai_request(prompt, template_type, settings)
+            cache_key, cached_text = self._lookup_cached_openai_response(request, settings)
+            if cached_text is not None:
+                # キャッシュ済みの応答は一度に解析して同じ順で通知する
+                parser.feed(cached_text)
+                generated_text = parser.close()
+                self.last_usage = {}
+                self.last_stream_stats = {}
+                return self._finish_openai_generation(generated_text)
+            
+            started = time.perf_counter()
+            first_token_at = None
+            delta_count = 0
+            usage_chunk = None
+            
+            # API呼び出し（最後のチャンクでトークン数を受け取る。stream_options に未対応のサーバーは stream_usage: false）
+            stream_options = {"stream_options": {"include_usage": True}} if settings.get("stream_usage", True) else {}
+            response = client.chat.completions.create(**request, stream=True, **stream_options)
+            for chunk in response:
+                if getattr(chunk, 'usage', None):
+                    usage_chunk = chunk
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    print(f"⏱️ 最初のトークンまで {first_token_at - started:.2f}秒")
+                delta_count += 1
+                parser.feed(delta)
+            
+            generated_text = parser.close()
+            finished = time.perf_counter()
+            
+            self.last_usage = usage_from_openai(usage_chunk)
+            log_prompt_cache(self.last_usage)
+            # トークン数が返らない場合は差分の数で近似する
+            output_tokens = self.last_usage["output_tokens"] or delta_count
+            generation_seconds = finished - (first_token_at or started)
+            self.last_stream_stats = {
+                "ttft": round(first_token_at - started, 3) if first_token_at else None,
+                "total_seconds": round(finished - started, 3),
+                "output_tokens": output_tokens,
+                "tokens_per_second": round(output_tokens / generation_seconds, 1) if generation_seconds > 0 else None
+            }
+            print(f"⏱️ 生成完了: {self.last_stream_stats['total_seconds']:.1f}秒 "
+                  f"({output_tokens} tokens, {self.last_stream_stats['tokens_per_second']} tokens/秒)")
+            
+            result = self._finish_openai_generation(generated_text)
+            if result:
+                store_cached_response(cache_key, cache_provider_name(settings), request["model"], generated_text,
+                                      self.last_usage)
+            return result
+                
+        except Exception as e:
+            print(f"❌ OpenAI API呼び出しエラー: {e}")
+            return None
+    
+    def _finish_openai_generation(self, generated_text: str) -> Optional[Tuple[str, str]]:
+        """ストリーミング生成したテキストをタイトルと本文に分離"""
+        title, content = self._parse_generated_content(generated_text.strip())
+        if title and content:
+            print(f"✅ OpenAI APIで記事生成完了:")
+            print(f"   タイトル: {title}")
+            print(f"   内容: {content[:50]}...")
+            return title, content
+        else:
+            print("⚠️ 生成されたコンテンツの解析に失敗しました")
+            return None
+    
+    def _lookup_cached_openai_response(self, request: Dict, settings: Dict = None) -> Tuple[Optional[str], Optional[str]]:
+        """OpenAIリクエストの応答をキャッシュから検索（(キー, 応答テキスト)）"""
+        return lookup_cached_response(cache_provider_name(settings or self.llm_config), request["model"],
+                                      request["temperature"], request["messages"], max_tokens=request["max_tokens"])
+    
+    def _build_openai_request(self, prompt: str, template_type: str = None, settings: Dict = None) -> Dict:
+        """
+        OpenAI Chat Completions APIのリクエストパラメータを構築（settings 省略時は llm_config）
+        
+        max_tokens はテンプレート（なければ generation_preferences.target_length）の目標文字数から見積もり、
+        設定の max_tokens を上限とする（context_window があればそのコンテキスト長に収める）
+        """
+        settings = settings or self.llm_config
+        model = settings.get("model", "gpt-4o")
+        messages = [
+            {"role": "system", "content": GENERATION_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        template = self._get_template(template_type)
+        if template:
+            length = template["length"]
+        else:
+            length = self.llm_config.get("generation_preferences", {}).get("target_length", "800-1200文字")
+        
+        return {
+            "model": model,
+            "messages": messages,
+            "max_tokens": plan_max_tokens(messages, model, length, settings.get("max_tokens", 3500),
+                                          settings.get("context_window")),
+            "temperature": settings.get("temperature", 0.6)
+        }
+    
     def _build_prompt(self, topic: str = None, template_type: str = None) -> str:
         """LLM用のプロンプトを構築（テックブログ向けに強化）"""
         from datetime import datetime
@@ -289,34 +386,8 @@ note.comに投稿する非常に詳細で包括的な技術ブログ記事を生
 [非常に詳細で実践的、包括的な本文内容]
 """
         
-        # トピック（テーマ）が指定されている場合
-        if topic:
-            base_prompt += f"\n記事のトピック・テーマ: {topic}\n"
-            base_prompt += "このトピックを中心に、具体的で実践的な内容を詳しく解説してください。\n"
-        
-        # テンプレートタイプが指定されている場合
-        if template_type:
-            template = self._get_template(template_type)
-            if template:
-                base_prompt += f"\n記事のスタイル: {template['style']}\n"
-                base_prompt += f"推奨文字数: {template['length']}\n"
-                base_prompt += f"内容の方向性: {template['prompt']}\n"
-                
-                # テンプレートタイプ別の追加指示
-                if template_type == "tech_tutorial":
-                    base_prompt += "\n特別な要求: 手順を明確に番号付きで示し、各ステップで期待される結果を説明してください。\n"
-                elif template_type == "tech_deep_dive":
-                    base_prompt += "\n特別な要求: 技術的な仕組みを図解的に説明し、なぜそうなるのかの理由も含めてください。\n"
-                elif template_type == "dev_experience":
-                    base_prompt += "\n特別な要求: 遭遇した問題、試行錯誤のプロセス、最終的な解決策を時系列で説明してください。\n"
-                elif template_type == "tech_comparison":
-                    base_prompt += "\n特別な要求: 比較表や具体的な使用例を含め、どの場面でどれを選ぶべきかの判断基準を示してください。\n"
-        
-        # 現在の日付を追加
-        current_date = datetime.now().strftime('%Y年%m月%d日')
-        base_prompt += f"\n今日の日付: {current_date}\n"
-        
         # 追加の指示（厳格な要求事項）
+        # 記事ごとに変わらない指示を先頭にまとめ、プロバイダー側のプロンプトキャッシュが効くようにする
         base_prompt += """
 重要な注意事項（必ず遵守）:
 - 技術的に正確で検証可能な情報のみを含め、不確実な情報は避けてください
@@ -331,6 +402,21 @@ note.comに投稿する非常に詳細で包括的な技術ブログ記事を生
 - 読者が「この記事を読んで本当に良かった」と感じる価値の高い内容にしてください
 """
         
+        # トピック（テーマ）が指定されている場合
+        if topic:
+            base_prompt += f"\n記事のトピック・テーマ: {topic}\n"
+            base_prompt += "このトピックを中心に、具体的で実践的な内容を詳しく解説してください。\n"
+        
+        # テンプレートタイプが指定されている場合（テンプレート固有の部分は読み込み時に構築済み）
+        if template_type:
+            template = self._get_template(template_type)
+            if template:
+                base_prompt += template["prompt_section"]
+        
+        # 現在の日付を追加
+        current_date = datetime.now().strftime('%Y年%m月%d日')
+        base_prompt += f"\n今日の日付: {current_date}\n"
+        
         return base_prompt
     
     def _parse_generated_content(self, generated_text: str) -> Tuple[str, str]:
@@ -543,49 +629,245 @@ note.comに投稿する非常に詳細で包括的な技術ブログ記事を生
             Tuple[str, str]: (タイトル, 内容)
         """
         print(f"🎯 記事生成方法: {method}")
+        self.last_usage = {}
+        self.last_stream_stats = {}
+        self.last_method = None
         
         if method == "llm":
             # LLM生成を試行
             result = self.generate_with_llm(
                 topic=kwargs.get("topic"),
-                template_type=kwargs.get("template_type")
+                template_type=kwargs.get("template_type"),
+                stream=kwargs.get("stream"),
+                on_title=kwargs.get("on_title"),
+                on_body_chunk=kwargs.get("on_body_chunk")
             )
             if result:
+                self.last_method = "llm"
                 return result
             else:
                 print("🔄 LLM生成に失敗、テンプレート生成にフォールバック")
                 method = "template"
         
         if method == "template":
+            self.last_method = "template"
             return self.generate_templated_content(
                 template_type=kwargs.get("template_type")
             )
         
         elif method == "auto":
             # 自動選択（将来的にLLMが利用可能な場合は優先）
-            if self.llm_config.get("enabled", False):
+            if self.is_llm_available():
                 return self.generate_content("llm", **kwargs)
             else:
                 return self.generate_content("template", **kwargs)
         
         else:
             print(f"⚠️ 不明な生成方法: {method}、テンプレート生成を使用")
+            self.last_method = "template"
             return self.generate_templated_content()
     
+    def generate_unique_content(self, method: str = "template", claim: Callable[[str], bool] = None,
+                                **kwargs) -> Optional[Tuple[str, str]]:
+        """
+        既存記事と重複・類似しない記事コンテンツを生成
+        
+        完全一致（正規化ハッシュ）と近似重複（MinHash類似度）を確認し、
+        該当する場合は再生成する。しきい値と再生成回数はllm_configの
+        similarity_check（threshold, max_regenerations）で設定可能
+        
+        テンプレート生成の本文は定型文から選ぶため同じ内容になるのが前提で、作り直しても重複は避けられない。
+        そのため確認せずに返し、重複の確認は校閲後の投稿する本文で行う
+        
+        Args:
+            method: 生成方法 ("llm", "template", "auto")
+            claim: 並行して生成している他のワーカーと重複しないよう本文を確保する関数
+                   （他のワーカーが同じ本文を確保済みなら False を返し、再生成する）
+            **kwargs: 各生成方法に応じた追加パラメータ
+            
+        Returns:
+            Optional[Tuple[str, str]]: (タイトル, 内容)、再生成しても重複する場合はNone
+        """
+        similarity_config = self.llm_config.get("similarity_check", {})
+        threshold = similarity_config.get("threshold", 0.8)
+        max_regenerations = similarity_config.get("max_regenerations", 2)
+        usage = {}
+        
+        for attempt in range(max_regenerations + 1):
+            if attempt > 0:
+                print(f"🔄 記事を再生成します ({attempt}/{max_regenerations})")
+                # 同じリクエストでもキャッシュの応答を返さず作り直す
+                with bypass_llm_cache():
+                    title, content = self.generate_content(method, **kwargs)
+            else:
+                title, content = self.generate_content(method, **kwargs)
+            # 作り直した分も含めて生成に使ったトークン数を合算する
+            usage = merge_usage(usage, self.last_usage)
+            self.last_usage = usage
+            
+            if self.last_method == "template":
+                return title, content
+            
+            duplicate = self.data_manager.find_article_by_content(content)
+            if duplicate:
+                print(f"⚠️ 同じ内容の記事が既に存在します: ID {duplicate['id']}")
+                continue
+            
+            similar = self.data_manager.find_similar_articles(content, threshold)
+            if similar:
+                article, score = similar[0]
+                print(f"⚠️ 類似した記事が既に存在します: ID {article['id']} (類似度 {score:.2f})")
+                continue
+            
+            if claim and not claim(content):
+                print("⚠️ 並行して生成した記事と同じ内容です")
+                continue
+            
+            return title, content
+        
+        print("❌ 重複しない記事を生成できませんでした")
+        return None
+    
+    def _create_async_openai_client(self, settings: Dict = None):
+        """バッチ生成用のOpenAI非同期クライアントを作成（LLMが使えない場合は None）"""
+        settings = settings or self.llm_config
+        if not settings.get("enabled", False) or settings.get("provider") not in CHAT_COMPLETIONS_PROVIDERS:
+            return None
+        
+        try:
+            return create_async_chat_client(settings)
+        except ImportError:
+            print("❌ OpenAIライブラリがインストールされていません。")
+        except ValueError as e:
+            print(f"❌ {e}")
+        return None
+    
+    @staticmethod
+    def _batch_result(index: int, spec: Dict, started: float, title: str = None, content: str = None,
+                      usage: Dict[str, int] = None, error: str = None) -> Dict:
+        """バッチ生成1件分の結果"""
+        return {
+            "index": index,
+            "spec": spec,
+            "title": title,
+            "content": content,
+            "usage": usage or {},
+            "seconds": round(time.perf_counter() - started, 3),
+            "error": error
+        }
+    
+    async def agenerate_batch(self, specs: Iterable[Dict], concurrency: int = 4) -> AsyncIterator[Dict]:
+        """
+        複数の記事を並行生成し、完了した順に返す（非同期版）
+        
+        OpenAIの非同期クライアントで全件を同時に投入し、セマフォで同時実行数を制限する。
+        1件の失敗はその結果の error に記録し、他の記事の生成は続ける。
+        LLMが使えない場合はテンプレート生成で順に作成する
+        
+        Args:
+            specs: 生成指定（template_type, topic を指定できる辞書）のイテラブル
+            concurrency: 同時にAPIを呼び出す最大数
+        
+        Yields:
+            Dict: 生成結果（index, spec, title, content, usage, seconds, error）
+        """
+        specs = list(specs)
+        if not specs:
+            return
+        
+        # 下書き生成がローカルLLMに割り当てられていればローカルLLMで生成する（失敗した記事は error に記録）
+        settings = llm_settings_for_stage("draft", self.llm_config)[0]
+        client = self._create_async_openai_client(settings)
+        if client is None:
+            print("⚠️ LLM機能が利用できないため、テンプレート生成で作成します")
+            for index, spec in enumerate(specs):
+                started = time.perf_counter()
+                title, content = self.generate_templated_content(spec.get("template_type"))
+                yield self._batch_result(index, spec, started, title, content)
+            return
+        
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        
+        async def generate(index: int, spec: Dict) -> Dict:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    prompt = self._build_prompt(spec.get("topic"), spec.get("template_type"))
+                    request = self._build_openai_request(prompt, spec.get("template_type"), settings)
+                    cache_key, generated_text = self._lookup_cached_openai_response(request, settings)
+                    usage = {}
+                    cached = generated_text is not None
+                    if not cached:
+                        response = await client.chat.completions.create(**request)
+                        generated_text = response.choices[0].message.content
+                        usage = usage_from_openai(response)
+                    title, content = self._parse_generated_content(generated_text.strip())
+                    if not (title and content):
+                        raise ValueError("生成されたコンテンツの解析に失敗しました")
+                    if not cached:
+                        store_cached_response(cache_key, cache_provider_name(settings), request["model"],
+                                              generated_text, usage)
+                    return self._batch_result(index, spec, started, title, content, usage)
+                except Exception as e:
+                    return self._batch_result(index, spec, started, error=str(e))
+        
+        print(f"🤖 {len(specs)}件の記事を並行生成します（同時実行数: {max(concurrency, 1)}）")
+        tasks = [asyncio.ensure_future(generate(index, spec)) for index, spec in enumerate(specs)]
+        try:
+            for completed, future in enumerate(asyncio.as_completed(tasks), 1):
+                result = await future
+                if result["error"]:
+                    print(f"❌ [{completed}/{len(specs)}] 記事生成エラー: {result['error']}")
+                else:
+                    print(f"✅ [{completed}/{len(specs)}] {result['title']} ({result['seconds']:.1f}秒)")
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await client.close()
+    
+    def generate_batch(self, specs: Iterable[Dict], concurrency: int = 4,
+                       on_result: Callable[[Dict], None] = None) -> List[Dict]:
+        """
+        複数の記事を並行生成
+        
+        イベントループ内から呼ぶ場合は agenerate_batch を使う
+        
+        Args:
+            specs: 生成指定（template_type, topic を指定できる辞書）のイテラブル
+            concurrency: 同時にAPIを呼び出す最大数
+            on_result: 1件完了するごとに結果を渡して呼ばれる関数
+        
+        Returns:
+            List[Dict]: 生成結果（完了順）。失敗した記事は title/content が None で error に理由が入る
+        """
+        results = []
+        
+        async def collect():
+            async for result in self.agenerate_batch(specs, concurrency):
+                results.append(result)
+                if on_result:
+                    on_result(result)
+        
+        asyncio.run(collect())
+        succeeded = sum(1 for result in results if not result["error"])
+        print(f"📊 バッチ生成完了: 成功 {succeeded}件 / 失敗 {len(results) - succeeded}件")
+        return results
+    
     def _get_template(self, template_type: str = None) -> Optional[Dict]:
         """指定されたタイプのテンプレートを取得"""
         if not template_type:
             return None
         
-        for template in self.generation_templates:
-            if template["type"] == template_type:
-                return template
-        
-        return None
+        return self.template_registry.get(template_type)
     
     def list_template_types(self) -> List[str]:
         """利用可能なテンプレートタイプ一覧を取得"""
-        return [template["type"] for template in self.generation_templates]
+        return self.template_registry.types()
+    
+    def get_template_themes(self, template_type: str) -> List[str]:
+        """テンプレートタイプに応じたテーマ候補を取得"""
+        return self.template_registry.themes(template_type)
     
     def get_template_info(self, template_type: str) -> Dict:
         """テンプレート情報を取得"""
@@ -594,13 +876,14 @@ note.comに投稿する非常に詳細で包括的な技術ブログ記事を生
             return {
                 "type": template["type"],
                 "style": template["style"],
-                "prompt": template["prompt"]
+                "prompt": template["prompt"],
+                "length": template["length"]
             }
         return {"type": "unknown", "style": "不明", "prompt": "不明"}
     
     def is_llm_available(self) -> bool:
-        """LLM機能が利用可能かチェック"""
-        return self.llm_config.get("enabled", False)
+        """LLM機能が利用可能かチェック（下書き生成に割り当てたローカルLLMを含む）"""
+        return any(settings.get("enabled", False) for settings in llm_settings_for_stage("draft", self.llm_config))
     
     def configure_llm(self, provider: str, model: str, api_key: str = None, **config) -> bool:
         """
@@ -631,12 +914,13 @@ note.comに投稿する非常に詳細で包括的な技術ブログ記事を生
             print(f"❌ LLM設定更新エラー: {e}")
             return False
     
-    def format_for_note(self, content: str) -> str:
+    def format_for_note(self, content: str, verbose: bool = True) -> str:
         """
         note投稿用にフォーマットを調整
         
         Args:
             content: 元の記事内容
+            verbose: 完了メッセージを表示するか（ストリーミング中のブロック単位の調整では表示しない）
             
         Returns:
             str: note用に調整された記事内容
@@ -675,7 +959,8 @@ note.comに投稿する非常に詳細で包括的な技術ブログ記事を生
             # 空行の調整（連続する空行を整理）
             formatted_content = re.sub(r'\n\n\n+', '\n\n', formatted_content)
             
-            print("✅ note用フォーマット調整が完了しました")
+            if verbose:
+                print("✅ note用フォーマット調整が完了しました")
             return formatted_content.strip()
             
         except Exception as e:
@@ -690,7 +975,7 @@ note.comに投稿する非常に詳細で包括的な技術ブログ記事を生
             
             if claude_config and claude_config.get("enabled", False):
                 api_key = claude_config.get("api_key")
-                if api_key:
+                if api_key or not requires_api_key(claude_config.get("provider", "anthropic")):
                     self.claude_editor = ClaudeEditor(api_key, claude_config)
                     if self.claude_editor.is_available:
                         print("✅ Claude編集エージェントが利用可能です")
@@ -706,25 +991,9 @@ note.comに投稿する非常に詳細で包括的な技術ブログ記事を生
     def _load_claude_config(self) -> Dict:
         """Claude設定を読み込み"""
         try:
-            import os
-            import json
-            
-            # 設定ファイルのパスを確認
-            config_paths = [
-                "llm_config.json",
-                "../llm_config.json", 
-                "../../llm_config.json"
-            ]
-            
-            for config_path in config_paths:
-                if os.path.exists(config_path):
-                    with open(config_path, 'r', encoding='utf-8') as f:
-                        config_data = json.load(f)
-                    
-                    claude_config = config_data.get("claude_editor_settings", {})
-                    if claude_config:
-                        print(f"✅ Claude設定ファイルを読み込みました: {config_path}")
-                        return claude_config
+            claude_config = load_llm_config_file().get("claude_editor_settings", {})
+            if claude_config:
+                return claude_config
             
             print("⚠️ Claude設定が見つかりません")
             return {}
@@ -781,7 +1050,7 @@ note.comに投稿する非常に詳細で包括的な技術ブログ記事を生
             
             if openai_config and openai_config.get("enabled", False):
                 api_key = openai_config.get("api_key")
-                if api_key:
+                if api_key or not requires_api_key(openai_config.get("provider", "openai")):
                     self.openai_editor = OpenAIEditor(api_key, openai_config)
                     if self.openai_editor.is_available:
                         print("✅ OpenAI編集エージェントが利用可能です")
@@ -797,25 +1066,9 @@ note.comに投稿する非常に詳細で包括的な技術ブログ記事を生
     def _load_openai_editor_config(self) -> Dict:
         """OpenAI編集設定を読み込み"""
         try:
-            import os
-            import json
-            
-            # 設定ファイルのパスを確認
-            config_paths = [
-                "llm_config.json",
-                "../llm_config.json", 
-                "../../llm_config.json"
-            ]
-            
-            for config_path in config_paths:
-                if os.path.exists(config_path):
-                    with open(config_path, 'r', encoding='utf-8') as f:
-                        config_data = json.load(f)
-                    
-                    openai_config = config_data.get("openai_editor_settings", {})
-                    if openai_config:
-                        print(f"✅ OpenAI編集設定ファイルを読み込みました: {config_path}")
-                        return openai_config
+            openai_config = load_llm_config_file().get("openai_editor_settings", {})
+            if openai_config:
+                return openai_config
             
             print("⚠️ OpenAI編集設定が見つかりません")
             return {}
@@ -882,6 +1135,7 @@ note.comに投稿する非常に詳細で包括的な技術ブログ記事を生
             
             if claude_result and "error" not in claude_result:
                 print("✅ Claude編集エージェントで改善完了")
+                claude_result.setdefault("editor", "Claude")
                 return claude_result
             else:
                 print("⚠️ Claude編集エージェントでエラーが発生、OpenAIにフォールバック...")
@@ -895,6 +1149,7 @@ note.comに投稿する非常に詳細で包括的な技術ブログ記事を生
             
             if openai_result and "error" not in openai_result:
                 print("✅ OpenAI編集エージェントで改善完了")
+                openai_result.setdefault("editor", "OpenAI GPT")
                 return openai_result
             else:
                 print("❌ OpenAI編集エージェントでもエラーが発生")
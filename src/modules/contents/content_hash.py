@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+コンテンツハッシュモジュール
+記事本文の正規化と重複判定用ハッシュ
+"""
+
+import hashlib
+import unicodedata
+
+
+def normalize_content(content: str) -> str:
+    """
+    重複判定用に記事本文を正規化
+    
+    全角/半角の揺れ（NFKC）、大文字/小文字、空白・改行の差を吸収する
+    
+    Args:
+        content: 記事本文
+    
+    Returns:
+        str: 正規化された本文
+    """
+    normalized = unicodedata.normalize('NFKC', content or '').lower()
+    # str.split() は正規表現の \s と同じ空白文字で区切る（正規表現より高速）
+    return ''.join(normalized.split())
+
+
+def compute_content_hash(content: str) -> str:
+    """
+    正規化した本文のハッシュを計算
+    
+    Args:
+        content: 記事本文
+    
+    Returns:
+        str: SHA-256ハッシュ（16進数）
+    """
+    return hashlib.sha256(normalize_content(content).encode('utf-8')).hexdigest()
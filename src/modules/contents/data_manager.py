@@ -4,38 +4,95 @@
 記事データの読み込み、管理、選択機能
 """
 
-import json
-import os
-import random
+import bisect
+from collections import Counter
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .article_selector import IndexedIdSet, SelectionPolicy, create_selection_policy
+from .article_storage import ArticleStorage, create_storage
+from .article_template import CompiledTemplate, TemplateEngine
+from .blob_store import BLOB_STORE_SUFFIX, BlobStore
+from .content_hash import compute_content_hash
+from .search_index import SEARCH_INDEX_SUFFIX, ArticleSearchIndex
+from .similarity_index import SIMILARITY_INDEX_SUFFIX, MinHashLSHIndex
+
 
 class DataManager:
-    def __init__(self, data_file_path: str = "data/articles.json"):
+    def __init__(self, data_file_path: str = "data/articles.json", storage: ArticleStorage = None,
+                 backend: str = None, lazy: bool = False, selection_policy: str = None):
         """
         データマネージャーの初期化
         
         Args:
             data_file_path: 記事データファイルのパス
+            storage: 記事ストレージ（省略時はパスとbackendから生成）
+            backend: ストレージバックエンド名（json, journal, sqlite）。省略時は拡張子から判定
+            lazy: 遅延モード。初回アクセスまで読み込みを行わず、読み込み時もメタデータのみを
+                  ストリーミングで取得し、本文は必要になった時点でディスクから読む
+            selection_policy: 記事選択ポリシー（uniform, weighted, rotation）。
+                              省略時は記事データのsettings.selection_policy、なければuniform
         """
-        self.data_file_path = data_file_path
-        self.articles_data = None
-        self.load_articles()
+        self.storage = storage or create_storage(data_file_path, backend)
+        self.data_file_path = self.storage.path
+        self.lazy = lazy
+        self.selection_policy = selection_policy
+        self._articles_data = None
+        self._load_attempted = False
+        
+        # インデックス（ID→記事、ステータス→ID集合、最大ID、本文ハッシュ→ID）
+        self._articles_by_id: Dict[int, Dict] = {}
+        self._sorted_ids: List[int] = []
+        self._status_index: Dict[str, IndexedIdSet] = {}
+        self._max_id = 0
+        self._content_hash_index: Dict[str, int] = {}
+        # 投稿記事の選択ポリシー（アクティブな記事を候補として差分更新）
+        self._selector: SelectionPolicy = create_selection_policy(selection_policy)
+        # 類似記事検出用のMinHash LSH索引（初回検索時に保存済みの索引を読み込むか構築し、読み込み直しでは差分を更新）
+        self._similarity_index: Optional[MinHashLSHIndex] = None
+        # 全文検索用の転置インデックス（初回検索時に構築）
+        self._search_index: Optional[ArticleSearchIndex] = None
+        # テンプレート（(記事ID, フィールド)→(元の値, 解析済みテンプレート)）と描画結果のキャッシュ
+        self._template_engine = TemplateEngine()
+        self._compiled_templates: Dict[Tuple[int, str], Tuple[Optional[str], CompiledTemplate]] = {}
+        self._rendered_cache: Dict[Tuple[int, str], Tuple[str, str]] = {}
+        # 記事の版（生成直後・校閲後など）の本文を保存する圧縮ブロブストア（初回使用時に作成）
+        self._blob_store: Optional[BlobStore] = None
+        
+        if not lazy:
+            self.load_articles()
+    
+    @property
+    def articles_data(self) -> Optional[Dict]:
+        """記事データ全体（遅延モードでは初回アクセス時に読み込む）"""
+        if self._articles_data is None and not self._load_attempted:
+            self.load_articles()
+        return self._articles_data
+    
+    @articles_data.setter
+    def articles_data(self, articles_data: Optional[Dict]) -> None:
+        self._articles_data = articles_data
+    
+    def _ensure_loaded(self) -> bool:
+        """記事データが読み込み済みであることを保証"""
+        return self.articles_data is not None
     
     def load_articles(self) -> bool:
         """
-        記事データをJSONファイルから読み込み
+        記事データをストレージから読み込み
         
         Returns:
             bool: 読み込み成功の可否
         """
+        self._load_attempted = True
         try:
-            if not os.path.exists(self.data_file_path):
+            articles_data = self.storage.load(lazy=self.lazy)
+            if articles_data is None:
                 print(f"❌ 記事データファイルが見つかりません: {self.data_file_path}")
                 return False
             
-            with open(self.data_file_path, 'r', encoding='utf-8') as f:
-                self.articles_data = json.load(f)
+            self.articles_data = articles_data
+            self.storage.mark_synced()
+            self._build_index()
             
             print(f"✅ 記事データを読み込みました: {len(self.articles_data['articles'])}件")
             return True
@@ -44,6 +101,119 @@ class DataManager:
             print(f"❌ 記事データの読み込みエラー: {e}")
             return False
     
+    def reload_if_changed(self) -> bool:
+        """
+        他プロセスがストレージを変更していれば読み込み直す
+        
+        Returns:
+            bool: 読み込み直したかどうか
+        """
+        if self.articles_data is None or not self.storage.has_changed():
+            return False
+        
+        print("🔄 記事データが他のプロセスで更新されたため読み込み直します")
+        return self.load_articles()
+    
+    def _build_index(self) -> None:
+        """
+        記事データ全体からインデックスを再構築
+        
+        類似記事検出用の索引は本文全体から署名を計算し直すと時間がかかるため破棄せず、
+        追加・変更・削除された記事の分だけ更新する
+        """
+        similarity_index = self._similarity_index
+        self._articles_by_id = {}
+        self._sorted_ids = []
+        self._status_index = {}
+        self._max_id = 0
+        self._content_hash_index = {}
+        self._similarity_index = None
+        self._search_index = None
+        self._template_engine = TemplateEngine.from_settings(self.articles_data.get('settings', {}))
+        self._compiled_templates = {}
+        self._rendered_cache = {}
+        self._selector = create_selection_policy(
+            self.selection_policy or self.articles_data.get('settings', {}).get('selection_policy'))
+        
+        for article in self.articles_data.get('articles', []):
+            self._index_article(article)
+        
+        if similarity_index is not None:
+            self._sync_similarity_index(similarity_index)
+            self._similarity_index = similarity_index
+    
+    def _index_article(self, article: Dict) -> None:
+        """記事1件をインデックスに登録"""
+        article_id = article['id']
+        if article_id not in self._articles_by_id:
+            # ID順の一覧（新規IDは通常末尾に追加されるため挿入は稀）
+            if not self._sorted_ids or article_id > self._sorted_ids[-1]:
+                self._sorted_ids.append(article_id)
+            else:
+                bisect.insort(self._sorted_ids, article_id)
+        self._articles_by_id[article_id] = article
+        status = article.get('status', 'active')
+        self._status_index.setdefault(status, IndexedIdSet()).add(article_id)
+        if status == 'active':
+            self._selector.add(article)
+        if article_id > self._max_id:
+            self._max_id = article_id
+        
+        # 本文ハッシュ（未計算の既存記事はここで計算して記事に保持する）
+        if 'content_hash' not in article:
+            article['content_hash'] = compute_content_hash(article['content'])
+        self._content_hash_index.setdefault(article['content_hash'], article_id)
+        if article.get('source_hash'):
+            self._content_hash_index.setdefault(article['source_hash'], article_id)
+        
+        if self._similarity_index is not None:
+            self._similarity_index.add(article_id, article['content'], content_hash=article['content_hash'])
+        if self._search_index is not None:
+            self._search_index.add(article)
+    
+    def contains_content(self, content: str) -> bool:
+        """
+        同じ本文（正規化後）の記事が既に存在するかチェック（O(1)）
+        
+        ステータスに関係なく全記事を対象とし、編集前の生成本文（source_hash）にも一致する
+        
+        Args:
+            content: 記事本文
+            
+        Returns:
+            bool: 既に存在する場合True
+        """
+        self.reload_if_changed()
+        return compute_content_hash(content) in self._content_hash_index
+    
+    def find_article_by_content(self, content: str) -> Optional[Dict]:
+        """
+        同じ本文（正規化後）の記事を取得
+        
+        Args:
+            content: 記事本文
+            
+        Returns:
+            Optional[Dict]: 一致した記事、または None
+        """
+        self.reload_if_changed()
+        article_id = self._content_hash_index.get(compute_content_hash(content))
+        return self._articles_by_id.get(article_id) if article_id is not None else None
+    
+    def count_articles(self, status: str = 'active') -> int:
+        """
+        指定ステータスの記事数を取得
+        
+        Args:
+            status: 記事ステータス
+            
+        Returns:
+            int: 記事数
+        """
+        self._ensure_loaded()
+        id_set = self._status_index.get(status)
+        return len(id_set) if id_set else 0
+    
     def get_active_articles(self) -> List[Dict]:
         """
         アクティブな記事一覧を取得
@@ -59,18 +229,19 @@ class DataManager:
     
     def get_random_article(self) -> Optional[Dict]:
         """
-        ランダムに記事を選択
+        投稿する記事を選択ポリシーに従って選択
         
         Returns:
             Optional[Dict]: 選択された記事データ、または None
         """
-        active_articles = self.get_active_articles()
+        self.reload_if_changed()
+        article_id = self._selector.select()
         
-        if not active_articles:
+        if article_id is None:
             print("❌ 利用可能な記事がありません")
             return None
         
-        selected_article = random.choice(active_articles)
+        selected_article = self._articles_by_id[article_id]
         print(f"📝 記事を選択しました: ID {selected_article['id']} - {selected_article['title']}")
         
         return selected_article
@@ -85,18 +256,61 @@ class DataManager:
         Returns:
             Optional[Dict]: 記事データ、または None
         """
-        active_articles = self.get_active_articles()
-        
-        for article in active_articles:
-            if article['id'] == article_id:
-                return article
+        self.reload_if_changed()
+        article = self._articles_by_id.get(article_id)
+        if article and article.get('status', 'active') == 'active':
+            return article
         
         print(f"❌ ID {article_id} の記事が見つかりません")
         return None
     
+    def _render_field(self, article: Dict, field: str, date_key: str, variables: Dict[str, str]) -> str:
+        """
+        記事のタイトル・本文をテンプレートとして描画（解析結果と描画結果をキャッシュ）
+        
+        キャッシュは元の値が差し替えられていないこと（同一オブジェクト）を確認して使う。
+        遅延モードで本文が未読み込みの場合は、ディスク上の本文から解析した結果を使う
+        """
+        key = (article.get('id'), field)
+        # 遅延モードの未読み込み本文はNone（ディスク上の本文）として扱う
+        source = dict.get(article, field)
+        
+        compiled = self._compiled_templates.get(key)
+        if compiled is None or compiled[0] is not source:
+            text = article[field] if source is None else source
+            compiled = (source, self._template_engine.compile(text))
+            self._compiled_templates[key] = compiled
+            self._rendered_cache.pop(key, None)
+        
+        rendered = self._rendered_cache.get(key)
+        if rendered is None or rendered[0] != date_key:
+            rendered = (date_key, compiled[1].render(variables))
+            self._rendered_cache[key] = rendered
+        
+        return rendered[1]
+    
+    def format_article_title(self, article: Dict) -> str:
+        """
+        記事タイトルをフォーマット（日付・曜日・独自変数の置換）
+        
+        Args:
+            article: 記事データ
+            
+        Returns:
+            str: フォーマット済みタイトル
+        """
+        if not article:
+            return ""
+        
+        date_key, variables = self._template_engine.variables()
+        return self._render_field(article, 'title', date_key, variables)
+    
     def format_article_content(self, article: Dict) -> Tuple[str, str]:
         """
-        記事内容をフォーマット（日付置換など）
+        記事内容をフォーマット（日付・曜日・独自変数の置換）
+        
+        プレースホルダーは {date}、{weekday}、settings.template_variables の独自変数。
+        描画結果は記事・日付ごとにキャッシュされる
         
         Args:
             article: 記事データ
@@ -107,39 +321,293 @@ class DataManager:
         if not article:
             return "", ""
         
-        # 日付フォーマットを取得
-        date_format = self.articles_data.get('settings', {}).get('date_format', '%Y年%m月%d日')
-        current_date = datetime.now().strftime(date_format)
+        date_key, variables = self._template_engine.variables()
+        title = self._render_field(article, 'title', date_key, variables)
+        content = self._render_field(article, 'content', date_key, variables)
         
-        # タイトルの日付置換
-        title = article['title'].replace('{date}', current_date)
+        return title, content
+    
+    def find_articles(self, category: str = None, tag: str = None, status: str = 'active') -> List[Dict]:
+        """
+        カテゴリ・タグ・ステータスで記事を検索
         
-        # 本文の日付置換と改行処理
-        content = article['content'].replace('{date}', current_date)
+        Args:
+            category: カテゴリ（省略時は条件なし）
+            tag: タグ（省略時は条件なし）
+            status: ステータス（Noneで全ステータス）
+            
+        Returns:
+            List[Dict]: 条件に一致する記事のリスト
+        """
+        self._ensure_loaded()
         
-        return title, content
+        # インデックスを持つストレージ（SQLite）では検索をストレージ側に任せる
+        article_ids = self.storage.query_article_ids(status=status, category=category, tag=tag)
+        if article_ids is not None:
+            return [self._articles_by_id[article_id] for article_id in article_ids
+                    if article_id in self._articles_by_id]
+        
+        if status is not None:
+            candidates = (self._articles_by_id[article_id] for article_id in self._status_index.get(status, ()))
+        else:
+            candidates = self._articles_by_id.values()
+        
+        return [article for article in candidates
+                if (category is None or article.get('category') == category)
+                and (tag is None or tag in article.get('tags', []))]
+    
+    # iter_articles が返す軽量レコードのフィールド（本文は含めない）
+    LISTING_FIELDS = ('id', 'title', 'category', 'tags', 'status', 'created_at', 'last_posted_at')
+    
+    def iter_articles(self, offset: int = 0, limit: Optional[int] = None, status: Optional[str] = 'active',
+                      category: str = None, tag: str = None) -> Iterator[Dict]:
+        """
+        記事をID順に1件ずつ取得（本文を読み込まない軽量レコード）
+        
+        Args:
+            offset: 条件に一致する記事のうち読み飛ばす件数
+            limit: 最大件数（Noneで最後まで）
+            status: ステータスで絞り込み（Noneで全ステータス）
+            category: カテゴリで絞り込み（省略時は条件なし）
+            tag: タグで絞り込み（省略時は条件なし）
+            
+        Yields:
+            Dict: 記事のメタデータ（LISTING_FIELDSのうち記事が持つもの）
+        """
+        if not self._ensure_loaded() or (limit is not None and limit <= 0):
+            return
+        
+        skipped = 0
+        yielded = 0
+        for article_id in self._sorted_ids:
+            article = self._articles_by_id[article_id]
+            if ((status is not None and article.get('status', 'active') != status)
+                    or (category is not None and article.get('category') != category)
+                    or (tag is not None and tag not in article.get('tags', []))):
+                continue
+            
+            if skipped < offset:
+                skipped += 1
+                continue
+            
+            yield {field: dict.get(article, field) for field in self.LISTING_FIELDS if field in article}
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
     
-    def list_articles(self) -> None:
+    def list_articles(self, offset: int = 0, limit: int = 20, status: Optional[str] = 'active',
+                      category: str = None, tag: str = None) -> bool:
         """
-        利用可能な記事一覧を表示
+        記事一覧を1ページ分表示（タイトルのみフォーマットし、本文は読み込まない）
+        
+        Args:
+            offset: 表示開始位置（条件に一致する記事の何件目から表示するか）
+            limit: 1ページの表示件数
+            status: ステータスで絞り込み（Noneで全ステータス）
+            category: カテゴリで絞り込み
+            tag: タグで絞り込み
+            
+        Returns:
+            bool: 次のページがあるかどうか
+            
+        Raises:
+            ValueError: limit が1未満、または offset が負の場合
         """
-        active_articles = self.get_active_articles()
+        if limit < 1:
+            raise ValueError(f"limit は1以上を指定してください: {limit}")
+        if offset < 0:
+            raise ValueError(f"offset は0以上を指定してください: {offset}")
+        
+        # 次ページの有無を判定するため1件多く取得
+        records = list(self.iter_articles(offset, limit + 1, status, category, tag))
+        has_more = len(records) > limit
+        records = records[:limit]
         
-        if not active_articles:
+        if not records:
             print("❌ 利用可能な記事がありません")
-            return
+            return False
         
-        print("\n📚 利用可能な記事一覧:")
+        page = offset // limit + 1
+        if category is None and tag is None and status is not None:
+            total = self.count_articles(status)
+            print(f"\n📚 利用可能な記事一覧（{page}/{(total + limit - 1) // limit}ページ、全{total}件）:")
+        else:
+            print(f"\n📚 利用可能な記事一覧（{page}ページ目）:")
         print("=" * 60)
         
-        for article in active_articles:
-            title, _ = self.format_article_content(article)
-            print(f"ID: {article['id']:2d} | {title}")
-            print(f"        カテゴリ: {article.get('category', '未分類')}")
-            print(f"        タグ: {', '.join(article.get('tags', []))}")
+        for record in records:
+            title = self.format_article_title(self._articles_by_id[record['id']])
+            print(f"ID: {record['id']:2d} | {title}")
+            print(f"        カテゴリ: {record.get('category', '未分類')}")
+            print(f"        タグ: {', '.join(record.get('tags', []))}")
             print("-" * 60)
+        
+        return has_more
     
-    def add_article(self, title: str, content: str, category: str = "", tags: List[str] = None) -> bool:
+    def _sync_similarity_index(self, index: MinHashLSHIndex) -> int:
+        """
+        類似記事検出用の索引を記事データに合わせる（削除・本文が変わった記事を除き、未登録の記事を追加）
+        
+        本文を読む（遅延モードではディスクから読む）のは追加・変更された記事のみ
+        
+        Args:
+            index: 索引
+        
+        Returns:
+            int: 除いた件数と追加した件数の合計
+        """
+        stale = [article_id for article_id in index
+                 if article_id not in self._articles_by_id
+                 or not index.is_current(article_id, self._articles_by_id[article_id]['content_hash'])]
+        for article_id in stale:
+            index.remove(article_id)
+        
+        added = 0
+        for article_id, article in self._articles_by_id.items():
+            if article_id not in index:
+                index.add(article_id, article['content'], content_hash=article['content_hash'])
+                added += 1
+        
+        changed = len(stale) + added
+        if changed:
+            print(f"🔍 類似記事検出用の索引を更新しました: {added}件を登録・{len(stale)}件を削除（計{len(index)}件）")
+            try:
+                index.save(self.storage.path + SIMILARITY_INDEX_SUFFIX)
+            except OSError as e:
+                print(f"⚠️ 類似記事検出用の索引の保存エラー: {e}")
+        return changed
+    
+    def _get_similarity_index(self) -> MinHashLSHIndex:
+        """
+        類似記事検出用の索引を取得
+        
+        未構築の場合は保存済みの索引を読み込み、追加・変更・削除された記事の分だけ更新して使う
+        （保存済みの索引がなければ全記事の本文から構築して保存する）
+        """
+        if self._similarity_index is None:
+            index = MinHashLSHIndex.load(self.storage.path + SIMILARITY_INDEX_SUFFIX) or MinHashLSHIndex()
+            self._sync_similarity_index(index)
+            self._similarity_index = index
+        return self._similarity_index
+    
+    def find_similar_articles(self, content: str, threshold: float = 0.8) -> List[Tuple[Dict, float]]:
+        """
+        本文が類似した既存記事を検索（MinHash + LSH）
+        
+        Args:
+            content: 記事本文
+            threshold: 類似度のしきい値（0〜1、文字シングルのJaccard類似度の推定値）
+            
+        Returns:
+            List[Tuple[Dict, float]]: (記事, 類似度) のリスト（類似度の降順）
+        """
+        if not self._ensure_loaded():
+            return []
+        # 他プロセスが保存した記事も対象にする
+        self.reload_if_changed()
+        
+        index = self._get_similarity_index()
+        return [(self._articles_by_id[article_id], score)
+                for article_id, score in index.query(content, threshold)]
+    
+    def _new_article(self, article_id: int, title: str, content: str, category: str = "",
+                     tags: List[str] = None, content_hash: str = None) -> Dict:
+        """新しい記事データを作成（カテゴリ・タグのデフォルト値を補完）"""
+        if not category:
+            category = self.articles_data.get('settings', {}).get('default_category', '日常')
+        
+        return {
+            "id": article_id,
+            "title": title,
+            "content": content,
+            "tags": tags if tags is not None else [],
+            "category": category,
+            "created_at": datetime.now().strftime('%Y-%m-%d'),
+            "status": "active",
+            "content_hash": content_hash or compute_content_hash(content)
+        }
+    
+    def _get_search_index(self) -> ArticleSearchIndex:
+        """
+        全文検索用の転置インデックスを取得
+        
+        未構築の場合は保存済みのインデックスを読み込み、登録後に変更・削除された記事がなければ
+        追加分だけを登録して使う。それ以外は全記事から構築し直して保存する
+        """
+        if self._search_index is None:
+            cache_path = self.storage.path + SEARCH_INDEX_SUFFIX
+            index = ArticleSearchIndex.load(cache_path)
+            if index is not None and not all(
+                    article_id in self._articles_by_id and index.is_current(self._articles_by_id[article_id])
+                    for article_id in index):
+                index = None
+            
+            if index is None:
+                index = ArticleSearchIndex()
+            
+            added = 0
+            for article_id, article in self._articles_by_id.items():
+                if article_id not in index:
+                    index.add(article)
+                    added += 1
+            
+            if added:
+                print(f"🔍 全文検索用のインデックスを更新しました: {added}件を登録（計{len(index)}件）")
+                try:
+                    index.save(cache_path)
+                except OSError as e:
+                    print(f"⚠️ 検索インデックスの保存エラー: {e}")
+            self._search_index = index
+        return self._search_index
+    
+    def search_articles(self, query: str = "", category: str = None, tag: str = None,
+                        status: str = 'active', limit: int = 20) -> Dict:
+        """
+        タイトル・本文・タグ・カテゴリを全文検索（スコア順）し、カテゴリ・タグの件数を集計
+        
+        Args:
+            query: 検索キーワード（空の場合は条件に一致する全記事を新しい順に返す）
+            category: カテゴリで絞り込み（省略時は条件なし）
+            tag: タグで絞り込み（省略時は条件なし）
+            status: ステータスで絞り込み（Noneで全ステータス）
+            limit: 返す記事の最大件数（Noneで全件）
+            
+        Returns:
+            Dict: {"results": [(記事, スコア), ...], "total": ヒット件数,
+                   "facets": {"category": {カテゴリ: 件数}, "tags": {タグ: 件数}}}
+        """
+        if not self._ensure_loaded():
+            return {"results": [], "total": 0, "facets": {"category": {}, "tags": {}}}
+        
+        if query and query.strip():
+            matches = []
+            for article_id, score in self._get_search_index().search(query):
+                article = self._articles_by_id[article_id]
+                if ((status is None or article.get('status', 'active') == status)
+                        and (category is None or article.get('category') == category)
+                        and (tag is None or tag in article.get('tags', []))):
+                    matches.append((article, score))
+        else:
+            articles = self.find_articles(category=category, tag=tag, status=status)
+            matches = [(article, 0.0) for article in sorted(articles, key=lambda article: article['id'], reverse=True)]
+        
+        category_counts = Counter()
+        tag_counts = Counter()
+        for article, _ in matches:
+            category_counts[article.get('category') or '未分類'] += 1
+            tag_counts.update(article.get('tags', []))
+        
+        return {
+            "results": matches[:limit] if limit is not None else matches,
+            "total": len(matches),
+            "facets": {
+                "category": dict(category_counts.most_common()),
+                "tags": dict(tag_counts.most_common())
+            }
+        }
+    
+    def add_article(self, title: str, content: str, category: str = "", tags: List[str] = None,
+                    source_content: str = None, allow_duplicate: bool = False) -> bool:
         """
         新しい記事を追加
         
@@ -148,6 +616,8 @@ class DataManager:
             content: 記事本文
             category: カテゴリ
             tags: タグリスト
+            source_content: 編集前の生成本文（重複判定用にハッシュを保存）
+            allow_duplicate: Trueの場合は同じ本文の記事があっても追加する
             
         Returns:
             bool: 追加成功の可否
@@ -156,33 +626,30 @@ class DataManager:
             if not self.articles_data:
                 return False
             
-            # 新しいIDを生成
-            existing_ids = [article['id'] for article in self.articles_data['articles']]
-            new_id = max(existing_ids) + 1 if existing_ids else 1
-            
-            # デフォルト値設定
-            if not category:
-                category = self.articles_data.get('settings', {}).get('default_category', '日常')
-            
-            if tags is None:
-                tags = []
-            
-            # 新しい記事データ
-            new_article = {
-                "id": new_id,
-                "title": title,
-                "content": content,
-                "tags": tags,
-                "category": category,
-                "created_at": datetime.now().strftime('%Y-%m-%d'),
-                "status": "active"
-            }
-            
-            # 記事を追加
-            self.articles_data['articles'].append(new_article)
-            
-            # ファイルに保存
-            self.save_articles()
+            # 他プロセスとの追加競合を防ぐため、ロック内で最新化してからIDを採番
+            with self.storage.lock():
+                self.reload_if_changed()
+                
+                # 重複チェック
+                content_hash = compute_content_hash(content)
+                duplicate_id = self._content_hash_index.get(content_hash)
+                if duplicate_id is not None and not allow_duplicate:
+                    print(f"⚠️ 同じ内容の記事が既に存在するため追加しません: ID {duplicate_id}")
+                    return False
+                
+                # 新しいIDを生成
+                new_id = self._max_id + 1
+                new_article = self._new_article(new_id, title, content, category, tags, content_hash)
+                if source_content:
+                    new_article["source_hash"] = compute_content_hash(source_content)
+                
+                # 記事を追加
+                self.articles_data['articles'].append(new_article)
+                self._index_article(new_article)
+                
+                # ストレージに保存（追加分のみ）
+                self.storage.insert_article(self.articles_data, new_article)
+                self.storage.mark_synced()
             
             print(f"✅ 新しい記事を追加しました: ID {new_id} - {title}")
             return True
@@ -191,6 +658,231 @@ class DataManager:
             print(f"❌ 記事追加エラー: {e}")
             return False
     
+    def add_articles(self, articles: Iterable[Dict], allow_duplicate: bool = False) -> Optional[Dict[str, int]]:
+        """
+        複数の記事を一括追加
+        
+        入力は1件ずつ読みながら検証・重複チェック・ID採番を行い、ストレージへの保存は最後に1回だけ行う。
+        入力内の重複も検出する
+        
+        Args:
+            articles: 記事（title, content, category, tags）のイテラブル（ジェネレータ可）
+            allow_duplicate: Trueの場合は同じ本文の記事があっても追加する
+            
+        Returns:
+            Optional[Dict[str, int]]: {"added": 追加件数, "duplicates": 重複でスキップした件数,
+                                       "invalid": 不正でスキップした件数}、失敗時は None
+        """
+        try:
+            if not self.articles_data:
+                return None
+            
+            result = {"added": 0, "duplicates": 0, "invalid": 0}
+            new_articles = []
+            
+            with self.storage.lock():
+                self.reload_if_changed()
+                
+                for article in articles:
+                    title = article.get('title')
+                    content = article.get('content')
+                    tags = article.get('tags')
+                    if isinstance(tags, str):
+                        tags = [tag.strip() for tag in tags.split(',') if tag.strip()]
+                    
+                    if (not isinstance(title, str) or not title.strip()
+                            or not isinstance(content, str) or not content.strip()
+                            or (tags is not None and not isinstance(tags, list))):
+                        result["invalid"] += 1
+                        continue
+                    
+                    content_hash = compute_content_hash(content)
+                    if content_hash in self._content_hash_index and not allow_duplicate:
+                        result["duplicates"] += 1
+                        continue
+                    
+                    new_article = self._new_article(self._max_id + 1, title.strip(), content,
+                                                    article.get('category') or "", tags, content_hash)
+                    self.articles_data['articles'].append(new_article)
+                    self._index_article(new_article)
+                    new_articles.append(new_article)
+                    result["added"] += 1
+                
+                # ストレージに保存（まとめて1回）
+                if new_articles:
+                    self.storage.insert_articles(self.articles_data, new_articles)
+                    self.storage.mark_synced()
+            
+            print(f"✅ 記事を一括追加しました: 追加 {result['added']}件 / "
+                  f"重複 {result['duplicates']}件 / 不正 {result['invalid']}件")
+            return result
+            
+        except Exception as e:
+            print(f"❌ 記事一括追加エラー: {e}")
+            return None
+    
+    def set_article_status(self, article_id: int, status: str) -> bool:
+        """
+        記事のステータスを変更
+        
+        Args:
+            article_id: 記事ID
+            status: 新しいステータス（active, archived等）
+            
+        Returns:
+            bool: 変更成功の可否
+        """
+        try:
+            if not self._ensure_loaded():
+                return False
+            
+            # 他プロセスの変更を古い記事データで上書きしないよう、ロック内で最新化してから更新
+            with self.storage.lock():
+                self.reload_if_changed()
+                article = self._articles_by_id.get(article_id)
+                if not article:
+                    print(f"❌ ID {article_id} の記事が見つかりません")
+                    return False
+                
+                old_status = article.get('status', 'active')
+                if old_status == status:
+                    return True
+                
+                self._status_index[old_status].discard(article_id)
+                self._status_index.setdefault(status, IndexedIdSet()).add(article_id)
+                article['status'] = status
+                if old_status == 'active':
+                    self._selector.remove(article_id)
+                if status == 'active':
+                    self._selector.add(article)
+                
+                self.storage.update_article(self.articles_data, article, ['status'])
+                self.storage.mark_synced()
+            
+            print(f"✅ 記事のステータスを変更しました: ID {article_id} ({old_status} → {status})")
+            return True
+            
+        except Exception as e:
+            print(f"❌ ステータス変更エラー: {e}")
+            return False
+    
+    def mark_posted(self, article_id: int) -> bool:
+        """
+        記事を投稿済みとして記録（last_posted_at を更新）
+        
+        ローテーション選択ではこの日時が古い記事から順に選ばれる
+        
+        Args:
+            article_id: 記事ID
+            
+        Returns:
+            bool: 記録成功の可否
+        """
+        try:
+            if not self._ensure_loaded():
+                return False
+            
+            # 他プロセスの変更を古い記事データで上書きしないよう、ロック内で最新化してから更新
+            with self.storage.lock():
+                self.reload_if_changed()
+                article = self._articles_by_id.get(article_id)
+                if not article:
+                    print(f"❌ ID {article_id} の記事が見つかりません")
+                    return False
+                
+                article['last_posted_at'] = datetime.now().isoformat(timespec='microseconds')
+                self.storage.update_article(self.articles_data, article, ['last_posted_at'])
+                self.storage.mark_synced()
+                if article.get('status', 'active') == 'active':
+                    self._selector.update(article)
+            
+            print(f"✅ 投稿日時を記録しました: ID {article_id} ({article['last_posted_at']})")
+            return True
+            
+        except Exception as e:
+            print(f"❌ 投稿日時の記録エラー: {e}")
+            return False
+    
+    def get_blob_store(self) -> BlobStore:
+        """記事の版を保存する圧縮ブロブストア（記事データのパス + .blobs）を取得"""
+        if self._blob_store is None:
+            self._blob_store = BlobStore(self.storage.path + BLOB_STORE_SUFFIX)
+        return self._blob_store
+    
+    def add_article_revisions(self, article_id: int, revisions: Dict[str, Optional[str]], editor: str = None) -> bool:
+        """
+        記事の版（生成直後・校閲後・最終版など）を保存
+        
+        本文は圧縮ブロブストアに書き込み、記事データには版の種類とブロブのキーだけを
+        revisions フィールドに追記する（記事データの読み書きの量は版の数に比例して増えない）
+        
+        Args:
+            article_id: 記事ID
+            revisions: 版の種類→本文（Noneや空の本文は保存しない）
+            editor: 版を作成した編集エージェント
+            
+        Returns:
+            bool: 保存成功の可否
+        """
+        try:
+            if not self._ensure_loaded():
+                return False
+            
+            blob_store = self.get_blob_store()
+            created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            entries = []
+            for kind, text in revisions.items():
+                if not text:
+                    continue
+                entry = {"kind": kind, "blob": blob_store.put(text), "length": len(text), "created_at": created_at}
+                if editor:
+                    entry["editor"] = editor
+                entries.append(entry)
+            
+            # 他プロセスの変更を古い記事データで上書きしないよう、ロック内で最新化してから更新
+            with self.storage.lock():
+                self.reload_if_changed()
+                article = self._articles_by_id.get(article_id)
+                if not article:
+                    print(f"❌ ID {article_id} の記事が見つかりません")
+                    return False
+                if not entries:
+                    return True
+                
+                article['revisions'] = list(article.get('revisions', [])) + entries
+                self.storage.update_article(self.articles_data, article, ['revisions'])
+                self.storage.mark_synced()
+            
+            print(f"✅ 記事の版を保存しました: ID {article_id} ({', '.join(entry['kind'] for entry in entries)})")
+            return True
+            
+        except Exception as e:
+            print(f"❌ 記事の版の保存エラー: {e}")
+            return False
+    
+    def get_article_revisions(self, article_id: int, with_content: bool = False) -> List[Dict]:
+        """
+        記事の版の一覧を取得
+        
+        Args:
+            article_id: 記事ID
+            with_content: ブロブストアから本文を読み込んで content に入れるか
+            
+        Returns:
+            List[Dict]: 版の一覧（保存順）
+        """
+        self.reload_if_changed()
+        article = self._articles_by_id.get(article_id)
+        if not article:
+            return []
+        
+        revisions = [dict(entry) for entry in article.get('revisions', [])]
+        if with_content:
+            blob_store = self.get_blob_store()
+            for entry in revisions:
+                entry['content'] = blob_store.get(entry['blob'])
+        return revisions
+    
     def save_articles(self) -> bool:
         """
         記事データをファイルに保存
@@ -199,15 +891,38 @@ class DataManager:
             bool: 保存成功の可否
         """
         try:
-            with open(self.data_file_path, 'w', encoding='utf-8') as f:
-                json.dump(self.articles_data, f, ensure_ascii=False, indent=2)
-            
+            with self.storage.lock():
+                self.storage.save_all(self.articles_data)
+                self.storage.mark_synced()
             return True
             
         except Exception as e:
             print(f"❌ 記事データの保存エラー: {e}")
             return False
     
+    def compact_storage(self) -> bool:
+        """
+        ジャーナルをスナップショットに畳み込む（ジャーナルモード以外では全体保存）
+        
+        Returns:
+            bool: 成功の可否
+        """
+        if not self.articles_data:
+            return False
+        
+        if hasattr(self.storage, 'compact'):
+            try:
+                with self.storage.lock():
+                    self.storage.compact(self.articles_data)
+                    self.storage.mark_synced()
+                print(f"✅ 記事データをコンパクションしました: {self.data_file_path}")
+                return True
+            except Exception as e:
+                print(f"❌ コンパクションエラー: {e}")
+                return False
+        
+        return self.save_articles()
+    
     def get_settings(self) -> Dict:
         """
         設定情報を取得
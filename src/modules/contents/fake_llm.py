@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+フェイクLLMモジュール
+APIを呼ばずに、シードで決まる日本語の記事・校閲結果・タイトル案を返すLLMの代わり
+（最初のトークンまでの待ち時間・生成速度・エラー率を設定でき、APIの費用をかけずにパイプラインの負荷試験を行う）
+
+llm_config.json の各設定で provider を "fake" にすると、記事生成・OpenAI編集・Claude編集がこのモジュールを使う
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional
+from .editor_prompts import BUZZ_SYSTEM_PROMPT, PROOFREAD_SYSTEM_PROMPT, TITLE_SYSTEM_PROMPT
+from .llm_clients import load_llm_config_file
+from .token_budget import count_message_tokens, count_tokens, parse_length
+
+DEFAULT_FAKE_LLM_SETTINGS = {
+    "seed": 42,
+    "latency": 0.5,
+    "tokens_per_second": 150,
+    "error_rate": 0.0
+}
+
+# プロバイダー側のプロンプトキャッシュの模擬（OpenAIと同じく1024トークン以上の共通の先頭部分を128トークン単位で数える）
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_BLOCK_TOKENS = 128
+RECENT_PROMPTS = 64
+
+# ストリーミングで1回に返す文字数
+STREAM_CHUNK_CHARS = 4
+
+# トピックの指定がないプロンプトにはこの中から選ぶ
+DEFAULT_TOPICS = ["Python", "Docker", "Git", "TypeScript", "GitHub Actions", "SQL"]
+TOPIC_PATTERNS = (
+    re.compile(r'記事のトピック・テーマ:\s*(.+)'),
+)
+LENGTH_PATTERNS = (
+    re.compile(r'推奨文字数:\s*(.+)'),
+    re.compile(r'文字数:\s*(.+)')
+)
+
+TITLE_PATTERNS = [
+    "{topic}入門：現場で役立つ{n}つのポイント",
+    "{topic}を実践で使いこなすためのガイド",
+    "今日から始める{topic}：基礎から応用まで",
+    "{topic}で開発効率を上げる{n}つの方法",
+    "知らないと損する{topic}の活用術"
+]
+HEADINGS = [
+    "{topic}とは",
+    "なぜ{topic}が必要なのか",
+    "基本的な使い方",
+    "実践例：小さなプロジェクトで試す",
+    "よくある落とし穴と対策",
+    "パフォーマンスを意識した設計",
+    "トラブルシューティング",
+    "ベストプラクティス"
+]
+SENTENCES = [
+    "{topic}は、日々の開発で繰り返し発生する作業を減らすための考え方として注目されています。",
+    "まずは小さな範囲で試し、効果を計測してから適用範囲を広げるのがおすすめです。",
+    "特に{term}と組み合わせると、設定の見通しが良くなり、チーム内での共有も容易になります。",
+    "初心者がつまずきやすいのは、{term}の役割を曖昧なまま進めてしまう点です。",
+    "実際の現場では、{term}の設定ミスが原因で数時間を無駄にすることも珍しくありません。",
+    "公式ドキュメントには基本的な手順が載っていますが、運用で必要になる細かな注意点は経験から学ぶことが多いでしょう。",
+    "ここでは、手元の環境で再現できる最小限の例を使って順に説明します。",
+    "処理時間を計測すると、改善前と比べて体感できるほどの差が出ることがわかります。",
+    "一方で、{term}に頼りすぎると、かえって構成が複雑になる点には注意が必要です。",
+    "導入前に、既存の仕組みとの役割分担を整理しておくと移行がスムーズになります。",
+    "エラーが発生した場合は、まずログを確認し、入力値と設定値のどちらに原因があるかを切り分けましょう。",
+    "慣れてきたら、自動テストやCIに組み込んで、変更のたびに同じ手順を確認できるようにすると安心です。"
+]
+TERMS = ["設定ファイル", "キャッシュ", "非同期処理", "型ヒント", "ログ出力", "コンテナ", "テストコード", "環境変数",
+         "依存関係の管理", "CI/CD"]
+CODE_BLOCK = """```python
+import time
+
+
+def measure(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    print(f"{func.__name__}: {time.perf_counter() - started:.3f}秒")
+    return result
+```"""
+CLOSING = ("## まとめと次のステップ\n\n{topic}は、小さく始めて効果を確かめながら広げていくのが成功の近道です。"
+           "ぜひ手元の環境で試してみてください。\n\n"
+           "皆さんの{topic}の活用事例や、つまずいたポイントがあれば、ぜひコメントで教えてください！")
+BUZZ_PARAGRAPH = "実は、{term}を見直すだけで処理時間が{percent}%短縮できたケースもあります。意外と知られていないこのポイントを、本記事で詳しく紹介します。"
+TITLE_REASONS = ["具体的な数字で読むメリットを明示", "初心者にも届く入門感を強調", "実践的な内容であることを示す",
+                 "検索されやすいキーワードを先頭に配置", "好奇心を刺激してクリックを促す"]
+
+
+class FakeLLMError(RuntimeError):
+    """フェイクLLMが模擬したAPIエラー（status_code は 429 または 500）"""
+    
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Error code: {status_code} - {message}")
+        self.status_code = status_code
+        self.message = message
+
+
+def message_text(content) -> str:
+    """メッセージの content（文字列、または {"type": "text", "text": ...} のリスト）を文字列にする"""
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content or [])
+
+
+class FakeLLMBackend:
+    """
+    決定的な応答を返すフェイクLLM
+    
+    応答はシード・モデル・メッセージと、同じリクエストが何回目かから決まる（同じ順で呼べば実行のたびに同じ結果）。
+    システムプロンプトから校閲・バズ要素追加・タイトル改善・記事生成のどれかを判断し、
+    記事生成はプロンプトの推奨文字数に合わせた長さの日本語記事を返す
+    """
+    
+    def __init__(self, seed: int = DEFAULT_FAKE_LLM_SETTINGS["seed"], latency: float = DEFAULT_FAKE_LLM_SETTINGS["latency"],
+                 tokens_per_second: float = DEFAULT_FAKE_LLM_SETTINGS["tokens_per_second"],
+                 error_rate: float = DEFAULT_FAKE_LLM_SETTINGS["error_rate"]):
+        """
+        Args:
+            seed: 乱数のシード
+            latency: 最初のトークンまでの秒数
+            tokens_per_second: 生成速度（0なら待たない）
+            error_rate: APIエラー（429 / 500）を返す割合（0〜1）
+        """
+        self.seed = seed
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._error_rng = random.Random(f"{seed}:errors")
+        self._occurrences: Dict[str, int] = {}
+        self._recent_prompts: List[str] = []
+        self._lock = threading.Lock()
+    
+    def respond(self, messages: List[Dict], model: str, max_tokens: int = None) -> Dict:
+        """
+        応答を作成（待ち時間は含まない。wait / iter_chunks で模擬する）
+        
+        Args:
+            messages: メッセージ（role, content の辞書のリスト）
+            model: モデル名
+            max_tokens: 最大出力トークン数（超える分は切り詰める）
+        
+        Returns:
+            Dict: text, finish_reason, input_tokens, output_tokens, cached_input_tokens
+        
+        Raises:
+            FakeLLMError: エラー率に従って模擬したAPIエラー
+        """
+        messages = [{"role": message.get("role"), "content": message_text(message.get("content"))} for message in messages]
+        digest = hashlib.sha256(json.dumps([self.seed, model, messages], ensure_ascii=False).encode('utf-8')).hexdigest()
+        prompt = "\n".join(message["content"] for message in messages)
+        
+        with self._lock:
+            self.requests += 1
+            if self.error_rate and self._error_rng.random() < self.error_rate:
+                self.errors += 1
+                status_code = self._error_rng.choice((429, 500))
+                raise FakeLLMError(status_code, "Rate limit exceeded (fake)" if status_code == 429 else "Internal server error (fake)")
+            occurrence = self._occurrences.get(digest, 0)
+            self._occurrences[digest] = occurrence + 1
+            cached_chars = max((len(os.path.commonprefix([prompt, recent])) for recent in self._recent_prompts), default=0)
+            self._recent_prompts = (self._recent_prompts + [prompt])[-RECENT_PROMPTS:]
+        
+        rng = random.Random(f"{digest}:{occurrence}")
+        text = self._compose(rng, messages)
+        finish_reason = "stop"
+        if max_tokens and count_tokens(text, model) > max_tokens:
+            # 日本語はおおよそ1文字1トークンなので、文字数で切り詰める
+            text = text[:max_tokens]
+            finish_reason = "length"
+        
+        cached_tokens = count_tokens(prompt[:cached_chars], model)
+        if cached_tokens < PROMPT_CACHE_MIN_TOKENS:
+            cached_tokens = 0
+        return {
+            "text": text,
+            "finish_reason": finish_reason,
+            "input_tokens": count_message_tokens(messages, model),
+            "output_tokens": count_tokens(text, model),
+            "cached_input_tokens": cached_tokens // PROMPT_CACHE_BLOCK_TOKENS * PROMPT_CACHE_BLOCK_TOKENS
+        }
+    
+    def _compose(self, rng: random.Random, messages: List[Dict]) -> str:
+        """システムプロンプトに応じた応答テキスト"""
+        system = next((message["content"] for message in messages if message["role"] == "system"), "")
+        user = "\n".join(message["content"] for message in messages if message["role"] != "system")
+        topic = self._find(TOPIC_PATTERNS, user) or rng.choice(DEFAULT_TOPICS)
+        
+        if system == TITLE_SYSTEM_PROMPT:
+            title = re.search(r'元のタイトル:\s*(.+)', user)
+            if title:
+                topic = next((candidate for candidate in DEFAULT_TOPICS if candidate in title.group(1)), topic)
+            return "\n".join(f"{index}. {pattern.format(topic=topic, n=rng.randint(3, 7))} - {reason}"
+                             for index, (pattern, reason) in enumerate(zip(TITLE_PATTERNS, rng.sample(TITLE_REASONS, 5)), 1))
+        
+        if system in (PROOFREAD_SYSTEM_PROMPT, BUZZ_SYSTEM_PROMPT):
+            article = user.split("記事内容:\n", 1)[-1]
+            if system == BUZZ_SYSTEM_PROMPT:
+                article = BUZZ_PARAGRAPH.format(term=rng.choice(TERMS), percent=rng.choice((20, 30, 40, 50))) + "\n\n" + article
+            return article
+        
+        length = parse_length(self._find(LENGTH_PATTERNS, user) or "") or (800, 1200)
+        return self._article(rng, topic, rng.randint(*length))
+    
+    @staticmethod
+    def _find(patterns, text: str) -> Optional[str]:
+        for pattern in patterns:
+            match = pattern.search(text)
+            if match:
+                return match.group(1).strip()
+        return None
+    
+    @staticmethod
+    def _article(rng: random.Random, topic: str, target_chars: int) -> str:
+        """目標文字数に届くまで見出しと段落を重ねた記事（タイトル行付き）"""
+        headings = rng.sample(HEADINGS, len(HEADINGS))
+        blocks = []
+        length = len(CLOSING.format(topic=topic))
+        section_count = 0
+        while length < target_chars:
+            # 見出しごとに段落2つ。2番目の見出しにはコード例、3番目には箇条書きを付ける
+            if len(blocks) % 3 == 0:
+                section_count += 1
+                block = "## " + headings[(section_count - 1) % len(headings)].format(topic=topic)
+            else:
+                block = "".join(rng.choice(SENTENCES).format(topic=topic, term=rng.choice(TERMS))
+                                for _ in range(rng.randint(2, 4)))
+                if len(blocks) % 3 == 2 and section_count == 2:
+                    block += "\n\n" + CODE_BLOCK
+                elif len(blocks) % 3 == 2 and section_count == 3:
+                    block += "\n\n" + "\n".join(f"- {term}の扱いを確認する" for term in rng.sample(TERMS, 3))
+            blocks.append(block)
+            length += len(block) + 2
+        
+        title = rng.choice(TITLE_PATTERNS).format(topic=topic, n=rng.randint(3, 7))
+        return f"タイトル: {title}\n\n" + "\n\n".join(blocks + [CLOSING.format(topic=topic)])
+    
+    def duration(self, output_tokens: int) -> float:
+        """応答全体を返し終えるまでの秒数"""
+        if not self.tokens_per_second:
+            return self.latency
+        return self.latency + output_tokens / self.tokens_per_second
+    
+    def wait(self, response: Dict) -> None:
+        """応答全体を返し終えるまで待つ（ストリーミングしない呼び出し用）"""
+        time.sleep(self.duration(response["output_tokens"]))
+    
+    async def await_response(self, response: Dict) -> None:
+        """wait の非同期版"""
+        await asyncio.sleep(self.duration(response["output_tokens"]))
+    
+    def iter_chunks(self, response: Dict) -> Iterator[str]:
+        """
+        応答テキストを生成速度に合わせて少しずつ返す（最初のチャンクの前に latency だけ待つ）
+        
+        Args:
+            response: respond の戻り値
+        
+        Yields:
+            str: テキストの断片
+        """
+        text = response["text"]
+        time.sleep(self.latency)
+        started = time.perf_counter()
+        seconds_per_char = response["output_tokens"] / len(text) / self.tokens_per_second if self.tokens_per_second and text else 0
+        for position in range(0, len(text), STREAM_CHUNK_CHARS):
+            # 送った文字数に見合う時間まで待つ（sleepの誤差を次のチャンクで吸収する）
+            delay = started + position * seconds_per_char - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            yield text[position:position + STREAM_CHUNK_CHARS]
+    
+    def stats(self) -> Dict[str, int]:
+        """リクエスト数とエラー数"""
+        with self._lock:
+            return {"requests": self.requests, "errors": self.errors}
+
+
+def _openai_usage(response: Dict) -> SimpleNamespace:
+    return SimpleNamespace(
+        prompt_tokens=response["input_tokens"],
+        completion_tokens=response["output_tokens"],
+        total_tokens=response["input_tokens"] + response["output_tokens"],
+        prompt_tokens_details=SimpleNamespace(cached_tokens=response["cached_input_tokens"])
+    )
+
+
+def _openai_completion(response: Dict, model: str) -> SimpleNamespace:
+    message = SimpleNamespace(role="assistant", content=response["text"])
+    return SimpleNamespace(model=model, choices=[SimpleNamespace(index=0, message=message, finish_reason=response["finish_reason"])],
+                           usage=_openai_usage(response))
+
+
+class FakeOpenAIClient:
+    """
+    OpenAIクライアント（client.chat.completions.create）と同じ形で呼べるフェイクLLM
+    
+    ストリーミング（stream=True、stream_options の include_usage）にも対応する
+    """
+    
+    def __init__(self, backend: FakeLLMBackend):
+        """
+        Args:
+            backend: フェイクLLM
+        """
+        self.backend = backend
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+    
+    def _create(self, model: str, messages: List[Dict], max_tokens: int = None, stream: bool = False,
+                stream_options: Dict = None, **params):
+        response = self.backend.respond(messages, model, max_tokens)
+        if stream:
+            return self._stream(response, model, bool((stream_options or {}).get("include_usage")))
+        self.backend.wait(response)
+        return _openai_completion(response, model)
+    
+    def _stream(self, response: Dict, model: str, include_usage: bool) -> Iterator[SimpleNamespace]:
+        for chunk in self.backend.iter_chunks(response):
+            delta = SimpleNamespace(role="assistant", content=chunk)
+            yield SimpleNamespace(model=model, choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)], usage=None)
+        if include_usage:
+            yield SimpleNamespace(model=model, choices=[], usage=_openai_usage(response))
+    
+    def close(self) -> None:
+        pass
+
+
+class AsyncFakeOpenAIClient:
+    """OpenAI非同期クライアント（await client.chat.completions.create）と同じ形で呼べるフェイクLLM"""
+    
+    def __init__(self, backend: FakeLLMBackend):
+        """
+        Args:
+            backend: フェイクLLM
+        """
+        self.backend = backend
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+    
+    async def _create(self, model: str, messages: List[Dict], max_tokens: int = None, **params):
+        response = self.backend.respond(messages, model, max_tokens)
+        await self.backend.await_response(response)
+        return _openai_completion(response, model)
+    
+    async def close(self) -> None:
+        pass
+
+
+class FakeAnthropicClient:
+    """Anthropicのクライアント（client.messages.create）と同じ形で呼べるフェイクLLM"""
+    
+    def __init__(self, backend: FakeLLMBackend):
+        """
+        Args:
+            backend: フェイクLLM
+        """
+        self.backend = backend
+        self.messages = SimpleNamespace(create=self._create)
+    
+    def _create(self, model: str, messages: List[Dict], max_tokens: int = None, system=None, **params):
+        request = [{"role": "system", "content": message_text(system)}] if system else []
+        request.extend(messages)
+        response = self.backend.respond(request, model, max_tokens)
+        self.backend.wait(response)
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=response["text"])],
+            stop_reason="max_tokens" if response["finish_reason"] == "length" else "end_turn",
+            usage=SimpleNamespace(input_tokens=response["input_tokens"] - response["cached_input_tokens"],
+                                  output_tokens=response["output_tokens"],
+                                  cache_read_input_tokens=response["cached_input_tokens"],
+                                  cache_creation_input_tokens=0)
+        )
+    
+    def close(self) -> None:
+        pass
+
+
+_backend: Optional[FakeLLMBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_fake_llm_backend() -> FakeLLMBackend:
+    """
+    プロセス内で共有するフェイクLLMを取得
+    
+    設定は llm_config.json の fake_llm_settings（seed, latency, tokens_per_second, error_rate）
+    
+    Returns:
+        FakeLLMBackend: フェイクLLM
+    """
+    global _backend
+    
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                settings = dict(DEFAULT_FAKE_LLM_SETTINGS)
+                settings.update(load_llm_config_file().get("fake_llm_settings", {}))
+                _backend = FakeLLMBackend(settings["seed"], settings["latency"], settings["tokens_per_second"],
+                                          settings["error_rate"])
+                print(f"🧪 フェイクLLMを使用します（seed={settings['seed']}, 待ち時間 {settings['latency']}秒, "
+                      f"{settings['tokens_per_second']} tokens/秒, エラー率 {settings['error_rate']:.0%}）")
+    return _backend
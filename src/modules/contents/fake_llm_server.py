@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+フェイクLLMサーバーモジュール
+OpenAI Chat Completions API（/v1/chat/completions）と Anthropic Messages API（/v1/messages）の形で
+フェイクLLMの応答を返すローカルHTTPサーバー
+
+llm_config.json の base_url をこのサーバーに向けると、実際のSDK（openai / anthropic）の
+HTTP通信・リトライ・接続の使い回しまで含めて、APIの費用をかけずに試せる
+"""
+
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from .fake_llm import FakeLLMBackend, FakeLLMError, message_text
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class _FakeLLMRequestHandler(BaseHTTPRequestHandler):
+    """1リクエスト分の処理（keep-alive のため HTTP/1.1、ストリーミングはチャンク転送）"""
+    
+    protocol_version = "HTTP/1.1"
+    backend: FakeLLMBackend = None
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_POST(self):
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+        
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path.endswith("/chat/completions"):
+            self._chat_completions(body)
+        elif path.endswith("/messages"):
+            self._messages(body)
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path: {self.path}", "type": "not_found"}})
+    
+    def _send_json(self, status: int, payload: Dict) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _start_events(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+    
+    def _send_event(self, payload, event: str = None) -> None:
+        data = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+        text = (f"event: {event}\n" if event else "") + f"data: {data}\n\n"
+        encoded = text.encode('utf-8')
+        self.wfile.write(f"{len(encoded):X}\r\n".encode('ascii') + encoded + b"\r\n")
+        self.wfile.flush()
+    
+    def _end_events(self) -> None:
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+    
+    def _chat_completions(self, body: Dict) -> None:
+        """OpenAI Chat Completions API"""
+        model = body.get("model", "")
+        try:
+            response = self.backend.respond(body.get("messages", []), model,
+                                            body.get("max_completion_tokens") or body.get("max_tokens"))
+        except FakeLLMError as e:
+            error_type = "rate_limit_exceeded" if e.status_code == 429 else "server_error"
+            self._send_json(e.status_code, {"error": {"message": e.message, "type": error_type, "code": error_type}})
+            return
+        
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        usage = {
+            "prompt_tokens": response["input_tokens"],
+            "completion_tokens": response["output_tokens"],
+            "total_tokens": response["input_tokens"] + response["output_tokens"],
+            "prompt_tokens_details": {"cached_tokens": response["cached_input_tokens"]}
+        }
+        
+        if not body.get("stream"):
+            self.backend.wait(response)
+            self._send_json(200, {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": response["text"]},
+                             "finish_reason": response["finish_reason"]}],
+                "usage": usage
+            })
+            return
+        
+        def chunk(delta: Dict, finish_reason: str = None) -> Dict:
+            return {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+        
+        self._start_events()
+        self._send_event(chunk({"role": "assistant", "content": ""}))
+        for text in self.backend.iter_chunks(response):
+            self._send_event(chunk({"content": text}))
+        self._send_event(chunk({}, response["finish_reason"]))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            self._send_event({"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                              "model": model, "choices": [], "usage": usage})
+        self._send_event("[DONE]")
+        self._end_events()
+    
+    def _messages(self, body: Dict) -> None:
+        """Anthropic Messages API"""
+        model = body.get("model", "")
+        messages: List[Dict] = []
+        if body.get("system"):
+            messages.append({"role": "system", "content": message_text(body["system"])})
+        messages.extend(body.get("messages", []))
+        try:
+            response = self.backend.respond(messages, model, body.get("max_tokens"))
+        except FakeLLMError as e:
+            error_type = "rate_limit_error" if e.status_code == 429 else "api_error"
+            self._send_json(e.status_code, {"type": "error", "error": {"type": error_type, "message": e.message}})
+            return
+        
+        message_id = f"msg_{uuid.uuid4().hex[:24]}"
+        stop_reason = "max_tokens" if response["finish_reason"] == "length" else "end_turn"
+        usage = {
+            "input_tokens": response["input_tokens"] - response["cached_input_tokens"],
+            "output_tokens": response["output_tokens"],
+            "cache_read_input_tokens": response["cached_input_tokens"],
+            "cache_creation_input_tokens": 0
+        }
+        message = {"id": message_id, "type": "message", "role": "assistant", "model": model,
+                   "content": [{"type": "text", "text": response["text"]}],
+                   "stop_reason": stop_reason, "stop_sequence": None, "usage": usage}
+        
+        if not body.get("stream"):
+            self.backend.wait(response)
+            self._send_json(200, message)
+            return
+        
+        self._start_events()
+        self._send_event({"type": "message_start", "message": dict(message, content=[], stop_reason=None,
+                                                                   usage=dict(usage, output_tokens=0))}, "message_start")
+        self._send_event({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+                         "content_block_start")
+        for text in self.backend.iter_chunks(response):
+            self._send_event({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text}},
+                             "content_block_delta")
+        self._send_event({"type": "content_block_stop", "index": 0}, "content_block_stop")
+        self._send_event({"type": "message_delta", "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                          "usage": {"output_tokens": response["output_tokens"]}}, "message_delta")
+        self._send_event({"type": "message_stop"}, "message_stop")
+        self._end_events()
+
+
+class FakeLLMServer:
+    """
+    フェイクLLMのHTTPサーバー（リクエストごとにスレッドで処理する）
+    
+    OpenAIのクライアントは base_url に url + "/v1"、Anthropicのクライアントは url を指定する
+    """
+    
+    def __init__(self, backend: FakeLLMBackend, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        """
+        Args:
+            backend: 応答を作るフェイクLLM
+            host: 待ち受けるアドレス
+            port: 待ち受けるポート（0なら空いているポート）
+        """
+        handler = type("FakeLLMRequestHandler", (_FakeLLMRequestHandler,), {"backend": backend})
+        self.backend = backend
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> None:
+        """バックグラウンドのスレッドで待ち受けを開始"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-llm-server", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """待ち受けを終了"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+    
+    def serve_forever(self) -> None:
+        """待ち受けを続ける（Ctrl+C で終了）"""
+        print(f"🧪 フェイクLLMサーバーを起動しました: {self.url}（Ctrl+C で終了）")
+        print(f"   OpenAI: base_url = {self.url}/v1")
+        print(f"   Anthropic: base_url = {self.url}")
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\n⏹️ フェイクLLMサーバーを終了します")
+        finally:
+            self.httpd.server_close()
+            stats = self.backend.stats()
+            print(f"📊 リクエスト {stats['requests']}件 / 模擬エラー {stats['errors']}件")
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+LLM応答キャッシュモジュール
+同じリクエスト（プロバイダー・モデル・temperature・メッセージ）への応答をSQLiteに保存し、
+再実行時はAPIを呼ばずに返す（有効期限とサイズ上限付き、古く使われていないものから削除）
+同じプロンプトに同じ下書き・校閲結果を返すため既定では無効で、失敗した実行のやり直しなどで有効にして使う
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from .llm_clients import load_llm_config_file
+
+DEFAULT_CACHE_SETTINGS = {
+    "enabled": False,
+    "path": "data/llm_cache.db",
+    "ttl_hours": 24,
+    "max_size_mb": 100
+}
+
+# キャッシュを読まずにAPIを呼ぶ（結果は保存し直す）指定。環境変数 LLM_CACHE_BYPASS=1 でも有効
+_bypass = contextvars.ContextVar('llm_cache_bypass', default=False)
+_cache = None
+_cache_lock = threading.Lock()
+
+
+@contextmanager
+def bypass_llm_cache(bypass: bool = True) -> Iterator[None]:
+    """
+    このブロック内のLLM呼び出しはキャッシュを読まずにAPIを呼ぶ（結果はキャッシュを更新する）
+    
+    Args:
+        bypass: False の場合は何もしない（キャッシュを読むかどうかを引数で切り替えるため）
+    """
+    if not bypass:
+        yield
+        return
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def is_cache_bypassed() -> bool:
+    """キャッシュを読まない指定がされているか"""
+    return _bypass.get() or os.getenv("LLM_CACHE_BYPASS", "") not in ("", "0")
+
+
+class LLMResponseCache:
+    """
+    LLM応答のディスクキャッシュ（SQLite）
+    
+    キーはリクエスト内容のSHA-256。読み込むたびに最終アクセス日時を更新し、
+    合計サイズが上限を超えたら最終アクセスの古いものから削除する
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            provider TEXT NOT NULL,
+            model TEXT,
+            text TEXT NOT NULL,
+            usage TEXT NOT NULL DEFAULT '{}',
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses(accessed_at);
+    """
+    
+    def __init__(self, path: str = DEFAULT_CACHE_SETTINGS["path"], ttl_hours: float = DEFAULT_CACHE_SETTINGS["ttl_hours"],
+                 max_size_mb: float = DEFAULT_CACHE_SETTINGS["max_size_mb"]):
+        """
+        Args:
+            path: キャッシュファイルのパス
+            ttl_hours: 有効期限（時間）
+            max_size_mb: 応答テキストの合計サイズの上限（MB）
+        """
+        self.path = path
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self._conn = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """接続を取得（初回はスキーマを作成）"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+    
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float, messages: List[Dict], **params) -> str:
+        """
+        リクエスト内容からキーを作成
+        
+        Args:
+            provider: プロバイダー名
+            model: モデル名
+            temperature: temperature
+            messages: メッセージ（role, content の辞書のリスト）
+            **params: 応答に影響するその他のパラメータ（max_tokens など）
+        
+        Returns:
+            str: キー（SHA-256の16進数）
+        """
+        request = {"provider": provider, "model": model, "temperature": temperature,
+                   "messages": messages, "params": params}
+        encoded = json.dumps(request, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+    
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, int]]]:
+        """
+        キャッシュから応答を取得（期限切れは削除して None）
+        
+        Args:
+            key: キー
+        
+        Returns:
+            Optional[Tuple[str, Dict[str, int]]]: (応答テキスト, 元のトークン使用量)
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT text, usage, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[2] > self.ttl_seconds:
+                with conn:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            with conn:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0], json.loads(row[1])
+    
+    def put(self, key: str, provider: str, model: str, text: str, usage: Dict[str, int] = None) -> None:
+        """
+        応答を保存し、サイズ上限を超えたら最終アクセスの古いものから削除
+        
+        Args:
+            key: キー
+            provider: プロバイダー名
+            model: モデル名
+            text: 応答テキスト
+            usage: トークン使用量
+        """
+        now = time.time()
+        size = len(text.encode('utf-8'))
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, provider, model, text, usage, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, provider, model, text, json.dumps(usage or {}), size, now, now)
+                )
+                self._evict(conn, now)
+    
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """期限切れの応答と、サイズ上限を超えた分の古い応答を削除"""
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_size:
+            return
+        
+        excess = total - self.max_size
+        removed = 0
+        keys = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            keys.append((key,))
+            removed += size
+            if removed >= excess:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+    
+    def clear(self) -> int:
+        """
+        キャッシュを全て削除
+        
+        Returns:
+            int: 削除した件数
+        """
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                return conn.execute("DELETE FROM responses").rowcount
+    
+    def stats(self) -> Dict:
+        """件数・合計サイズ・プロバイダー別の件数"""
+        with self._lock:
+            conn = self._connect()
+            count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            providers = dict(conn.execute("SELECT provider, COUNT(*) FROM responses GROUP BY provider").fetchall())
+        return {"entries": count, "size_bytes": size, "max_size_bytes": self.max_size,
+                "ttl_hours": self.ttl_seconds / 3600, "providers": providers}
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    プロセス内で共有するLLM応答キャッシュを取得
+    
+    設定は llm_config.json の llm_cache（enabled, path, ttl_hours, max_size_mb）
+    
+    Returns:
+        Optional[LLMResponseCache]: キャッシュ（無効な場合は None）
+    """
+    global _cache
+    
+    settings = dict(DEFAULT_CACHE_SETTINGS)
+    settings.update(load_llm_config_file().get("llm_cache", {}))
+    if not settings["enabled"]:
+        return None
+    
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache(settings["path"], settings["ttl_hours"], settings["max_size_mb"])
+    return _cache
+
+
+def lookup_cached_response(provider: str, model: str, temperature: float, messages: List[Dict],
+                           **params) -> Tuple[Optional[str], Optional[str]]:
+    """
+    キャッシュから応答を検索
+    
+    Args:
+        provider: プロバイダー名
+        model: モデル名
+        temperature: temperature
+        messages: メッセージ（role, content の辞書のリスト）
+        **params: 応答に影響するその他のパラメータ（max_tokens など）
+    
+    Returns:
+        Tuple[Optional[str], Optional[str]]: (キー, 応答テキスト)。キャッシュ無効時のキーと、
+                                             未保存・期限切れ・読まない指定の場合の応答テキストは None
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return None, None
+    
+    key = cache.make_key(provider, model, temperature, messages, **params)
+    if is_cache_bypassed():
+        return key, None
+    
+    try:
+        cached = cache.get(key)
+    except Exception as e:
+        print(f"⚠️ LLM応答キャッシュの読み込みエラー: {e}")
+        return key, None
+    if cached is None:
+        return key, None
+    
+    print(f"💾 キャッシュ済みの応答を使用します（{provider}/{model}）")
+    return key, cached[0]
+
+
+def store_cached_response(key: Optional[str], provider: str, model: str, text: str,
+                          usage: Dict[str, int] = None) -> None:
+    """
+    応答をキャッシュに保存（キャッシュ無効時・キーがない場合は何もしない）
+    
+    Args:
+        key: lookup_cached_response で得たキー
+        provider: プロバイダー名
+        model: モデル名
+        text: 応答テキスト
+        usage: トークン使用量
+    """
+    cache = get_llm_cache()
+    if cache is None or key is None or not text:
+        return
+    try:
+        cache.put(key, provider, model, text, usage)
+    except Exception as e:
+        print(f"⚠️ LLM応答キャッシュの保存エラー: {e}")
+
+
+def cached_completion(provider: str, model: str, temperature: float, messages: List[Dict],
+                      complete: Callable[[], Tuple[str, Dict[str, int]]], **params) -> Tuple[str, Dict[str, int]]:
+    """
+    キャッシュを確認してからLLMを呼び出す
+    
+    キャッシュにあればAPIを呼ばずに返し、トークン使用量は空とする（費用がかからないため）
+    
+    Args:
+        provider: プロバイダー名
+        model: モデル名
+        temperature: temperature
+        messages: メッセージ（role, content の辞書のリスト）
+        complete: APIを呼び出して (応答テキスト, トークン使用量) を返す関数
+        **params: 応答に影響するその他のパラメータ
+    
+    Returns:
+        Tuple[str, Dict[str, int]]: (応答テキスト, トークン使用量)
+    """
+    key, cached_text = lookup_cached_response(provider, model, temperature, messages, **params)
+    if cached_text is not None:
+        return cached_text, {}
+    
+    text, usage = complete()
+    store_cached_response(key, provider, model, text, usage)
+    return text, usage
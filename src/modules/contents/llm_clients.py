@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+LLMクライアントモジュール
+llm_config.json の読み込みと、プロセス内で共有するLLMクライアント（接続プール）のレジストリ
+（設定の provider からクライアントを選び、base_url で接続先を差し替えられる）
+"""
+
+import importlib.util
+import json
+import os
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+
+CONFIG_PATHS = ("llm_config.json", "../llm_config.json", "../../llm_config.json")
+
+# Chat Completions API の形で呼べるプロバイダーと、APIキーが不要なプロバイダー
+# （local は llama.cpp server / vLLM / Ollama などOpenAI互換のローカルサーバー）
+CHAT_COMPLETIONS_PROVIDERS = ("openai", "local", "fake")
+KEYLESS_PROVIDERS = ("local", "fake")
+
+# ローカルサーバーの既定の接続先（llama.cpp server の既定ポート）
+DEFAULT_LOCAL_BASE_URL = "http://127.0.0.1:8080/v1"
+
+# HTTP接続の既定値（llm_config.json の http_settings で上書きできる）
+DEFAULT_HTTP_SETTINGS = {
+    "timeout": 120.0,
+    "connect_timeout": 10.0,
+    "max_connections": 20,
+    "max_keepalive_connections": 10,
+    "keepalive_expiry": 60.0,
+    "http2": True
+}
+
+_config_cache: Optional[Tuple[str, tuple, Dict]] = None
+_clients: Dict[Hashable, object] = {}
+# クライアントの作成中に共有のHTTPクライアントを取得するため再入可能にする
+_clients_lock = threading.RLock()
+
+
+def load_llm_config_file() -> Dict:
+    """
+    llm_config.json を読み込み（ファイルが変わらない限り読み直さず同じ内容を返す）
+    
+    Returns:
+        Dict: 設定ファイル全体（見つからない場合は空の辞書）
+    """
+    global _config_cache
+    
+    for config_path in CONFIG_PATHS:
+        try:
+            stat = os.stat(config_path)
+        except FileNotFoundError:
+            continue
+        
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if _config_cache and _config_cache[0] == config_path and _config_cache[1] == signature:
+            return _config_cache[2]
+        
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config_data = json.load(f)
+        print(f"✅ LLM設定ファイルを読み込みました: {config_path}")
+        _config_cache = (config_path, signature, config_data)
+        return config_data
+    
+    return {}
+
+
+def get_http_settings() -> Dict:
+    """HTTP接続設定（既定値に llm_config.json の http_settings を重ねたもの）"""
+    settings = dict(DEFAULT_HTTP_SETTINGS)
+    settings.update(load_llm_config_file().get("http_settings", {}))
+    return settings
+
+
+def _httpx_client_options(settings: Dict) -> Dict:
+    """httpx.Client / AsyncClient の共通オプション（HTTP/2はh2がある場合のみ）"""
+    import httpx
+    
+    return {
+        "timeout": httpx.Timeout(settings["timeout"], connect=settings["connect_timeout"]),
+        "limits": httpx.Limits(max_connections=settings["max_connections"],
+                               max_keepalive_connections=settings["max_keepalive_connections"],
+                               keepalive_expiry=settings["keepalive_expiry"]),
+        "http2": bool(settings["http2"]) and importlib.util.find_spec("h2") is not None
+    }
+
+
+def _get_or_create(key: Hashable, factory):
+    """レジストリからクライアントを取得（なければ作成して登録）"""
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = factory()
+    return client
+
+
+def get_http_client():
+    """
+    LLMクライアントが共有するHTTPクライアントを取得（接続プール・タイムアウト・HTTP/2は http_settings に従う）
+    
+    Returns:
+        httpx.Client: HTTPクライアント
+    """
+    def create():
+        import httpx
+        
+        return httpx.Client(**_httpx_client_options(get_http_settings()))
+    
+    return _get_or_create(("httpx",), create)
+
+
+def get_openai_client(api_key: str, base_url: str = None):
+    """
+    OpenAIクライアントを取得（APIキーと接続先ごとに1つを作成し、接続プールは get_http_client を共有）
+    
+    Args:
+        api_key: OpenAI APIキー
+        base_url: 接続先（省略時はOpenAI）
+    
+    Returns:
+        openai.OpenAI: クライアント
+    """
+    def create():
+        import openai
+        
+        return openai.OpenAI(api_key=api_key, base_url=base_url, http_client=get_http_client())
+    
+    return _get_or_create(("openai", api_key, base_url), create)
+
+
+def create_async_openai_client(api_key: str, base_url: str = None):
+    """
+    OpenAI非同期クライアントを作成
+    
+    非同期の接続プールは作成したイベントループでしか使えないため共有せず、
+    呼び出し側がループ内で使い回して最後に close() する
+    
+    Args:
+        api_key: OpenAI APIキー
+        base_url: 接続先（省略時はOpenAI）
+    
+    Returns:
+        openai.AsyncOpenAI: クライアント
+    """
+    import httpx
+    import openai
+    
+    http_client = httpx.AsyncClient(**_httpx_client_options(get_http_settings()))
+    return openai.AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+
+
+def requires_api_key(provider: str) -> bool:
+    """プロバイダーの利用にAPIキーが必要か"""
+    return provider not in KEYLESS_PROVIDERS
+
+
+def cache_provider_name(settings: Dict) -> str:
+    """
+    LLM応答キャッシュのキーに使うプロバイダー名（base_url を指定した場合は接続先ごとに分ける）
+    
+    Args:
+        settings: llm_config.json の各設定（provider, base_url）
+    
+    Returns:
+        str: プロバイダー名
+    """
+    provider = settings.get("provider", "openai")
+    base_url = settings.get("base_url")
+    return f"{provider}@{base_url}" if base_url else provider
+
+
+def get_chat_client(settings: Dict):
+    """
+    設定の provider に応じて Chat Completions API の形で呼べるクライアントを取得
+    
+    Args:
+        settings: llm_config.json の各設定（provider, api_key, base_url）
+    
+    Returns:
+        openai.OpenAI / FakeOpenAIClient: クライアント（local はOpenAIクライアントの接続先をローカルサーバーにしたもの）
+    
+    Raises:
+        ValueError: 未対応のプロバイダー、またはAPIキーがない場合
+        ImportError: openaiライブラリがない場合
+    """
+    provider = settings.get("provider", "openai")
+    if provider == "fake":
+        from .fake_llm import FakeOpenAIClient, get_fake_llm_backend
+        
+        return _get_or_create(("fake",), lambda: FakeOpenAIClient(get_fake_llm_backend()))
+    if provider == "local":
+        # ローカルサーバーはAPIキーを確認しないことが多いが、SDKは空のキーを受け付けないため仮の値を渡す
+        return get_openai_client(settings.get("api_key") or "local", settings.get("base_url") or DEFAULT_LOCAL_BASE_URL)
+    if provider != "openai":
+        raise ValueError(f"未対応のプロバイダー: {provider}")
+    if not settings.get("api_key"):
+        raise ValueError("OpenAI APIキーが設定されていません。")
+    return get_openai_client(settings["api_key"], settings.get("base_url"))
+
+
+def create_async_chat_client(settings: Dict):
+    """
+    get_chat_client の非同期版（呼び出し側がイベントループ内で使い回して最後に close() する）
+    
+    Args:
+        settings: llm_config.json の各設定（provider, api_key, base_url）
+    
+    Returns:
+        openai.AsyncOpenAI / AsyncFakeOpenAIClient: クライアント
+    
+    Raises:
+        ValueError: 未対応のプロバイダー、またはAPIキーがない場合
+        ImportError: openaiライブラリがない場合
+    """
+    provider = settings.get("provider", "openai")
+    if provider == "fake":
+        from .fake_llm import AsyncFakeOpenAIClient, get_fake_llm_backend
+        
+        return AsyncFakeOpenAIClient(get_fake_llm_backend())
+    if provider == "local":
+        return create_async_openai_client(settings.get("api_key") or "local",
+                                          settings.get("base_url") or DEFAULT_LOCAL_BASE_URL)
+    if provider != "openai":
+        raise ValueError(f"未対応のプロバイダー: {provider}")
+    if not settings.get("api_key"):
+        raise ValueError("OpenAI APIキーが設定されていません。")
+    return create_async_openai_client(settings["api_key"], settings.get("base_url"))
+
+
+def get_anthropic_client(api_key: str, base_url: str = None):
+    """
+    Anthropicクライアントを取得（APIキーと接続先ごとに1つを作成し、接続プールは get_http_client を共有）
+    
+    Args:
+        api_key: Anthropic APIキー
+        base_url: 接続先（省略時はAnthropic）
+    
+    Returns:
+        anthropic.Anthropic: クライアント
+    """
+    def create():
+        import anthropic
+        
+        return anthropic.Anthropic(api_key=api_key, base_url=base_url, http_client=get_http_client())
+    
+    return _get_or_create(("anthropic", api_key, base_url), create)
+
+
+def close_llm_clients() -> None:
+    """共有しているクライアントの接続を閉じてレジストリを空にする"""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    
+    for client in clients:
+        close = getattr(client, 'close', None)
+        if close:
+            try:
+                close()
+            except Exception as e:
+                print(f"⚠️ LLMクライアントの終了エラー: {e}")
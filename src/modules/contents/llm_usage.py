@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+LLMトークン使用量モジュール
+OpenAI / Claude（Anthropic Messages API）の応答からトークン数を取り出し、処理ごとに合算する
+（cached_input_tokens は入力のうちプロバイダー側のプロンプトキャッシュから読まれたトークン数）
+"""
+
+from typing import Dict, Optional
+
+USAGE_KEYS = ('input_tokens', 'output_tokens', 'cached_input_tokens')
+
+
+def usage_from_openai(response) -> Dict[str, int]:
+    """
+    OpenAI Chat Completions の応答からトークン数を取得
+    
+    Args:
+        response: client.chat.completions.create の戻り値
+    
+    Returns:
+        Dict[str, int]: {"input_tokens": 入力トークン数, "output_tokens": 出力トークン数,
+                         "cached_input_tokens": キャッシュから読まれた入力トークン数}
+    """
+    usage = getattr(response, 'usage', None)
+    details = getattr(usage, 'prompt_tokens_details', None)
+    return {
+        "input_tokens": getattr(usage, 'prompt_tokens', 0) or 0,
+        "output_tokens": getattr(usage, 'completion_tokens', 0) or 0,
+        "cached_input_tokens": getattr(details, 'cached_tokens', 0) or 0
+    }
+
+
+def usage_from_anthropic(response) -> Dict[str, int]:
+    """
+    Anthropic Messages API の応答からトークン数を取得
+    
+    Anthropicの input_tokens はキャッシュの読み書き分を含まないため、足して入力全体のトークン数にする
+    
+    Args:
+        response: client.messages.create の戻り値
+    
+    Returns:
+        Dict[str, int]: {"input_tokens": 入力トークン数, "output_tokens": 出力トークン数,
+                         "cached_input_tokens": キャッシュから読まれた入力トークン数}
+    """
+    usage = getattr(response, 'usage', None)
+    cache_read = getattr(usage, 'cache_read_input_tokens', 0) or 0
+    cache_creation = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+    return {
+        "input_tokens": (getattr(usage, 'input_tokens', 0) or 0) + cache_read + cache_creation,
+        "output_tokens": getattr(usage, 'output_tokens', 0) or 0,
+        "cached_input_tokens": cache_read
+    }
+
+
+def merge_usage(*usages: Optional[Dict[str, int]]) -> Dict[str, int]:
+    """
+    トークン数を合算（None や空の辞書は無視する）
+    
+    Returns:
+        Dict[str, int]: 合算したトークン数
+    """
+    return {key: sum((usage or {}).get(key, 0) for usage in usages) for key in USAGE_KEYS}
+
+
+def log_prompt_cache(usage: Dict[str, int]) -> None:
+    """
+    プロバイダー側のプロンプトキャッシュの利用状況を表示
+    
+    Args:
+        usage: usage_from_openai / usage_from_anthropic の戻り値
+    """
+    input_tokens = usage.get('input_tokens', 0)
+    if not input_tokens:
+        return
+    cached = usage.get('cached_input_tokens', 0)
+    print(f"🧊 プロンプトキャッシュ: 入力 {input_tokens} tokens のうち {cached} tokens がキャッシュ済み"
+          f"（{cached / input_tokens:.0%}）")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+ローカルLLMモジュール
+OpenAI互換のローカルサーバー（llama.cpp server / vLLM / Ollama）に、下書き生成やタイトル案など
+安く済ませたい工程を割り当てる（レート制限のあるクラウドのAPIの呼び出し回数と費用を減らす）
+
+ローカルLLMで失敗した工程は、設定に応じてクラウドのLLMで実行し直す
+"""
+
+from typing import Dict, List, Optional, Tuple
+from .llm_cache import cached_completion
+from .llm_clients import DEFAULT_LOCAL_BASE_URL, cache_provider_name, get_chat_client, load_llm_config_file
+from .llm_usage import usage_from_openai
+from .token_budget import plan_max_tokens
+
+# 割り当てられる工程（draft: 記事の下書き生成、proofread: 校閲、buzz: バズ要素追加、title: タイトル改善案）
+LOCAL_LLM_STAGES = ("draft", "proofread", "buzz", "title")
+
+DEFAULT_LOCAL_LLM_SETTINGS = {
+    "enabled": False,
+    "base_url": DEFAULT_LOCAL_BASE_URL,
+    "model": "local-model",
+    "temperature": 0.7,
+    "max_tokens": 4000,
+    "context_window": 8192,
+    "stream": True,
+    "stream_usage": True,
+    "stages": ["draft", "title"],
+    "fallback_to_cloud": True
+}
+
+
+def get_local_llm_settings() -> Dict:
+    """
+    ローカルLLMの設定（既定値に llm_config.json の local_llm_settings を重ねたもの）
+    
+    Returns:
+        Dict: 設定（provider は常に "local"）
+    """
+    settings = dict(DEFAULT_LOCAL_LLM_SETTINGS)
+    settings.update(load_llm_config_file().get("local_llm_settings", {}))
+    settings["provider"] = "local"
+    return settings
+
+
+def is_local_stage(stage: str, settings: Dict = None) -> bool:
+    """工程がローカルLLMに割り当てられているか"""
+    settings = settings or get_local_llm_settings()
+    return bool(settings.get("enabled")) and stage in settings.get("stages", [])
+
+
+def llm_settings_for_stage(stage: str, cloud_settings: Dict) -> List[Dict]:
+    """
+    工程で使うLLM設定を試す順に並べる
+    
+    ローカルLLMに割り当てられた工程は、クラウドの設定（生成の好みなど）にローカルLLMの接続先・モデルを
+    重ねた設定を先頭にし、fallback_to_cloud が有効ならクラウドの設定を続ける
+    
+    Args:
+        stage: 工程（LOCAL_LLM_STAGES のいずれか）
+        cloud_settings: クラウドのLLM設定（llm_settings など）
+    
+    Returns:
+        List[Dict]: LLM設定のリスト
+    """
+    local_settings = get_local_llm_settings()
+    if not is_local_stage(stage, local_settings):
+        return [cloud_settings]
+    
+    routed = dict(cloud_settings)
+    routed.update({key: value for key, value in local_settings.items() if key not in ("stages", "fallback_to_cloud")})
+    # クラウドのAPIキーをローカルサーバーに送らない
+    routed["api_key"] = local_settings.get("api_key")
+    if local_settings.get("fallback_to_cloud", True):
+        return [routed, cloud_settings]
+    return [routed]
+
+
+def complete_with_local_llm(stage: str, messages: List[Dict]) -> Optional[Tuple[str, Dict[str, int]]]:
+    """
+    工程がローカルLLMに割り当てられていれば、ローカルLLMで応答を作成（同じリクエストの応答がキャッシュにあれば使う）
+    
+    Args:
+        stage: 工程（LOCAL_LLM_STAGES のいずれか）
+        messages: メッセージ（role, content の辞書のリスト）
+    
+    Returns:
+        Optional[Tuple[str, Dict[str, int]]]: (応答テキスト, トークン使用量)。割り当てられていない場合と、
+                                              失敗してクラウドで実行し直す場合は None
+    """
+    settings = get_local_llm_settings()
+    if not is_local_stage(stage, settings):
+        return None
+    
+    model = settings["model"]
+    try:
+        client = get_chat_client(settings)
+        max_tokens = plan_max_tokens(messages, model, limit=settings["max_tokens"],
+                                     context_window=settings.get("context_window"))
+        
+        def complete():
+            response = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=settings["temperature"],
+                max_tokens=max_tokens
+            )
+            return response.choices[0].message.content, usage_from_openai(response)
+        
+        print(f"🏠 ローカルLLM（{model}）で実行中: {stage}")
+        return cached_completion(cache_provider_name(settings), model, settings["temperature"], messages, complete,
+                                 max_tokens=max_tokens)
+    except Exception as e:
+        if not settings.get("fallback_to_cloud", True):
+            raise
+        print(f"⚠️ ローカルLLMでの実行に失敗しました（クラウドのLLMで実行し直します）: {stage}: {e}")
+        return None
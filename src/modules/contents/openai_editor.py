@@ -4,15 +4,19 @@ OpenAI記事編集エージェント
 OpenAI APIを使用して記事の校閲・改善を行う（Claudeのフォールバック）
 """
 
-import json
-from typing import Dict, List, Optional, Tuple
+import importlib.util
+from typing import Dict, List, Tuple
 from datetime import datetime
+from .llm_cache import cached_completion
+from .editor_prompts import BUZZ_SYSTEM_PROMPT, PROOFREAD_SYSTEM_PROMPT, TITLE_SYSTEM_PROMPT
+from .llm_clients import cache_provider_name, get_chat_client, requires_api_key
+from .llm_usage import log_prompt_cache, merge_usage, usage_from_openai
+from .local_llm import complete_with_local_llm
+from .token_budget import plan_max_tokens
 
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+# クライアントは llm_clients が作成するため、ここではライブラリの有無だけを確認する
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+if not OPENAI_AVAILABLE:
     print("⚠️ OpenAIライブラリがインストールされていません")
 
 class OpenAIEditor:
@@ -28,16 +32,19 @@ class OpenAIEditor:
         """
         self.config = config or {}
         self.api_key = api_key or self.config.get("api_key")
+        self.provider = self.config.get("provider", "openai")
         self.client = None
         self.is_available = False
         
-        if not OPENAI_AVAILABLE:
-            print("❌ OpenAIライブラリが不足しています")
-            return
+        # フェイクLLMなどAPIキーが不要なプロバイダーはopenaiライブラリも使わない
+        if requires_api_key(self.provider):
+            if not OPENAI_AVAILABLE:
+                print("❌ OpenAIライブラリが不足しています")
+                return
             
-        if not self.api_key:
-            print("❌ OpenAI APIキーが設定されていません")
-            return
+            if not self.api_key:
+                print("❌ OpenAI APIキーが設定されていません")
+                return
             
         try:
             # 設定から値を取得（デフォルト値付き）
@@ -45,14 +52,51 @@ class OpenAIEditor:
             self.temperature = self.config.get("temperature", 0.7)
             self.max_tokens = self.config.get("max_tokens", 3500)
             
-            # OpenAI クライアントの初期化
-            self.client = openai.OpenAI(api_key=self.api_key)
+            # OpenAI クライアント（生成・編集で共有し接続を使い回す）
+            self.client = get_chat_client(dict(self.config, api_key=self.api_key))
             self.is_available = True
             print("✅ OpenAI編集エージェントが初期化されました")
             print(f"🤖 設定: {self.model}, temp={self.temperature}, tokens={self.max_tokens}")
         except Exception as e:
             print(f"❌ OpenAI編集エージェントの初期化に失敗: {e}")
     
+    def _complete(self, system_prompt: str, user_prompt: str, stage: str = None) -> Tuple[str, Dict[str, int]]:
+        """
+        Chat Completions APIを呼び出し（同じリクエストの応答がキャッシュにあれば使う）
+        
+        max_tokens は設定値のまま、プロンプトと合わせてコンテキスト長を超える場合は減らす
+        
+        Args:
+            system_prompt: システムプロンプト
+            user_prompt: ユーザープロンプト
+            stage: 工程（proofread, buzz, title）。ローカルLLMに割り当てられていればローカルLLMで実行する
+        
+        Returns:
+            Tuple[str, Dict[str, int]]: (応答テキスト, トークン使用量)
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        local_result = complete_with_local_llm(stage, messages) if stage else None
+        if local_result:
+            return local_result
+        max_tokens = plan_max_tokens(messages, self.model, limit=self.max_tokens)
+        
+        def complete():
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=max_tokens
+            )
+            usage = usage_from_openai(response)
+            log_prompt_cache(usage)
+            return response.choices[0].message.content, usage
+        
+        return cached_completion(cache_provider_name(dict(self.config, provider=self.provider)), self.model,
+                                 self.temperature, messages, complete, max_tokens=max_tokens)
+    
     def proofread_article(self, title: str, content: str) -> Dict[str, str]:
         """
         記事の校閲を行う
@@ -71,38 +115,18 @@ class OpenAIEditor:
             print("📝 OpenAI GPT で記事校閲中...")
             
             # 校閲用プロンプト
-            system_prompt = """あなたは経験豊富な技術系編集者です。以下の技術記事を校閲してください。
-
-校閲の観点：
-1. 文章の読みやすさと流れ
-2. 技術的な正確性
-3. 誤字脱字・文法チェック
-4. 論理構成の改善
-5. 専門用語の適切な説明
-6. 読者にとっての分かりやすさ
-
-改善点があれば具体的に修正し、改善された記事全文を返してください。
-大幅な構成変更は避け、元の内容の意図を保ちながら品質を向上させてください。"""
+            system_prompt = PROOFREAD_SYSTEM_PROMPT
             
             user_prompt = f"タイトル: {title}\n\n記事内容:\n{content}"
             
             # API呼び出し
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
-            
-            proofread_content = response.choices[0].message.content
+            proofread_content, usage = self._complete(system_prompt, user_prompt, "proofread")
             
             print("✅ 校閲完了")
             return {
                 "original_content": content,
                 "proofread_content": proofread_content,
+                "usage": usage,
                 "status": "success"
             }
             
@@ -128,44 +152,18 @@ class OpenAIEditor:
             print("🚀 OpenAI GPT でバズ要素追加中...")
             
             # バズ要素追加プロンプト
-            system_prompt = """あなたは人気技術ブログのコンテンツマーケターです。以下の技術記事にバズ要素を追加してください。
-
-バズ要素の追加方針：
-1. 読者の興味を引く具体的な数値やデータ
-2. 「知らないと損する」「意外と知られていない」などの好奇心を刺激する表現
-3. 実際の開発現場での体験談や失敗談
-4. 最新トレンドとの関連性
-5. 読者が「シェアしたくなる」ような驚きの事実
-6. 具体的なメリット・デメリットの明示
-7. 他の開発者との差別化ポイント
-
-注意点：
-- 技術的な正確性は保つ
-- 過度に煽らない
-- 元の記事の品質を損なわない
-- 自然な文章の流れを保つ
-
-改善された記事全文を返してください。"""
+            system_prompt = BUZZ_SYSTEM_PROMPT
             
             user_prompt = f"タイトル: {title}\n\n記事内容:\n{content}"
             
             # API呼び出し
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
-            
-            buzz_content = response.choices[0].message.content
+            buzz_content, usage = self._complete(system_prompt, user_prompt, "buzz")
             
             print("✅ バズ要素追加完了")
             return {
                 "original_content": content,
                 "buzz_content": buzz_content,
+                "usage": usage,
                 "status": "success"
             }
             
@@ -191,42 +189,14 @@ class OpenAIEditor:
             print("💡 OpenAI GPT でタイトル改善案生成中...")
             
             # タイトル改善プロンプト
-            system_prompt = """あなたは技術ブログのタイトル専門家です。以下の記事に対して、より魅力的で効果的なタイトルを5つ提案してください。
-
-タイトル改善の観点：
-1. SEO効果の高いキーワードを含む
-2. 読者の興味を引く具体性
-3. クリックしたくなる魅力
-4. 技術レベルの明示（初心者向け、実践的など）
-5. 数値や期間の明示（「3分で理解」「5つの方法」など）
-6. 問題解決への期待感
-7. 最新性やトレンド感
-
-各タイトル案の後に、そのタイトルの狙いと効果を1行で説明してください。
-
-形式：
-1. [タイトル案] - [狙いと効果の説明]
-2. [タイトル案] - [狙いと効果の説明]
-...
-
-元のタイトル: {title}"""
+            system_prompt = TITLE_SYSTEM_PROMPT
             
             # 記事内容の要約（最初の500文字）
             content_summary = content[:500] + "..." if len(content) > 500 else content
-            user_prompt = f"記事内容の概要:\n{content_summary}"
+            user_prompt = f"元のタイトル: {title}\n\n記事内容の概要:\n{content_summary}"
             
             # API呼び出し
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
-            
-            title_suggestions_raw = response.choices[0].message.content
+            title_suggestions_raw, usage = self._complete(system_prompt, user_prompt, "title")
             
             # 結果をパース
             suggestions = []
@@ -239,6 +209,7 @@ class OpenAIEditor:
                 "original_title": title,
                 "suggestions": suggestions,
                 "raw_response": title_suggestions_raw,
+                "usage": usage,
                 "status": "success"
             }
             
@@ -298,6 +269,8 @@ class OpenAIEditor:
             results["title_error"] = title_result["error"]
         
         results["final_content"] = final_content
+        results["usage"] = merge_usage(proofreading_result.get("usage"), buzz_result.get("usage"),
+                                       title_result.get("usage"))
         results["improvement_completed"] = True
         
         print("\n✅ 包括的改善完了！")
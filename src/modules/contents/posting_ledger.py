@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+投稿履歴モジュール
+投稿処理1回ごとの結果（記事ID・URL・編集エージェント・トークン数・工程ごとの所要時間）を
+JSONL の台帳に追記し、スループットや所要時間の分布を集計する
+"""
+
+import json
+import math
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from .article_storage import FileLock
+from .llm_usage import merge_usage
+
+DEFAULT_LEDGER_PATH = "data/posting_ledger.jsonl"
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """
+    ソート済みの値からパーセンタイルを取得（nearest-rank法）
+    
+    Args:
+        sorted_values: 昇順にソートした値
+        fraction: 0〜1（p95なら0.95）
+    
+    Returns:
+        Optional[float]: パーセンタイル値（値がない場合は None）
+    """
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class PostingRun:
+    """
+    投稿処理1回分の記録
+    
+    lap(stage) を呼ぶたびに前回の lap（または開始）からの経過時間をその工程の所要時間とする。
+    status は成功を記録するまで failed のままで、finish() で台帳に書き込む
+    """
+    
+    def __init__(self, ledger: 'PostingLedger', source: str):
+        """
+        Args:
+            ledger: 書き込み先の台帳
+            source: 投稿処理の種類（full_auto, auto_posting など）
+        """
+        self.ledger = ledger
+        self.entry = {
+            "run_id": uuid.uuid4().hex[:12],
+            "source": source,
+            "started_at": datetime.now().isoformat(timespec='seconds'),
+            "finished_at": None,
+            "status": "failed",
+            "article_id": None,
+            "content_hash": None,
+            "title": None,
+            "note_url": None,
+            "editor": None,
+            "tokens": merge_usage(),
+            "stages": {},
+            "total_seconds": None,
+            "error": None
+        }
+        self._started = time.perf_counter()
+        self._lap_started = self._started
+        self._finished = False
+    
+    def lap(self, stage: str) -> float:
+        """
+        工程の終了を記録
+        
+        Args:
+            stage: 工程名（generate, edit, post など）
+        
+        Returns:
+            float: 工程の所要時間（秒）
+        """
+        now = time.perf_counter()
+        elapsed = now - self._lap_started
+        self._lap_started = now
+        stages = self.entry["stages"]
+        stages[stage] = round(stages.get(stage, 0.0) + elapsed, 3)
+        return elapsed
+    
+    def add_stages(self, stages: Dict[str, float]) -> None:
+        """
+        別の場所で済ませた工程（準備済み記事キューの生成・校閲など）の所要時間を加算
+        
+        以後の lap() はこの呼び出しの時点から測る
+        
+        Args:
+            stages: 工程名 → 所要時間（秒）
+        """
+        for stage, seconds in stages.items():
+            self.entry["stages"][stage] = round(self.entry["stages"].get(stage, 0.0) + seconds, 3)
+        self._lap_started = time.perf_counter()
+    
+    def record(self, **fields) -> None:
+        """記事ID・URLなどの項目を記録"""
+        self.entry.update(fields)
+    
+    def add_usage(self, usage: Optional[Dict[str, int]]) -> None:
+        """LLMのトークン使用量を加算"""
+        self.entry["tokens"] = merge_usage(self.entry["tokens"], usage)
+    
+    def finish(self, status: str = None, error: str = None) -> bool:
+        """
+        記録を確定して台帳に書き込み（2回目以降の呼び出しは何もしない）
+        
+        Args:
+            status: 結果（success / failed）。省略時は記録済みの値
+            error: エラー内容
+        
+        Returns:
+            bool: 書き込み成功かどうか
+        """
+        if self._finished:
+            return False
+        self._finished = True
+        
+        if status:
+            self.entry["status"] = status
+        if error:
+            self.entry["error"] = error
+        self.entry["finished_at"] = datetime.now().isoformat(timespec='seconds')
+        self.entry["total_seconds"] = round(time.perf_counter() - self._started, 3)
+        return self.ledger.append(self.entry)
+
+
+class PostingLedger:
+    """
+    投稿履歴の台帳（1行1投稿のJSONL）
+    
+    追記はロックを取って1回のwriteで書き込みfsyncするため、複数プロセスから同時に書いても
+    行が混ざらない。読み込み時は壊れた行（書き込み途中のクラッシュなど）を読み飛ばす
+    """
+    
+    def __init__(self, path: str = DEFAULT_LEDGER_PATH):
+        """
+        Args:
+            path: 台帳ファイルのパス
+        """
+        self.path = path
+        self._lock = FileLock(f"{path}.lock")
+    
+    def start_run(self, source: str) -> PostingRun:
+        """
+        投稿処理の記録を開始
+        
+        Args:
+            source: 投稿処理の種類
+        
+        Returns:
+            PostingRun: 投稿処理1回分の記録
+        """
+        return PostingRun(self, source)
+    
+    def append(self, entry: Dict) -> bool:
+        """
+        台帳に1件追記
+        
+        Args:
+            entry: 投稿記録
+        
+        Returns:
+            bool: 書き込み成功かどうか
+        """
+        try:
+            data = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+            with self._lock:
+                with open(self.path, 'ab') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+            return True
+        except Exception as e:
+            print(f"⚠️ 投稿履歴の書き込みエラー: {e}")
+            return False
+    
+    def iter_entries(self, since: datetime = None, source: str = None) -> Iterator[Dict]:
+        """
+        投稿記録を古い順に読み込み
+        
+        Args:
+            since: この日時以降に開始した記録のみ
+            source: 投稿処理の種類で絞り込み
+        
+        Yields:
+            Dict: 投稿記録
+        """
+        if not os.path.exists(self.path):
+            return
+        
+        since_text = since.isoformat(timespec='seconds') if since else None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if since_text and entry.get('started_at', '') < since_text:
+                    continue
+                if source and entry.get('source') != source:
+                    continue
+                yield entry
+    
+    def summarize(self, since: datetime = None, source: str = None) -> Dict:
+        """
+        投稿記録を集計
+        
+        工程ごとの所要時間は失敗した投稿も含めて完了した工程を、
+        投稿全体の所要時間は成功した投稿のみを対象にする
+        
+        Args:
+            since: この日時以降に開始した記録のみ
+            source: 投稿処理の種類で絞り込み
+        
+        Returns:
+            Dict: runs, succeeded, failed, success_rate, first_started_at, last_finished_at,
+                  posts_per_day, stages（工程名→count, mean, p50, p95, max）, total（同）,
+                  tokens（合計）, ttft・tokens_per_second（ストリーミング生成。同）, errors（エラー内容→件数）
+        """
+        runs = 0
+        succeeded = 0
+        first_started = None
+        last_finished = None
+        stage_seconds: Dict[str, List[float]] = {}
+        total_seconds: List[float] = []
+        tokens = merge_usage()
+        errors: Dict[str, int] = {}
+        # ストリーミング生成の最初のトークンまでの時間と生成速度
+        ttft_seconds: List[float] = []
+        tokens_per_second: List[float] = []
+        
+        for entry in self.iter_entries(since, source):
+            runs += 1
+            # 並行実行では終了順に追記されるため、開始・終了日時は最小・最大を取る
+            started_at = entry.get('started_at')
+            if started_at and (first_started is None or started_at < first_started):
+                first_started = started_at
+            finished_at = entry.get('finished_at')
+            if finished_at and (last_finished is None or finished_at > last_finished):
+                last_finished = finished_at
+            
+            for stage, seconds in entry.get('stages', {}).items():
+                stage_seconds.setdefault(stage, []).append(seconds)
+            tokens = merge_usage(tokens, entry.get('tokens'))
+            stream_stats = entry.get('stream_stats') or {}
+            if stream_stats.get('ttft') is not None:
+                ttft_seconds.append(stream_stats['ttft'])
+            if stream_stats.get('tokens_per_second') is not None:
+                tokens_per_second.append(stream_stats['tokens_per_second'])
+            
+            if entry.get('status') == 'success':
+                succeeded += 1
+                if entry.get('total_seconds') is not None:
+                    total_seconds.append(entry['total_seconds'])
+            elif entry.get('error'):
+                errors[entry['error']] = errors.get(entry['error'], 0) + 1
+        
+        posts_per_day = None
+        if first_started and last_finished:
+            span = datetime.fromisoformat(last_finished) - datetime.fromisoformat(first_started)
+            # 1時間未満の記録は1時間として換算する（極端な値を避ける）
+            days = max(span.total_seconds(), 3600) / 86400
+            posts_per_day = succeeded / days
+        
+        return {
+            "runs": runs,
+            "succeeded": succeeded,
+            "failed": runs - succeeded,
+            "success_rate": succeeded / runs if runs else None,
+            "first_started_at": first_started,
+            "last_finished_at": last_finished,
+            "posts_per_day": posts_per_day,
+            "stages": {stage: self._describe(values) for stage, values in stage_seconds.items()},
+            "total": self._describe(total_seconds),
+            "tokens": tokens,
+            "ttft": self._describe(ttft_seconds),
+            "tokens_per_second": self._describe(tokens_per_second),
+            "errors": errors
+        }
+    
+    @staticmethod
+    def _describe(values: List[float]) -> Dict:
+        """件数・平均・p50・p95・最大"""
+        values = sorted(values)
+        return {
+            "count": len(values),
+            "mean": sum(values) / len(values) if values else None,
+            "p50": percentile(values, 0.5),
+            "p95": percentile(values, 0.95),
+            "max": values[-1] if values else None
+        }
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+投稿準備済み記事キューモジュール
+生成・校閲・フォーマット調整まで済んだ記事をディスクに置いておき、投稿処理は1件取り出すだけにする
+（バックグラウンドのワーカーがキューを指定件数に保つ）
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+from .article_storage import atomic_write_json
+
+DEFAULT_READY_QUEUE_DIR = "data/ready_queue"
+DEFAULT_READY_QUEUE_SIZE = 2
+
+# 取り出したまま投稿処理が終わらない（プロセスが落ちたなど）記事をキューに戻すまでの時間
+STALE_CLAIM_SECONDS = 60 * 60
+
+
+class ReadyQueue:
+    """
+    ディスク上の投稿準備済み記事キュー（1記事1ファイル、古いものから取り出す）
+    
+    取り出しは ready/ から claimed/ へのファイルの移動（rename）で行うため、
+    複数のプロセスが同時に取り出しても同じ記事を二重に投稿しない。
+    投稿に成功したら ack() で削除し、失敗したら release() でキューに戻す
+    """
+    
+    def __init__(self, directory: str = DEFAULT_READY_QUEUE_DIR):
+        """
+        Args:
+            directory: キューのディレクトリ
+        """
+        self.directory = directory
+        self.ready_dir = os.path.join(directory, "ready")
+        self.claimed_dir = os.path.join(directory, "claimed")
+        os.makedirs(self.ready_dir, exist_ok=True)
+        os.makedirs(self.claimed_dir, exist_ok=True)
+    
+    def _ready_names(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.ready_dir) if name.endswith(".json"))
+    
+    def __len__(self) -> int:
+        return len(self._ready_names())
+    
+    def put(self, item: Dict) -> str:
+        """
+        記事をキューに追加
+        
+        Args:
+            item: 投稿準備済みの記事
+        
+        Returns:
+            str: キュー内の名前
+        """
+        name = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.json"
+        atomic_write_json(os.path.join(self.ready_dir, name), item)
+        return name
+    
+    def pop(self) -> Optional[Tuple[str, Dict]]:
+        """
+        最も古い記事を取り出す
+        
+        Returns:
+            Optional[Tuple[str, Dict]]: (名前, 記事)。キューが空の場合は None
+        """
+        self.recover_stale_claims()
+        for name in self._ready_names():
+            claimed_path = os.path.join(self.claimed_dir, name)
+            try:
+                os.rename(os.path.join(self.ready_dir, name), claimed_path)
+                # 取り出した時刻を記録（長時間たっても残っていれば recover_stale_claims で戻す）
+                os.utime(claimed_path)
+            except FileNotFoundError:
+                continue  # 他のプロセスが先に取り出した
+            
+            try:
+                with open(claimed_path, 'r', encoding='utf-8') as f:
+                    item = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"❌ 準備済み記事の読み込みエラー（破棄します）: {name}: {e}")
+                os.remove(claimed_path)
+                continue
+            return name, item
+        return None
+    
+    def ack(self, name: str) -> None:
+        """投稿が済んだ記事をキューから削除"""
+        try:
+            os.remove(os.path.join(self.claimed_dir, name))
+        except FileNotFoundError:
+            pass
+    
+    def release(self, name: str) -> None:
+        """投稿できなかった記事をキューに戻す（次回の投稿で再び取り出す）"""
+        try:
+            os.rename(os.path.join(self.claimed_dir, name), os.path.join(self.ready_dir, name))
+        except FileNotFoundError:
+            pass
+    
+    def recover_stale_claims(self, max_age: float = STALE_CLAIM_SECONDS) -> int:
+        """
+        取り出してから長時間たった記事をキューに戻す
+        
+        Args:
+            max_age: 戻すまでの秒数
+        
+        Returns:
+            int: 戻した件数
+        """
+        recovered = 0
+        now = time.time()
+        for name in os.listdir(self.claimed_dir):
+            path = os.path.join(self.claimed_dir, name)
+            try:
+                if now - os.path.getmtime(path) > max_age:
+                    os.rename(path, os.path.join(self.ready_dir, name))
+                    recovered += 1
+            except FileNotFoundError:
+                continue
+        if recovered:
+            print(f"🔄 投稿処理が終わらなかった準備済み記事 {recovered}件 をキューに戻しました")
+        return recovered
+    
+    def items(self) -> List[Dict]:
+        """キュー内の記事の一覧（古い順、表示用）"""
+        items = []
+        for name in self._ready_names():
+            try:
+                with open(os.path.join(self.ready_dir, name), 'r', encoding='utf-8') as f:
+                    items.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return items
+
+
+class ReadyQueueFiller:
+    """
+    準備済み記事キューを指定件数に保つバックグラウンドワーカー
+    
+    キューの件数と準備中の件数の合計が目標件数に満たない間、ワーカースレッドが produce() で
+    記事を用意してキューに追加する。produce() はスレッドごとに呼ばれるため、
+    記事生成器など状態を持つものはスレッドごとに作る
+    """
+    
+    def __init__(self, queue: ReadyQueue, produce: Callable[[], Optional[Dict]],
+                 target_size: int = DEFAULT_READY_QUEUE_SIZE, workers: int = 1, poll_interval: float = 5.0):
+        """
+        Args:
+            queue: 準備済み記事キュー
+            produce: 投稿準備済みの記事を1件用意する関数（用意できなかった場合は None）
+            target_size: キューに保つ件数
+            workers: 同時に記事を用意するスレッド数
+            poll_interval: キューが埋まっているときに件数を確認し直す間隔（秒）
+        """
+        self.queue = queue
+        self.produce = produce
+        self.target_size = target_size
+        self.workers = max(workers, 1)
+        self.poll_interval = poll_interval
+        self.produced = 0
+        self.failed = 0
+        self._in_progress = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+    
+    def _reserve(self) -> bool:
+        """キューに空きがあれば1件分の準備を予約"""
+        with self._lock:
+            if len(self.queue) + self._in_progress >= self.target_size:
+                return False
+            self._in_progress += 1
+            return True
+    
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if not self._reserve():
+                self._stop.wait(self.poll_interval)
+                continue
+            
+            item = None
+            try:
+                item = self.produce()
+                if item:
+                    self.queue.put(item)
+                    self.produced += 1
+                    print(f"📦 準備済み記事をキューに追加しました: {item.get('title')}（キュー {len(self.queue)}件）")
+            except Exception as e:
+                print(f"❌ 準備済み記事の作成エラー: {e}")
+            finally:
+                with self._lock:
+                    self._in_progress -= 1
+            
+            if not item:
+                # API障害などで失敗が続く場合に呼び出し続けないよう間隔をあける
+                self.failed += 1
+                self._stop.wait(self.poll_interval)
+    
+    def start(self) -> None:
+        """ワーカースレッドを開始"""
+        self._stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"ready-queue-filler-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def stop(self, wait: bool = True) -> None:
+        """
+        新しい記事の準備をやめる
+        
+        Args:
+            wait: 準備中の記事がキューに入るまで待つかどうか
+        """
+        self._stop.set()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+    
+    def run_forever(self) -> None:
+        """キューを目標件数に保ち続ける（Ctrl+C で終了）"""
+        print(f"🏭 準備済み記事キューを {self.target_size}件 に保ちます（ワーカー {self.workers}、Ctrl+C で終了）")
+        self.start()
+        try:
+            while True:
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            print("\n⏹️ 準備中の記事を完了してから終了します...")
+        finally:
+            self.stop()
+            print(f"📊 準備済み記事: 作成 {self.produced}件 / 失敗 {self.failed}件")
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+記事検索モジュール
+タイトル・本文・タグ・カテゴリの転置インデックスによる全文検索（日本語は文字バイグラム）
+"""
+
+import math
+import os
+import pickle
+import re
+import unicodedata
+import zlib
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# 英数字の連続は単語として、それ以外（日本語など）は文字バイグラムとして扱う
+TOKEN_RUN_PATTERN = re.compile(r'[0-9a-z_]+|[^\W0-9a-z_]+')
+ASCII_WORD_PATTERN = re.compile(r'[0-9a-z_]+')
+SEARCH_INDEX_SUFFIX = '.search-index'
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    検索用にテキストをトークン化
+    
+    NFKC正規化・小文字化したうえで、英数字は単語単位、日本語などは文字バイグラム
+    （1文字だけの連続はその1文字）に分割する
+    
+    Args:
+        text: テキスト
+    
+    Returns:
+        List[str]: トークンのリスト（重複を含む）
+    """
+    normalized = unicodedata.normalize('NFKC', text or '').lower()
+    tokens = []
+    for run in TOKEN_RUN_PATTERN.findall(normalized):
+        if ASCII_WORD_PATTERN.fullmatch(run) or len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(map(str.__add__, run[:-1], run[1:]))
+    return tokens
+
+
+class ArticleSearchIndex:
+    """
+    記事の転置インデックス（BM25でランキング）
+    
+    ポスティングはトークンごとの記事IDと重み付き出現回数の配列（array）で持ち、
+    記事の追加は末尾への追記のみで行う。ステータス等による絞り込みは呼び出し側で行う。
+    構築には本文全体のトークン化が必要なため、ファイルに保存して次回起動時に再利用できる
+    """
+    
+    # 保存形式のバージョン（トークナイザやスコアの仕様を変えたら上げる）
+    FORMAT_VERSION = 1
+    
+    # フィールドごとの重み（タイトル・タグ・カテゴリの一致を本文より重視）
+    FIELD_WEIGHTS = {'title': 3.0, 'tags': 2.0, 'category': 2.0, 'content': 1.0}
+    BM25_K1 = 1.2
+    BM25_B = 0.75
+    
+    def __init__(self):
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._doc_lengths: Dict[int, float] = {}
+        self._total_length = 0.0
+        # 記事ID→インデックス登録時の内容の指紋（保存したインデックスの再利用判定用）
+        self._fingerprints: Dict[int, str] = {}
+    
+    @staticmethod
+    def fingerprint(article: Dict) -> str:
+        """記事の検索対象フィールドの指紋（本文は保持済みのcontent_hashを使う）"""
+        metadata = '\0'.join([article.get('title') or '', article.get('category') or '']
+                              + list(article.get('tags', [])))
+        return f"{article.get('content_hash', '')}:{zlib.crc32(metadata.encode('utf-8')):08x}"
+    
+    def is_current(self, article: Dict) -> bool:
+        """インデックス登録時から記事が変わっていないかチェック"""
+        return self._fingerprints.get(article['id']) == self.fingerprint(article)
+    
+    def add(self, article: Dict) -> None:
+        """
+        記事をインデックスに追加
+        
+        Args:
+            article: 記事データ（id, title, content, tags, category）
+        """
+        article_id = article['id']
+        if article_id in self._doc_lengths:
+            return
+        
+        frequencies = Counter()
+        for field, weight in self.FIELD_WEIGHTS.items():
+            value = article.get(field)
+            if not value:
+                continue
+            if isinstance(value, list):
+                value = ' '.join(value)
+            counts = Counter(tokenize(value))
+            if weight != 1.0:
+                counts = {token: count * weight for token, count in counts.items()}
+            frequencies.update(counts)
+        
+        for token, frequency in frequencies.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = (array('l'), array('f'))
+            posting[0].append(article_id)
+            posting[1].append(frequency)
+        
+        length = sum(frequencies.values())
+        self._doc_lengths[article_id] = length
+        self._total_length += length
+        self._fingerprints[article_id] = self.fingerprint(article)
+    
+    def save(self, path: str) -> None:
+        """
+        インデックスをファイルに保存
+        
+        Args:
+            path: 保存先のパス
+        """
+        temp_path = f"{path}.tmp.{os.getpid()}"
+        with open(temp_path, 'wb') as f:
+            pickle.dump((self.FORMAT_VERSION, self.__dict__), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    
+    @classmethod
+    def load(cls, path: str) -> Optional['ArticleSearchIndex']:
+        """
+        保存したインデックスを読み込み
+        
+        Args:
+            path: 保存先のパス
+        
+        Returns:
+            Optional[ArticleSearchIndex]: インデックス（ファイルがない・形式が古い場合は None）
+        """
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            with open(path, 'rb') as f:
+                version, state = pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ 保存された検索インデックスを読み込めません: {e}")
+            return None
+        
+        if version != cls.FORMAT_VERSION:
+            return None
+        
+        index = cls()
+        index.__dict__.update(state)
+        return index
+    
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        クエリの全トークンを含む記事をスコア順に検索
+        
+        Args:
+            query: 検索クエリ
+            limit: 最大件数（省略時は全件）
+        
+        Returns:
+            List[Tuple[int, float]]: (記事ID, スコア) のリスト（スコアの降順）
+        """
+        tokens = set(tokenize(query))
+        if not tokens or not self._doc_lengths:
+            return []
+        
+        postings = []
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                return []
+            postings.append(posting)
+        # 出現記事の少ないトークンから絞り込む
+        postings.sort(key=lambda posting: len(posting[0]))
+        
+        document_count = len(self._doc_lengths)
+        average_length = self._total_length / document_count
+        k1 = self.BM25_K1
+        b = self.BM25_B
+        doc_lengths = self._doc_lengths
+        
+        scores = None
+        for article_ids, frequencies in postings:
+            idf = math.log(1 + (document_count - len(article_ids) + 0.5) / (len(article_ids) + 0.5))
+            next_scores = {}
+            for article_id, frequency in zip(article_ids, frequencies):
+                if scores is not None:
+                    score = scores.get(article_id)
+                    if score is None:
+                        continue
+                else:
+                    score = 0.0
+                norm = k1 * (1 - b + b * doc_lengths[article_id] / average_length)
+                next_scores[article_id] = score + idf * frequency * (k1 + 1) / (frequency + norm)
+            scores = next_scores
+            if not scores:
+                return []
+        
+        results = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return results[:limit] if limit is not None else results
+    
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+    
+    def __contains__(self, article_id: int) -> bool:
+        return article_id in self._doc_lengths
+    
+    def __iter__(self):
+        return iter(self._doc_lengths)
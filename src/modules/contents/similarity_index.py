@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+類似記事検出モジュール
+MinHash + LSH による記事本文の近似重複検出（日本語向け文字シングル）
+"""
+
+import os
+import pickle
+import zlib
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+from .content_hash import normalize_content
+
+HASH_BITS = 32
+MAX_HASH = (1 << HASH_BITS) - 1
+SIMILARITY_INDEX_SUFFIX = '.similarity-index'
+
+
+class MinHashLSHIndex:
+    """
+    MinHash署名をLSH（バンド分割）で索引し、類似記事の候補をサブリニア時間で検索する
+    
+    日本語は単語区切りがないため、正規化した本文の文字nグラム（シングル）を特徴量とする。
+    署名の計算はOne Permutation Hashing（1回のハッシュで全スロットを埋め、
+    空きスロットは隣から補完）で行い、記事1件あたりシングル数に比例する時間で済ませる。
+    全記事の署名の計算には本文全体が必要なため、ファイルに保存して次回起動時に再利用できる
+    """
+    
+    # 保存形式のバージョン（シングル・署名の計算方法やパラメータの既定値を変えたら上げる）
+    FORMAT_VERSION = 1
+    
+    def __init__(self, num_perm: int = 128, bands: int = 16, shingle_size: int = 3):
+        """
+        Args:
+            num_perm: 署名の長さ（スロット数）
+            bands: LSHのバンド数（num_permを割り切れること）。
+                   候補になる類似度の目安は (1 / bands) ** (bands / num_perm)
+            shingle_size: 文字シングルの長さ
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_permはbandsで割り切れる必要があります")
+        
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        
+        self._signatures: Dict[Hashable, Tuple[int, ...]] = {}
+        self._buckets: List[Dict[Tuple[int, ...], Set[Hashable]]] = [{} for _ in range(bands)]
+        # キー→登録時の本文のハッシュ（保存した索引の再利用判定用）
+        self._content_hashes: Dict[Hashable, str] = {}
+    
+    def _shingles(self, text: str) -> Set[str]:
+        """正規化した本文から文字シングルの集合を作成"""
+        normalized = normalize_content(text)
+        size = self.shingle_size
+        if len(normalized) <= size:
+            return {normalized}
+        return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+    
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """
+        本文のMinHash署名を計算
+        
+        Args:
+            text: 記事本文
+        
+        Returns:
+            Tuple[int, ...]: 長さnum_permの署名
+        """
+        num_perm = self.num_perm
+        mins = [MAX_HASH] * num_perm
+        
+        for shingle in self._shingles(text):
+            value = zlib.crc32(shingle.encode('utf-8'))
+            slot = value % num_perm
+            rank = value // num_perm
+            if rank < mins[slot]:
+                mins[slot] = rank
+        
+        # 空きスロットを右隣の値で補完（ローテーションによる密化）
+        if MAX_HASH in mins:
+            filled = [slot for slot in range(num_perm) if mins[slot] != MAX_HASH]
+            if not filled:
+                return tuple(mins)
+            dense = list(mins)
+            for slot in range(num_perm):
+                if mins[slot] == MAX_HASH:
+                    offset = 1
+                    while mins[(slot + offset) % num_perm] == MAX_HASH:
+                        offset += 1
+                    dense[slot] = mins[(slot + offset) % num_perm] + offset * (MAX_HASH // num_perm)
+            mins = dense
+        
+        return tuple(mins)
+    
+    def _band_keys(self, signature: Tuple[int, ...]):
+        rows = self.rows
+        for band in range(self.bands):
+            yield band, signature[band * rows:(band + 1) * rows]
+    
+    def add(self, key: Hashable, text: str = None, signature: Tuple[int, ...] = None,
+            content_hash: str = None) -> None:
+        """
+        記事を索引に追加
+        
+        Args:
+            key: 記事ID等のキー
+            text: 記事本文（signature未指定時に使用）
+            signature: 計算済みの署名
+            content_hash: 本文のハッシュ（is_current で登録時から本文が変わっていないかの判定に使う）
+        """
+        if key in self._signatures:
+            self.remove(key)
+        
+        signature = signature or self.signature(text)
+        self._signatures[key] = signature
+        if content_hash:
+            self._content_hashes[key] = content_hash
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, set()).add(key)
+    
+    def remove(self, key: Hashable) -> None:
+        """記事を索引から削除"""
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        self._content_hashes.pop(key, None)
+        for band, band_key in self._band_keys(signature):
+            bucket = self._buckets[band].get(band_key)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+    
+    def is_current(self, key: Hashable, content_hash: str) -> bool:
+        """登録時から本文が変わっていないかチェック"""
+        return self._content_hashes.get(key) == content_hash
+    
+    def save(self, path: str) -> None:
+        """
+        索引をファイルに保存
+        
+        Args:
+            path: 保存先のパス
+        """
+        temp_path = f"{path}.tmp.{os.getpid()}"
+        with open(temp_path, 'wb') as f:
+            pickle.dump((self.FORMAT_VERSION, self.__dict__), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    
+    @classmethod
+    def load(cls, path: str) -> Optional['MinHashLSHIndex']:
+        """
+        保存した索引を読み込み
+        
+        Args:
+            path: 保存先のパス
+        
+        Returns:
+            Optional[MinHashLSHIndex]: 索引（ファイルがない・形式が古い場合は None）
+        """
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            with open(path, 'rb') as f:
+                version, state = pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ 保存された類似記事検出用の索引を読み込めません: {e}")
+            return None
+        
+        if version != cls.FORMAT_VERSION:
+            return None
+        
+        index = cls()
+        index.__dict__.update(state)
+        return index
+    
+    def similarity(self, signature_a: Tuple[int, ...], signature_b: Tuple[int, ...]) -> float:
+        """署名の一致率から推定したJaccard類似度"""
+        matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+        return matches / self.num_perm
+    
+    def query(self, text: str, threshold: float = 0.8, signature: Tuple[int, ...] = None) -> List[Tuple[Hashable, float]]:
+        """
+        類似記事を検索
+        
+        Args:
+            text: 記事本文
+            threshold: 類似度のしきい値（0〜1）
+            signature: 計算済みの署名
+        
+        Returns:
+            List[Tuple[Hashable, float]]: (キー, 推定類似度) のリスト（類似度の降順）
+        """
+        signature = signature or self.signature(text)
+        
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        
+        results = []
+        for key in candidates:
+            score = self.similarity(signature, self._signatures[key])
+            if score >= threshold:
+                results.append((key, score))
+        
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results
+    
+    def __len__(self) -> int:
+        return len(self._signatures)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._signatures
+    
+    def __iter__(self):
+        return iter(list(self._signatures))
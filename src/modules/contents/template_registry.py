@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+生成テンプレートレジストリモジュール
+記事生成テンプレートとテーマ候補を data/generation_templates.json から読み込み、タイプで引けるように保持する
+（ファイルが更新されたら次の参照時に読み込み直すため、実行中のプロセスにもテンプレートを追加できる）
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_TEMPLATES_PATH = "data/generation_templates.json"
+
+
+def build_prompt_section(template: Dict) -> str:
+    """
+    テンプレート固有のプロンプト部分を構築
+    
+    Args:
+        template: テンプレート（style, length, prompt, instructions）
+    
+    Returns:
+        str: 記事生成プロンプトに追加する文字列
+    """
+    section = f"\n記事のスタイル: {template['style']}\n"
+    section += f"推奨文字数: {template['length']}\n"
+    section += f"内容の方向性: {template['prompt']}\n"
+    if template.get("instructions"):
+        section += f"\n特別な要求: {template['instructions']}\n"
+    return section
+
+
+class TemplateRegistry:
+    """
+    記事生成テンプレートのレジストリ
+    
+    テンプレートはタイプをキーにした辞書で保持し、プロンプト部分（prompt_section）は読み込み時に1回だけ構築する。
+    参照のたびにファイルの更新日時とサイズを確認し、変わっていれば読み込み直す
+    （読み込みに失敗した場合は直前の内容を使い続ける）
+    """
+    
+    REQUIRED_FIELDS = ("type", "prompt", "style", "length")
+    
+    def __init__(self, path: str = DEFAULT_TEMPLATES_PATH):
+        """
+        Args:
+            path: テンプレートファイルのパス
+        """
+        self.path = path
+        self._templates: Dict[str, Dict] = {}
+        self._default_themes: List[str] = []
+        self._signature: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+        self.reload_if_changed()
+    
+    def reload_if_changed(self) -> bool:
+        """
+        テンプレートファイルが変更されていれば読み込み直す
+        
+        Returns:
+            bool: 読み込み直したかどうか
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._signature is None:
+                print(f"⚠️ 生成テンプレートファイルが見つかりません: {self.path}")
+                self._signature = (0, 0)
+            return False
+        
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return False
+        
+        with self._lock:
+            if signature == self._signature:
+                return False
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                templates = {}
+                for template in data.get("templates", []):
+                    missing = [field for field in self.REQUIRED_FIELDS if not template.get(field)]
+                    if missing:
+                        raise ValueError(f"テンプレートに必須項目がありません: {template.get('type', '?')} ({', '.join(missing)})")
+                    template = dict(template, themes=list(template.get("themes", [])))
+                    template["prompt_section"] = build_prompt_section(template)
+                    templates[template["type"]] = template
+            except Exception as e:
+                print(f"❌ 生成テンプレートの読み込みエラー（前回の内容を使用します）: {e}")
+                self._signature = signature
+                return False
+            
+            reloaded = self._signature not in (None, (0, 0))
+            self._templates = templates
+            self._default_themes = list(data.get("default_themes", []))
+            self._signature = signature
+        
+        if reloaded:
+            print(f"🔄 生成テンプレートを読み込み直しました: {len(templates)}件")
+        return True
+    
+    def get(self, template_type: str) -> Optional[Dict]:
+        """
+        タイプからテンプレートを取得
+        
+        Args:
+            template_type: テンプレートタイプ
+        
+        Returns:
+            Optional[Dict]: テンプレート（type, prompt, style, length, instructions, themes, prompt_section）
+        """
+        self.reload_if_changed()
+        return self._templates.get(template_type)
+    
+    def types(self) -> List[str]:
+        """テンプレートタイプの一覧（ファイルに書かれた順）"""
+        self.reload_if_changed()
+        return list(self._templates)
+    
+    def templates(self) -> List[Dict]:
+        """テンプレートの一覧（ファイルに書かれた順）"""
+        self.reload_if_changed()
+        return list(self._templates.values())
+    
+    def themes(self, template_type: str) -> List[str]:
+        """
+        テンプレートのテーマ候補を取得
+        
+        Args:
+            template_type: テンプレートタイプ
+        
+        Returns:
+            List[str]: テーマ候補（テンプレートにない場合は共通の候補）
+        """
+        template = self.get(template_type)
+        if template and template["themes"]:
+            return template["themes"]
+        return self._default_themes
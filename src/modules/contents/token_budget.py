@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+トークン予算モジュール
+プロンプトのトークン数を手元で数え、目標文字数から出力トークン数（max_tokens）を見積もり、
+モデルのコンテキスト長に収まるかを確認する
+"""
+
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+# モデル名の前方一致で引く（長い名前から順に照合する）。値は (コンテキスト長, 最大出力トークン数)
+MODEL_LIMITS = {
+    "gpt-4o-mini": (128000, 16384),
+    "gpt-4o": (128000, 16384),
+    "gpt-4-turbo": (128000, 4096),
+    "gpt-4": (8192, 8192),
+    "gpt-3.5-turbo": (16385, 4096),
+    "claude-3-5-sonnet": (200000, 8192),
+    "claude-3-5-haiku": (200000, 8192),
+    "claude-3": (200000, 4096),
+    "claude": (200000, 8192)
+}
+DEFAULT_MODEL_LIMITS = (8192, 4096)
+
+# 日本語の本文1文字あたりの出力トークン数（o200k_base / cl100k_base の実測の中間）と、
+# 見出し・コードブロック・記号の分の余裕、タイトル行の分
+TOKENS_PER_JAPANESE_CHAR = 1.0
+OUTPUT_MARGIN = 1.3
+TITLE_TOKENS = 64
+MIN_OUTPUT_TOKENS = 512
+
+# tiktokenがない場合の概算（かな・漢字・全角記号は1文字1トークン、それ以外は4文字1トークン）
+WIDE_CHAR_PATTERN = re.compile(r'[\u3000-\u30ff\u3400-\u9fff\uf900-\ufaff\uff00-\uffef]')
+LENGTH_PATTERN = re.compile(r'(\d+)\s*(?:[-〜~～]\s*(\d+))?')
+
+_encodings: Dict[str, object] = {}
+
+
+def parse_length(length: str) -> Optional[Tuple[int, int]]:
+    """
+    目標文字数の指定を解析
+    
+    Args:
+        length: "1500-2200文字"・"2000文字" などの指定
+    
+    Returns:
+        Optional[Tuple[int, int]]: (下限, 上限)。解析できない場合は None
+    """
+    match = LENGTH_PATTERN.search(length or "")
+    if not match:
+        return None
+    lower = int(match.group(1))
+    upper = int(match.group(2)) if match.group(2) else lower
+    return min(lower, upper), max(lower, upper)
+
+
+def get_model_limits(model: str) -> Tuple[int, int]:
+    """
+    モデルのコンテキスト長と最大出力トークン数
+    
+    Args:
+        model: モデル名
+    
+    Returns:
+        Tuple[int, int]: (コンテキスト長, 最大出力トークン数)。不明なモデルは控えめな既定値
+    """
+    for prefix in sorted(MODEL_LIMITS, key=len, reverse=True):
+        if (model or "").startswith(prefix):
+            return MODEL_LIMITS[prefix]
+    return DEFAULT_MODEL_LIMITS
+
+
+def _get_encoding(model: str):
+    """tiktokenのエンコーディング（OpenAI以外のモデルや未知のモデルは o200k_base で近似）"""
+    if model not in _encodings:
+        try:
+            _encodings[model] = tiktoken.encoding_for_model(model)
+        except KeyError:
+            _encodings[model] = tiktoken.get_encoding("o200k_base")
+    return _encodings[model]
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """
+    テキストのトークン数を数える（tiktokenがなければ文字種から概算）
+    
+    Args:
+        text: テキスト
+        model: モデル名
+    
+    Returns:
+        int: トークン数
+    """
+    if not text:
+        return 0
+    if TIKTOKEN_AVAILABLE:
+        try:
+            return len(_get_encoding(model).encode(text))
+        except Exception:
+            pass
+    
+    wide = len(WIDE_CHAR_PATTERN.findall(text))
+    return wide + math.ceil((len(text) - wide) / 4)
+
+
+def count_message_tokens(messages: List[Dict], model: str = "gpt-4o") -> int:
+    """
+    チャットメッセージ全体のトークン数（メッセージごとの区切りの分として4トークンを加える）
+    
+    Args:
+        messages: メッセージ（role, content の辞書のリスト）
+        model: モデル名
+    
+    Returns:
+        int: トークン数
+    """
+    return sum(count_tokens(str(message.get("content", "")), model) + 4 for message in messages) + 3
+
+
+def estimate_output_tokens(length: str) -> Optional[int]:
+    """
+    目標文字数から出力トークン数を見積もる（上限の文字数に余裕分とタイトル行を加える）
+    
+    Args:
+        length: "1500-2200文字" などの指定
+    
+    Returns:
+        Optional[int]: 出力トークン数（解析できない場合は None）
+    """
+    parsed = parse_length(length)
+    if not parsed:
+        return None
+    return max(math.ceil(parsed[1] * TOKENS_PER_JAPANESE_CHAR * OUTPUT_MARGIN) + TITLE_TOKENS, MIN_OUTPUT_TOKENS)
+
+
+def plan_max_tokens(messages: List[Dict], model: str, length: str = None, limit: int = None,
+                    context_window: int = None) -> int:
+    """
+    リクエストごとの max_tokens を決める
+    
+    目標文字数から見積もった出力トークン数を、設定の上限とモデルの最大出力トークン数、
+    コンテキスト長の残り（コンテキスト長 - プロンプトのトークン数）に収める
+    
+    Args:
+        messages: 送信するメッセージ
+        model: モデル名
+        length: 目標文字数の指定（省略時は上限まで使う）
+        limit: 設定の max_tokens（上限として扱う）
+        context_window: コンテキスト長（ローカルLLMなど、起動時の設定でモデルの既定値と異なる場合に指定）
+    
+    Returns:
+        int: max_tokens
+    
+    Raises:
+        ValueError: プロンプトだけでコンテキスト長を超える場合
+    """
+    model_context_window, max_output = get_model_limits(model)
+    context_window = context_window or model_context_window
+    prompt_tokens = count_message_tokens(messages, model)
+    remaining = context_window - prompt_tokens
+    if remaining < MIN_OUTPUT_TOKENS:
+        raise ValueError(f"プロンプトが長すぎます（{prompt_tokens} tokens、{model} のコンテキスト長 {context_window}）")
+    
+    ceiling = min(limit or max_output, max_output)
+    estimated = estimate_output_tokens(length) if length else None
+    if estimated and estimated > ceiling:
+        print(f"⚠️ 目標文字数（{length}）に対して max_tokens の上限 {ceiling} が不足する可能性があります")
+    max_tokens = min(estimated or ceiling, ceiling)
+    
+    if max_tokens > remaining:
+        print(f"⚠️ コンテキスト長に収まるよう max_tokens を {max_tokens} → {remaining} に減らします"
+              f"（プロンプト {prompt_tokens} tokens）")
+        max_tokens = remaining
+    return max_tokens
@@ -19,9 +19,13 @@ class NotePoster:
         self.article_generator = article_generator
         self.driver = driver_manager.get_driver()
         self.wait = driver_manager.get_wait()
+        self.posted_article = None  # 直近に投稿処理した記事（タイトル・内容）
+        self.published_url = None  # 直近に投稿した記事のURL（確認できた場合のみ）
 
     def create_and_publish_article(self):
         """記事を作成・投稿"""
+        self.posted_article = None
+        self.published_url = None
         try:
             print("📝 記事作成ページにアクセス中...")
             
@@ -168,6 +172,7 @@ class NotePoster:
 
             # 記事内容を生成
             article = self.article_generator.generate_article()
+            self.posted_article = article
             title = article['title']
             content = article['content']
             print(f"📄 記事タイトル: {title}")
@@ -786,6 +791,7 @@ class NotePoster:
                 if '/n/' in current_url or 'note.com' in current_url:
                     print("🎉 記事の投稿が完了しました！")
                     print(f"投稿された記事URL: {current_url}")
+                    self.published_url = current_url
                 else:
                     print("⚠️ 投稿完了の確認ができませんが、処理は実行されました")
             except Exception as e:
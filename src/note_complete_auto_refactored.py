@@ -15,6 +15,8 @@ from modules import (
     DataManager,
     TimeUtils
 )
+from modules.contents.content_hash import compute_content_hash
+from modules.contents.posting_ledger import PostingLedger
 
 class NoteCompleteAutoRefactored:
     """
@@ -28,12 +30,13 @@ class NoteCompleteAutoRefactored:
         
         # 各モジュールの初期化
         self.config_manager = ConfigManager(config_file)
-        self.data_manager = DataManager()
+        self.data_manager = DataManager(lazy=True)
         self.driver_manager = None
         self.note_login = None
         self.article_manager = None
         self.content_generator = None
         self.note_poster = None
+        self.posting_ledger = PostingLedger()
         
         print("🤖 note完全自動投稿システム（リファクタリング版）を初期化しました")
 
@@ -63,34 +66,63 @@ class NoteCompleteAutoRefactored:
 
     def run_auto_posting(self):
         """自動投稿実行（元のrun_auto_postingメソッドを完全再現）"""
+        # 投稿履歴（工程ごとの所要時間・投稿URL）の記録
+        run = self.posting_ledger.start_run("auto_posting")
         try:
             print("🤖 note完全自動投稿システムを開始します...")
             
             # システムセットアップ
             if not self.setup_system():
+                run.record(error="システムセットアップに失敗しました")
                 return False
+            run.lap("setup")
             
             # ログイン実行
             print("🔐 ログイン処理を開始します...")
             if not self.note_login.login():
                 print("❌ ログインに失敗しました")
+                run.record(error="ログインに失敗しました")
                 return False
+            run.lap("login")
             
             # 記事作成・投稿実行
             print("📝 記事作成・投稿処理を開始します...")
-            if not self.note_poster.create_and_publish_article():
+            posted = self.note_poster.create_and_publish_article()
+            run.lap("post")
+            self._record_posted_article(run)
+            if not posted:
                 print("❌ 記事作成・投稿に失敗しました")
+                run.record(error="記事作成・投稿に失敗しました")
                 return False
             
+            run.record(status="success", note_url=self.note_poster.published_url)
+            self.article_manager.mark_article_posted()
+            
             print("✅ 全ての処理が正常に完了しました！")
             return True
             
         except Exception as e:
             print(f"❌ 自動投稿中にエラーが発生しました: {e}")
+            run.record(error=str(e))
             return False
         finally:
             # クリーンアップ
             self.cleanup()
+            run.finish()
+
+    def _record_posted_article(self, run):
+        """投稿処理した記事のID・タイトル・コンテンツハッシュを投稿履歴に記録"""
+        article_id = self.article_manager.current_article_id
+        posted_article = self.note_poster.posted_article
+        if posted_article:
+            run.record(title=posted_article['title'])
+        
+        # データファイルの記事は登録済みのハッシュ（プレースホルダー置換前の本文）を使う
+        article = self.data_manager.get_article_by_id(article_id) if article_id is not None else None
+        if article:
+            run.record(article_id=article_id, content_hash=article.get('content_hash'))
+        elif posted_article:
+            run.record(content_hash=compute_content_hash(posted_article['content']))
 
     def cleanup(self):
         """システムクリーンアップ"""
@@ -110,7 +142,8 @@ class NoteCompleteAutoRefactored:
         print("4. 特定の記事で投稿")
         print("5. 新しい記事を追加")
         print("6. 設定確認")
-        print("7. 終了")
+        print("7. 記事を検索")
+        print("8. 終了")
         print("="*50)
 
     def run_llm_generated_posting(self):
@@ -184,7 +217,15 @@ class NoteCompleteAutoRefactored:
             
             # 記事生成
             print(f"\n🎯 記事を生成中... (方法: {method})")
-            title, content = self.content_generator.generate_content(method, **generation_kwargs)
+            # 既存記事と同じ・類似した内容は校閲・投稿の前に弾く（再生成を試行）
+            generated = self.content_generator.generate_unique_content(method, **generation_kwargs)
+            if not generated:
+                print("❌ 既存の記事と重複しない記事を生成できませんでした")
+                print("投稿を中止します。もう一度生成してください。")
+                return False
+            title, content = generated
+            # 定型文のテンプレートの本文は重複判定に使わない
+            source_content = content if self.content_generator.last_method == "llm" else None
             
             # 生成結果確認
             print(f"\n📝 生成された記事:")
@@ -313,7 +354,7 @@ class NoteCompleteAutoRefactored:
                 if tags_input:
                     tags = [tag.strip() for tag in tags_input.split(",") if tag.strip()]
                 
-                if self.data_manager.add_article(title, content, category, tags):
+                if self.data_manager.add_article(title, content, category, tags, source_content=source_content):
                     print("✅ 記事をデータファイルに保存しました")
                 else:
                     print("❌ 記事の保存に失敗しました")
@@ -329,8 +370,12 @@ class NoteCompleteAutoRefactored:
     def run_specific_article_posting(self):
         """特定の記事で投稿実行"""
         try:
-            # 記事一覧を表示
-            self.data_manager.list_articles()
+            # キーワードで検索（空白の場合は記事一覧を表示）
+            keyword = input("検索キーワードを入力してください（空白で一覧表示）: ").strip()
+            if keyword:
+                self._get_article_manager().search_articles(keyword)
+            else:
+                self._get_article_manager().list_available_articles()
             
             # 記事IDを入力
             try:
@@ -469,6 +514,7 @@ class NoteCompleteAutoRefactored:
                 print("❌ 記事投稿に失敗しました")
                 return False
             
+            self.article_manager.mark_article_posted()
             print("✅ 指定された記事の投稿が完了しました！")
             return True
             
@@ -478,6 +524,24 @@ class NoteCompleteAutoRefactored:
         finally:
             self.cleanup()
 
+    def _get_article_manager(self):
+        """記事管理器を取得（WebDriverのセットアップ前でも検索等に使えるよう必要時に生成）"""
+        if not self.article_manager:
+            self.article_manager = ArticleManager(self.data_manager)
+        return self.article_manager
+
+    def show_articles(self):
+        """記事一覧をページ送りで表示"""
+        self._get_article_manager().list_available_articles()
+
+    def search_articles(self):
+        """キーワード・カテゴリ・タグで記事を検索"""
+        keyword = input("検索キーワードを入力してください（空白で条件のみ）: ").strip()
+        category = input("カテゴリで絞り込み（空白でスキップ）: ").strip() or None
+        tag = input("タグで絞り込み（空白でスキップ）: ").strip() or None
+        
+        return self._get_article_manager().search_articles(keyword, category=category, tag=tag)
+
     def add_new_article(self):
         """新しい記事を追加"""
         try:
@@ -536,7 +600,7 @@ class NoteCompleteAutoRefactored:
         
         print("\n📚 記事データ設定:")
         print(f"  データファイル: {self.data_manager.data_file_path}")
-        print(f"  利用可能記事数: {len(self.data_manager.get_active_articles())}件")
+        print(f"  利用可能記事数: {self.data_manager.count_articles()}件")
         
         print("\n🤖 LLM設定:")
         if hasattr(self, 'content_generator') and self.content_generator:
@@ -592,112 +656,7 @@ class NoteCompleteAutoRefactored:
     
     def _select_theme_for_template(self, template_type: str) -> str:
         """テンプレートタイプに応じたテーマ選択"""
-        theme_options = {
-            "tech_tutorial": [
-                "Python基礎プログラミング",
-                "Docker入門とコンテナ化",
-                "Git/GitHub実践活用",
-                "React.js開発入門",
-                "Node.js API開発",
-                "データベース設計基礎",
-                "AWS クラウド入門",
-                "Linux コマンド活用",
-                "VS Code 効率化設定",
-                "テスト駆動開発(TDD)"
-            ],
-            "tech_deep_dive": [
-                "JavaScriptエンジンの仕組み",
-                "HTTP/HTTPSプロトコルの詳細",
-                "データベースインデックスの最適化",
-                "メモリ管理とガベージコレクション",
-                "認証・認可システムの設計",
-                "マイクロサービスアーキテクチャ",
-                "キャッシュ戦略と実装",
-                "非同期処理とイベントループ",
-                "セキュリティ脆弱性と対策",
-                "パフォーマンス最適化手法"
-            ],
-            "dev_experience": [
-                "大規模リファクタリング体験談",
-                "チーム開発での失敗と学び",
-                "技術選定の判断プロセス",
-                "パフォーマンス問題の解決",
-                "レガシーコードとの向き合い方",
-                "新技術導入の挑戦",
-                "バグ調査・デバッグ体験",
-                "プロジェクト炎上からの復活",
-                "コードレビュー文化の構築",
-                "個人開発から学んだこと"
-            ],
-            "tech_comparison": [
-                "React vs Vue.js vs Angular",
-                "MySQL vs PostgreSQL vs MongoDB",
-                "Docker vs Kubernetes vs Serverless",
-                "REST API vs GraphQL vs gRPC",
-                "TypeScript vs JavaScript",
-                "AWS vs Azure vs GCP",
-                "Redux vs Context API vs Zustand",
-                "Jest vs Vitest vs Cypress",
-                "Nginx vs Apache vs Caddy",
-                "npm vs yarn vs pnpm"
-            ],
-            "programming_tips": [
-                "効率的なデバッグ手法",
-                "可読性の高いコードの書き方",
-                "エラーハンドリングのベストプラクティス",
-                "コードレビューのコツ",
-                "リファクタリングの進め方",
-                "命名規則とコメント活用",
-                "パフォーマンス向上のテクニック",
-                "セキュアコーディング実践",
-                "テストコード設計のポイント",
-                "開発環境の効率化"
-            ],
-            "tech_trends": [
-                "AI・機械学習の最新動向",
-                "Web3・ブロックチェーン技術",
-                "エッジコンピューティングの進化",
-                "ローコード・ノーコード開発",
-                "量子コンピューティング",
-                "WebAssembly(WASM)の可能性",
-                "5G技術とアプリケーション",
-                "サーバーレスアーキテクチャ",
-                "DevOps・GitOpsの発展",
-                "プライバシー保護技術"
-            ],
-            "learning_share": [
-                "オンライン学習プラットフォーム活用",
-                "技術書の効果的な読み方",
-                "プログラミング言語の学習順序",
-                "実践的なポートフォリオ作成",
-                "OSS貢献の始め方",
-                "技術コミュニティ参加のメリット",
-                "資格取得の価値と活用",
-                "メンターとの関わり方",
-                "継続的学習の習慣化",
-                "スキルアップのロードマップ"
-            ],
-            "problem_solving": [
-                "メモリリークの特定と解決",
-                "パフォーマンス劣化の原因調査",
-                "セキュリティ脆弱性の修正",
-                "データベースクエリ最適化",
-                "API レスポンス速度改善",
-                "フロントエンド描画最適化",
-                "サーバー負荷分散対策",
-                "バックアップ・復旧戦略",
-                "モニタリング・アラート設定",
-                "障害対応とポストモーテム"
-            ]
-        }
-        
-        themes = theme_options.get(template_type, [
-            "プログラミング基礎",
-            "Web開発",
-            "データベース",
-            "クラウド技術",
-            "開発手法"
-        ])
+        themes = self.content_generator.get_template_themes(template_type)
         
         print(f"\n🎯 '{template_type}' テンプレート用のテーマを選択してください:")
         for i, theme in enumerate(themes, 1):
@@ -725,7 +684,7 @@ def main():
     
     while True:
         auto_poster.show_menu()
-        choice = input("選択してください (1-7): ").strip()
+        choice = input("選択してください (1-8): ").strip()
         
         if choice == "1":
             print("\n🚀 自動投稿を開始します...")
@@ -737,8 +696,7 @@ def main():
             break
         elif choice == "3":
             print("\n📚 記事一覧を表示します...")
-            auto_poster.data_manager.list_articles()
-            input("\nEnterキーで戻る...")
+            auto_poster.show_articles()
         elif choice == "4":
             print("\n📝 特定の記事で投稿します...")
             auto_poster.run_specific_article_posting()
@@ -749,10 +707,14 @@ def main():
         elif choice == "6":
             auto_poster.show_settings()
         elif choice == "7":
+            print("\n🔍 記事を検索します...")
+            auto_poster.search_articles()
+            input("\nEnterキーで戻る...")
+        elif choice == "8":
             print("👋 システムを終了します。")
             break
         else:
-            print("❌ 無効な選択です。1-7の数字を入力してください。")
+            print("❌ 無効な選択です。1-8の数字を入力してください。")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
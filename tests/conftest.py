@@ -0,0 +1,20 @@
+"""
+テスト共通の設定（src を import パスに追加し、selenium がなければ投稿モジュールを import しない）
+"""
+
+import importlib
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, ROOT)
+
+try:
+    importlib.import_module("selenium")
+except ImportError:
+    # modules/__init__.py は投稿モジュール（selenium）も import するため、コンテンツ系だけを読み込めるようにする
+    package = types.ModuleType("modules")
+    package.__path__ = [os.path.join(ROOT, "src", "modules")]
+    sys.modules.setdefault("modules", package)
@@ -0,0 +1,127 @@
+"""
+記事選択ポリシー（一様・重み付き・ローテーション）のテスト
+"""
+
+import json
+import random
+from collections import Counter
+
+import pytest
+
+from modules.contents.article_selector import IndexedIdSet, create_selection_policy
+from modules.contents.data_manager import DataManager
+
+
+@pytest.fixture(autouse=True)
+def seeded_random():
+    random.seed(1234)
+
+
+def test_indexed_id_set_add_discard():
+    ids = IndexedIdSet()
+    for article_id in (1, 2, 3, 2):
+        ids.add(article_id)
+    ids.discard(1)
+    ids.discard(99)
+
+    assert sorted(ids) == [2, 3]
+    assert len(ids) == 2
+    assert 1 not in ids
+    assert {ids.choice() for _ in range(50)} == {2, 3}
+
+
+def test_uniform_distribution():
+    policy = create_selection_policy("uniform")
+    for article_id in range(1, 5):
+        policy.add({"id": article_id})
+
+    counts = Counter(policy.select() for _ in range(8000))
+
+    assert set(counts) == {1, 2, 3, 4}
+    assert all(abs(count - 2000) < 200 for count in counts.values())
+
+
+def test_weighted_distribution_follows_weights():
+    """重みに比例して選ばれ、重みが0以下の記事は選ばれない"""
+    policy = create_selection_policy("weighted")
+    weights = {1: 1.0, 2: 3.0, 3: 6.0, 4: 0.0}
+    for article_id, weight in weights.items():
+        policy.add({"id": article_id, "weight": weight})
+
+    draws = 20000
+    counts = Counter(policy.select() for _ in range(draws))
+
+    assert 4 not in counts
+    for article_id in (1, 2, 3):
+        expected = draws * weights[article_id] / 10.0
+        assert abs(counts[article_id] - expected) < expected * 0.1
+
+
+def test_weighted_rebuilds_after_update():
+    """重みの変更・削除は次の選択から反映する"""
+    policy = create_selection_policy("weighted")
+    policy.add({"id": 1})
+    policy.add({"id": 2})
+    policy.select()
+
+    policy.update({"id": 1, "weight": 0})
+    policy.remove(3)
+    assert {policy.select() for _ in range(50)} == {2}
+    policy.remove(2)
+    assert policy.select() is None
+
+
+def test_rotation_order():
+    """未投稿の記事を先に、その後は最後に投稿した日時が古い順に選ぶ"""
+    policy = create_selection_policy("rotation")
+    policy.add({"id": 1, "last_posted_at": "2024-01-03T00:00:00"})
+    policy.add({"id": 2, "last_posted_at": "2024-01-01T00:00:00"})
+    policy.add({"id": 3})
+    policy.add({"id": 4, "last_posted_at": "2024-01-02T00:00:00"})
+
+    order = []
+    for step in range(6):
+        article_id = policy.select()
+        order.append(article_id)
+        policy.update({"id": article_id, "last_posted_at": f"2024-02-{step + 1:02d}T00:00:00"})
+
+    assert order == [3, 2, 4, 1, 3, 2]
+
+
+def test_rotation_skips_removed_articles():
+    policy = create_selection_policy("rotation")
+    for article_id in (1, 2, 3):
+        policy.add({"id": article_id})
+    policy.remove(policy.select())
+
+    assert len(policy) == 2
+    remaining = set()
+    for step in range(2):
+        article_id = policy.select()
+        remaining.add(article_id)
+        policy.update({"id": article_id, "last_posted_at": f"2024-02-{step + 1:02d}T00:00:00"})
+    assert len(remaining) == 2
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        create_selection_policy("random")
+
+
+def test_data_manager_rotation_posts_every_article_once(tmp_path):
+    """ローテーションでは投稿を記録するたびに別の記事が選ばれ、全記事を一巡する"""
+    articles = [{"id": i, "title": f"記事{i}", "content": f"{i}番目の記事の本文です。", "category": "テスト",
+                 "tags": [], "status": "active"} for i in range(1, 6)]
+    path = tmp_path / "articles.json"
+    path.write_text(json.dumps({"articles": articles, "settings": {"selection_policy": "rotation"}},
+                               ensure_ascii=False), encoding="utf-8")
+    manager = DataManager(str(path))
+
+    selected = []
+    for _ in range(5):
+        article = manager.get_random_article()
+        selected.append(article["id"])
+        assert manager.mark_posted(article["id"])
+
+    assert sorted(selected) == [1, 2, 3, 4, 5]
+    assert DataManager(str(path)).get_random_article()["id"] == selected[0]
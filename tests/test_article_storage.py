@@ -0,0 +1,237 @@
+"""
+記事ストレージ（json / journal / sqlite）のテスト
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from modules.contents.article_storage import (FileLock, JournalArticleStorage, SqliteArticleStorage, atomic_write,
+                                              convert_storage, create_storage)
+from modules.contents.data_manager import DataManager
+
+BACKENDS = ["json", "journal", "sqlite"]
+
+
+def _article(article_id, content=None):
+    return {"id": article_id, "title": f"記事{article_id}", "content": content or f"{article_id}番目の記事の本文です。",
+            "category": "テスト", "tags": ["tag"], "status": "active", "created_at": "2024-01-01"}
+
+
+def _storage_path(tmp_path, backend):
+    return str(tmp_path / ("articles.db" if backend == "sqlite" else "articles.json"))
+
+
+def _sample_data():
+    articles = [_article(1), _article(2, "二番目の記事の本文です。"), _article(3)]
+    articles[1]["tags"] = ["日常", "テスト"]
+    articles[1]["weight"] = 2.5
+    articles[2]["status"] = "archived"
+    return {"articles": articles, "settings": {"default_category": "テスト", "template_variables": {"name": "note"}}}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_storage_round_trip(tmp_path, backend):
+    """保存した記事データ（独自フィールド・設定を含む）を別のインスタンスでそのまま読み込める"""
+    path = _storage_path(tmp_path, backend)
+    data = _sample_data()
+    storage = create_storage(path, backend)
+    storage.save_all(data)
+    storage.close()
+
+    loaded = create_storage(path, backend).load()
+
+    assert loaded == data
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_storage_round_trip_after_insert_and_update(tmp_path, backend):
+    """追加・一部フィールドの変更を保存した結果を別のインスタンスで読み込める"""
+    path = _storage_path(tmp_path, backend)
+    data = _sample_data()
+    storage = create_storage(path, backend)
+    storage.save_all(data)
+
+    added = _article(4, "追加した記事の本文です。")
+    data["articles"].append(added)
+    storage.insert_article(data, added)
+    data["articles"][0]["status"] = "archived"
+    storage.update_article(data, data["articles"][0], ["status"])
+    storage.close()
+
+    loaded = create_storage(path, backend).load()
+
+    assert loaded["articles"] == data["articles"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_data_manager_round_trip(tmp_path, backend):
+    """DataManager はバックエンドによらず同じ操作で記事を保存・検索できる"""
+    path = _storage_path(tmp_path, backend)
+    create_storage(path, backend).save_all(_sample_data())
+
+    manager = DataManager(path, backend=backend)
+    assert manager.add_article("追加した記事", "追加した記事の本文です。", "日常", ["新規"])
+    assert manager.set_article_status(1, "archived")
+
+    reopened = DataManager(path, backend=backend)
+    assert reopened.get_article_by_id(4)["title"] == "追加した記事"
+    assert [article["id"] for article in reopened.find_articles(status="archived")] == [1, 3]
+    assert [article["id"] for article in reopened.find_articles(tag="新規")] == [4]
+    assert [article["id"] for article in reopened.find_articles(category="テスト")] == [2]
+
+
+def test_sqlite_query_article_ids(tmp_path):
+    """SQLiteではステータス・カテゴリ・タグでの絞り込みをSQLで行う"""
+    storage = SqliteArticleStorage(str(tmp_path / "articles.db"))
+    storage.save_all(_sample_data())
+
+    assert storage.query_article_ids(status="active") == [1, 2]
+    assert storage.query_article_ids(tag="日常") == [2]
+    assert storage.query_article_ids(status="archived", category="テスト") == [3]
+
+
+def test_convert_storage_json_to_sqlite(tmp_path):
+    """JSONからSQLiteに変換しても記事データは変わらない"""
+    source = create_storage(str(tmp_path / "articles.json"), "json")
+    source.save_all(_sample_data())
+    destination = create_storage(str(tmp_path / "articles.db"))
+
+    assert convert_storage(source, destination) == 3
+    assert destination.load() == source.load()
+
+
+def test_journal_replay_leaves_partial_line(tmp_path):
+    """ロックを取らない読み込みでは、追記途中の末尾行を読み飛ばすだけでジャーナルを切り詰めない"""
+    storage = JournalArticleStorage(str(tmp_path / "articles.json"))
+    storage.save_all({"articles": [_article(1)], "settings": {}})
+    storage.insert_article({}, _article(2))
+    partial = json.dumps({"op": "add", "article": _article(3)}, ensure_ascii=False).encode("utf-8")[:20]
+    with open(storage.journal_path, "ab") as f:
+        f.write(partial)
+    size = (tmp_path / "articles.journal.jsonl").stat().st_size
+
+    data = JournalArticleStorage(str(tmp_path / "articles.json")).load()
+
+    assert [article["id"] for article in data["articles"]] == [1, 2]
+    assert (tmp_path / "articles.journal.jsonl").stat().st_size == size
+
+
+def test_journal_append_after_torn_line(tmp_path):
+    """クラッシュで途切れた行の後に追記しても、追記した行は壊れた行と連結されない"""
+    storage = JournalArticleStorage(str(tmp_path / "articles.json"))
+    storage.save_all({"articles": [_article(1)], "settings": {}})
+    with open(storage.journal_path, "ab") as f:
+        f.write(b'{"op": "add", "arti')
+
+    storage.insert_article({}, _article(2))
+
+    data = JournalArticleStorage(str(tmp_path / "articles.json")).load()
+    assert [article["id"] for article in data["articles"]] == [1, 2]
+
+
+def test_journal_appends_without_rewriting_snapshot(tmp_path):
+    """追加・変更はジャーナルに1行ずつ追記し、読み込み時にスナップショットへ再生する"""
+    storage = JournalArticleStorage(str(tmp_path / "articles.json"))
+    data = _sample_data()
+    storage.save_all(data)
+    snapshot = (tmp_path / "articles.json").read_bytes()
+
+    storage.insert_article(data, _article(4))
+    storage.update_article(data, {"id": 1, "status": "archived"}, ["status"])
+
+    assert (tmp_path / "articles.json").read_bytes() == snapshot
+    assert len((tmp_path / "articles.journal.jsonl").read_text(encoding="utf-8").splitlines()) == 2
+    reopened = JournalArticleStorage(str(tmp_path / "articles.json"))
+    loaded = reopened.load()
+    assert [article["id"] for article in loaded["articles"]] == [1, 2, 3, 4]
+    assert loaded["articles"][0]["status"] == "archived"
+    assert reopened.journal_entries == 2
+
+
+def test_journal_compacts_at_threshold(tmp_path):
+    """ジャーナルが一定件数に達したらスナップショットに畳み込んでジャーナルを消す"""
+    storage = JournalArticleStorage(str(tmp_path / "articles.json"), compact_threshold=2)
+    data = _sample_data()
+    storage.save_all(data)
+
+    for article_id in (4, 5):
+        article = _article(article_id)
+        data["articles"].append(article)
+        storage.insert_article(data, article)
+
+    assert not (tmp_path / "articles.journal.jsonl").exists()
+    with open(tmp_path / "articles.json", encoding="utf-8") as f:
+        assert [article["id"] for article in json.load(f)["articles"]] == [1, 2, 3, 4, 5]
+
+
+def test_journal_recovers_after_crash_mid_append(tmp_path):
+    """書き込み途中でクラッシュした行を読み飛ばし、その前後の記事は失わない"""
+    path = str(tmp_path / "articles.json")
+    storage = JournalArticleStorage(path)
+    storage.save_all(_sample_data())
+    storage.insert_article({}, _article(4))
+    with open(storage.journal_path, "ab") as f:
+        f.write('{"op": "add", "article": {"id": 5, "title": "途中'.encode("utf-8"))
+
+    manager = DataManager(path)
+    assert manager.storage.backend_name == "journal"
+    assert manager.add_article("クラッシュ後に追加した記事", "クラッシュ後に追加した記事の本文です。")
+
+    reopened = DataManager(path)
+    assert [article["id"] for article in reopened.get_active_articles()] == [1, 2, 4, 5]
+    assert reopened.get_article_by_id(5)["title"] == "クラッシュ後に追加した記事"
+
+
+def test_journal_reload_sees_other_process_append(tmp_path):
+    """他のプロセスがジャーナルに追記した記事は読み込み直しで取り込む"""
+    path = str(tmp_path / "articles.json")
+    JournalArticleStorage(path).save_all(_sample_data())
+    (tmp_path / "articles.journal.jsonl").touch()
+    manager = DataManager(path)
+
+    assert DataManager(path).add_article("他のプロセスの記事", "他のプロセスで追加した記事の本文です。")
+
+    assert manager.reload_if_changed()
+    assert manager.find_article_by_content("他のプロセスで追加した記事の本文です。")["id"] == 4
+
+
+def test_atomic_write_keeps_original_on_failure(tmp_path):
+    """書き込み途中で失敗しても元のファイルは壊れず、一時ファイルも残らない"""
+    path = tmp_path / "articles.json"
+    path.write_text('{"articles": []}', encoding="utf-8")
+
+    def failing_writer(f):
+        f.write(b'{"articles": [')
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        atomic_write(str(path), failing_writer)
+
+    assert path.read_text(encoding="utf-8") == '{"articles": []}'
+    assert os.listdir(tmp_path) == ["articles.json"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fcntl による確認")
+def test_file_lock_excludes_other_process(tmp_path):
+    """ロック中は他のプロセスがロックを取得できない（同じインスタンスでは再入できる）"""
+    lock_path = str(tmp_path / "articles.json.lock")
+    probe = ("import fcntl, os, sys\n"
+             "fd = os.open(sys.argv[1], os.O_RDWR | os.O_CREAT)\n"
+             "try:\n"
+             "    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)\n"
+             "except BlockingIOError:\n"
+             "    sys.exit(1)\n")
+
+    def other_process_can_lock():
+        return subprocess.run([sys.executable, "-c", probe, lock_path]).returncode == 0
+
+    lock = FileLock(lock_path)
+    with lock:
+        with lock:
+            assert not other_process_can_lock()
+        assert not other_process_can_lock()
+    assert other_process_can_lock()
@@ -0,0 +1,199 @@
+"""
+DataManager（インデックス・遅延読み込み・他プロセスの更新の読み込み直し・一覧表示）のテスト
+"""
+
+import json
+
+import pytest
+
+from modules.contents.data_manager import DataManager
+
+
+def _write_articles(path, count=5):
+    articles = [{"id": i, "title": f"記事{i}", "content": f"{i}番目の記事の本文です。" * 3,
+                 "category": "テスト", "tags": ["tag"], "status": "active"} for i in range(1, count + 1)]
+    path.write_text(json.dumps({"articles": articles, "settings": {}}, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def test_reload_after_external_write(tmp_path):
+    """他のプロセスが記事データを書き換えたら、次のアクセスで読み込み直す"""
+    path = _write_articles(tmp_path / "articles.json")
+    manager = DataManager(path)
+    assert not manager.reload_if_changed()
+
+    assert DataManager(path).add_article("他のプロセスの記事", "他のプロセスで追加した記事の本文です。")
+
+    assert manager.get_article_by_id(6)["title"] == "他のプロセスの記事"
+    assert not manager.reload_if_changed()
+
+
+def test_status_change_keeps_external_write(tmp_path):
+    """古い記事データを持ったままステータスを変更しても、他のプロセスが追加した記事を上書きで消さない"""
+    path = _write_articles(tmp_path / "articles.json")
+    manager = DataManager(path)
+    assert DataManager(path).add_article("他のプロセスの記事", "他のプロセスで追加した記事の本文です。")
+
+    assert manager.set_article_status(1, "archived")
+    assert manager.mark_posted(2)
+
+    reopened = DataManager(path)
+    assert reopened.get_article_by_id(6)["title"] == "他のプロセスの記事"
+    assert reopened.get_article_by_id(1) is None
+    assert reopened.get_article_by_id(2)["last_posted_at"]
+
+
+def test_save_is_atomic(tmp_path, monkeypatch):
+    """保存中に失敗しても記事データファイルは保存前の内容のまま読み込める"""
+    path = _write_articles(tmp_path / "articles.json")
+    manager = DataManager(path)
+    original = (tmp_path / "articles.json").read_text(encoding="utf-8")
+
+    def failing_dumps(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("modules.contents.article_storage.json.dumps", failing_dumps)
+    assert not manager.save_articles()
+    monkeypatch.undo()
+
+    assert (tmp_path / "articles.json").read_text(encoding="utf-8") == original
+    assert len(DataManager(path).get_active_articles()) == 5
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_list_articles_rejects_invalid_limit(tmp_path, limit):
+    manager = DataManager(_write_articles(tmp_path / "articles.json"))
+    with pytest.raises(ValueError):
+        manager.list_articles(0, limit)
+
+
+def test_list_articles_rejects_negative_offset(tmp_path):
+    manager = DataManager(_write_articles(tmp_path / "articles.json"))
+    with pytest.raises(ValueError):
+        manager.list_articles(-1, 2)
+
+
+def test_list_articles_pages(tmp_path):
+    manager = DataManager(_write_articles(tmp_path / "articles.json"))
+    assert manager.list_articles(0, 2)
+    assert manager.list_articles(2, 2)
+    assert not manager.list_articles(4, 2)
+
+
+def _count_signatures(monkeypatch):
+    """MinHash署名を計算した回数を数える"""
+    from modules.contents.similarity_index import MinHashLSHIndex
+    calls = []
+    signature = MinHashLSHIndex.signature
+
+    def counting_signature(self, text):
+        calls.append(text)
+        return signature(self, text)
+
+    monkeypatch.setattr(MinHashLSHIndex, "signature", counting_signature)
+    return calls
+
+
+def test_similarity_index_is_persisted_and_reused(tmp_path, monkeypatch):
+    """類似記事検出用の索引は保存され、次に起動したときは全記事の署名を計算し直さない"""
+    path = _write_articles(tmp_path / "articles.json")
+    calls = _count_signatures(monkeypatch)
+    query = "1番目の記事の本文です。" * 3
+
+    assert DataManager(path).find_similar_articles(query)[0][0]["id"] == 1
+    assert len(calls) == 5 + 1
+    assert (tmp_path / "articles.json.similarity-index").exists()
+
+    calls.clear()
+    assert DataManager(path, lazy=True).find_similar_articles(query)[0][0]["id"] == 1
+    assert calls == [query]
+
+
+def test_similarity_index_updates_incrementally_on_reload(tmp_path, monkeypatch):
+    """他のプロセスが追加した記事は、読み込み直したときにその記事の分だけ索引に登録する"""
+    path = _write_articles(tmp_path / "articles.json")
+    manager = DataManager(path)
+    manager.find_similar_articles("準備")
+    calls = _count_signatures(monkeypatch)
+
+    content = "他のプロセスで追加した、まったく別の話題の記事です。" * 3
+    assert DataManager(path).add_article("追加した記事", content)
+    calls.clear()
+
+    similar = manager.find_similar_articles(content)
+    assert similar[0][0]["title"] == "追加した記事"
+    assert calls == [content, content]
+
+
+def test_lazy_mode_defers_loading(tmp_path, monkeypatch):
+    """遅延モードは最初にアクセスするまで記事データを読み込まない"""
+    path = _write_articles(tmp_path / "articles.json")
+    loads = []
+    manager = DataManager(path, lazy=True)
+    monkeypatch.setattr(manager.storage, "load", lambda lazy=False: loads.append(lazy) or {"articles": [], "settings": {}})
+    assert not loads
+
+    manager.get_active_articles()
+    assert loads == [True]
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_lazy_article_loads_content_on_access(tmp_path, backend):
+    """遅延モードの記事はメタデータだけを持ち、本文はアクセスしたときにディスクから読む"""
+    from modules.contents.article_storage import LazyArticle, create_storage
+
+    path = _write_articles(tmp_path / "articles.json")
+    if backend == "sqlite":
+        source = create_storage(path)
+        path = str(tmp_path / "articles.db")
+        create_storage(path).save_all(source.load())
+
+    article = DataManager(path, lazy=True).get_article_by_id(3)
+
+    assert isinstance(article, LazyArticle)
+    assert "content" not in article
+    assert article["content"] == "3番目の記事の本文です。" * 3
+    assert article.get("content") == article["content"]
+    assert article.materialize()["content"] == article["content"]
+    assert article["content_hash"]
+    with pytest.raises(KeyError):
+        article["missing"]
+
+
+def test_lazy_scan_across_chunk_boundaries(tmp_path, monkeypatch):
+    """記事が読み込みのチャンク境界をまたいでも、メタデータと本文のバイト位置を正しく取得する"""
+    monkeypatch.setattr("modules.contents.article_storage.SCAN_CHUNK_SIZE", 97)
+    articles = [{"id": i, "title": f"記事{i}", "content": f"{i}番目の長い記事の本文です。" * (i * 40),
+                 "category": "テスト", "tags": ["tag"], "status": "active"} for i in range(1, 8)]
+    path = tmp_path / "articles.json"
+    path.write_text(json.dumps({"articles": articles, "settings": {"default_category": "テスト"}},
+                               ensure_ascii=False, indent=2), encoding="utf-8")
+
+    manager = DataManager(str(path), lazy=True)
+
+    assert manager.get_settings()["default_category"] == "テスト"
+    for article in articles:
+        assert manager.get_article_by_id(article["id"])["content"] == article["content"]
+
+
+def test_lazy_content_after_external_rewrite(tmp_path):
+    """他のプロセスがスナップショットを書き換えた後も、正しい位置から本文を読む"""
+    path = _write_articles(tmp_path / "articles.json")
+    manager = DataManager(path, lazy=True)
+    article = manager.get_article_by_id(5)
+
+    other = DataManager(path)
+    other.articles_data["articles"].insert(0, {"id": 100, "title": "先頭に追加した記事", "content": "長い本文。" * 50,
+                                               "category": "テスト", "tags": [], "status": "active"})
+    assert other.save_articles()
+
+    assert article["content"] == "5番目の記事の本文です。" * 3
+
+
+def test_lazy_mode_falls_back_for_other_layouts(tmp_path):
+    """articles が先頭にない記事データは通常どおり読み込む"""
+    path = tmp_path / "articles.json"
+    articles = [{"id": 1, "title": "記事1", "content": "本文です。", "category": "テスト", "tags": [], "status": "active"}]
+    path.write_text(json.dumps({"settings": {}, "articles": articles}, ensure_ascii=False), encoding="utf-8")
+
+    assert DataManager(str(path), lazy=True).get_article_by_id(1)["content"] == "本文です。"
@@ -0,0 +1,191 @@
+"""
+full_auto_post.py の完全自動投稿を、ブラウザ操作とAI校閲を差し替えて繰り返し実行するテスト
+"""
+
+import importlib
+import itertools
+import json
+import os
+import shutil
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 本文を毎回まったく違う内容にするための語彙（校閲後の本文が既存記事と類似しないようにする）
+WORDS = ["朝焼け", "珈琲", "散歩道", "図書館", "自転車", "夕立", "金木犀", "商店街", "週末", "手紙",
+         "川沿い", "公園", "台所", "縁側", "旅先", "夜空", "港町", "畑仕事", "喫茶店", "坂道"]
+
+
+class FakeDriverManager:
+    def setup_driver(self):
+        return True
+
+    def cleanup(self):
+        pass
+
+
+class FakeNoteLogin:
+    def __init__(self, driver_manager, config_manager):
+        pass
+
+    def login(self):
+        return True
+
+
+class FakeNotePoster:
+    """NotePoster と同じく、投稿時に article_generator.generate_article() で記事を取得する"""
+    posted = []
+
+    def __init__(self, driver_manager, article_generator):
+        self.article_generator = article_generator
+        self.published_url = None
+
+    def create_and_publish_article(self):
+        FakeNotePoster.posted.append(self.article_generator.generate_article())
+        self.published_url = f"https://note.com/example/n/{len(FakeNotePoster.posted)}"
+        return True
+
+
+def _install_post_stubs(monkeypatch):
+    """selenium を使う投稿モジュールを差し替える"""
+    stubs = {
+        "modules.post.driver_manager": ("DriverManager", FakeDriverManager),
+        "modules.post.note_login": ("NoteLogin", FakeNoteLogin),
+        "modules.post.note_poster": ("NotePoster", FakeNotePoster),
+    }
+    for name, (attr, cls) in stubs.items():
+        module = types.ModuleType(name)
+        setattr(module, attr, cls)
+        monkeypatch.setitem(sys.modules, name, module)
+    try:
+        importlib.import_module("selenium")
+    except ImportError:
+        utils = types.ModuleType("modules.utils")
+        for attr in ("InputUtils", "ValidationUtils", "TimeUtils"):
+            setattr(utils, attr, type(attr, (), {}))
+        monkeypatch.setitem(sys.modules, "modules.utils", utils)
+
+
+@pytest.fixture
+def full_auto(tmp_path, monkeypatch):
+    shutil.copytree(os.path.join(ROOT, "data"), tmp_path / "data",
+                    ignore=shutil.ignore_patterns("ready_queue", "posting_ledger.jsonl", "llm_cache.db*"))
+    monkeypatch.chdir(tmp_path)
+    _install_post_stubs(monkeypatch)
+    FakeNotePoster.posted = []
+
+    module = importlib.import_module("full_auto_post")
+    monkeypatch.setattr(module, "print_step", print)
+
+    from modules.contents.content_generator import ContentGenerator
+    edits = itertools.count(1)
+
+    def fake_improve(self, title, content, improvement_type="comprehensive"):
+        n = next(edits)
+        words = [WORDS[(n * 7 + i * (n + 3)) % len(WORDS)] for i in range(40)]
+        final_content = f"第{n}回の記録です。\n\n" + "、".join(words) + f"。\n\n{n * 97531}"
+        return {"final_content": final_content, "editor": "Fake", "usage": {}}
+
+    monkeypatch.setattr(ContentGenerator, "improve_with_fallback", fake_improve)
+    return module
+
+
+def test_full_auto_posts_more_than_two_cycles(full_auto):
+    """定型文のテンプレートの下書きが重複しても、校閲後の本文が新しければ投稿し続けられる"""
+    with open("data/articles.json", encoding="utf-8") as f:
+        initial_count = len(json.load(f)["articles"])
+
+    cycles = 4
+    for _ in range(cycles):
+        assert full_auto.auto_generate_and_post(use_ready_queue=False)
+
+    assert len(FakeNotePoster.posted) == cycles
+    with open("data/articles.json", encoding="utf-8") as f:
+        articles = json.load(f)["articles"]
+    assert len(articles) == initial_count + cycles
+    # テンプレートの下書きは重複判定用に保存しない
+    assert not any(article.get("source_hash") for article in articles[initial_count:])
+
+
+def test_full_auto_skips_duplicate_final_body(full_auto, monkeypatch):
+    """校閲後の本文が保存済みの記事と同じなら投稿しない"""
+    from modules.contents.content_generator import ContentGenerator
+    monkeypatch.setattr(ContentGenerator, "improve_with_fallback",
+                        lambda self, title, content, improvement_type="comprehensive":
+                        {"final_content": "毎回同じ本文です。", "editor": "Fake", "usage": {}})
+
+    assert full_auto.auto_generate_and_post(use_ready_queue=False)
+    assert not full_auto.auto_generate_and_post(use_ready_queue=False)
+    assert len(FakeNotePoster.posted) == 1
+
+
+def test_full_auto_skips_similar_final_body(full_auto, monkeypatch):
+    """校閲後の本文が保存済みの記事とほぼ同じなら投稿しない"""
+    from modules.contents.content_generator import ContentGenerator
+    body = "、".join(WORDS * 3) + "。"
+    bodies = iter([body + "\n\n1回目", body + "\n\n2回目"])
+    monkeypatch.setattr(ContentGenerator, "improve_with_fallback",
+                        lambda self, title, content, improvement_type="comprehensive":
+                        {"final_content": next(bodies), "editor": "Fake", "usage": {}})
+
+    assert full_auto.auto_generate_and_post(use_ready_queue=False)
+    assert not full_auto.auto_generate_and_post(use_ready_queue=False)
+    assert len(FakeNotePoster.posted) == 1
+
+
+def test_full_auto_drops_duplicate_ready_queue_item(full_auto):
+    """準備済み記事キューから取り出した記事が保存済みの記事と重複していれば、破棄して別の記事を投稿する"""
+    from modules.contents.ready_queue import ReadyQueue
+    with open("data/articles.json", encoding="utf-8") as f:
+        posted_content = json.load(f)["articles"][0]["content"]
+    queue = ReadyQueue()
+    queue.put({"title": "投稿済みの記事", "content": posted_content, "source_content": None,
+               "stages": {}, "usage": {}, "revisions": {}})
+
+    assert full_auto.auto_generate_and_post(use_ready_queue=True, queue_size=1)
+
+    assert len(FakeNotePoster.posted) == 1
+    assert FakeNotePoster.posted[0]["content"] != posted_content
+    assert not os.listdir(queue.claimed_dir)
+    assert all(item["content"] != posted_content for item in queue.items())
+
+
+def test_pipeline_posts_each_body_once(full_auto, monkeypatch):
+    """並行して用意した記事の本文が同じになっても、二重に投稿しない"""
+    from modules.contents.content_generator import ContentGenerator
+    monkeypatch.setattr(ContentGenerator, "improve_with_fallback",
+                        lambda self, title, content, improvement_type="comprehensive":
+                        {"final_content": "どのワーカーでも同じ本文です。", "editor": "Fake", "usage": {}})
+
+    assert not full_auto.auto_generate_and_post_many(4, generate_workers=2, edit_workers=2, buffer_size=2)
+    assert len(FakeNotePoster.posted) == 1
+
+
+def test_pipeline_posts_distinct_bodies(full_auto):
+    """本文が異なれば全ての記事を投稿する"""
+    assert full_auto.auto_generate_and_post_many(4, generate_workers=2, edit_workers=2, buffer_size=2)
+    assert len(FakeNotePoster.posted) == 4
+
+
+def test_full_auto_does_not_read_llm_cache(full_auto, monkeypatch):
+    """完全自動投稿の校閲はワーカースレッドでもLLM応答キャッシュを読まない（--use-llm-cache を指定した場合のみ読む）"""
+    from modules.contents.content_generator import ContentGenerator
+    from modules.contents.llm_cache import is_cache_bypassed
+    bypassed = []
+    improve = ContentGenerator.improve_with_fallback
+
+    def recording_improve(self, title, content, improvement_type="comprehensive"):
+        bypassed.append(is_cache_bypassed())
+        return improve(self, title, content, improvement_type)
+
+    monkeypatch.setattr(ContentGenerator, "improve_with_fallback", recording_improve)
+
+    assert full_auto.auto_generate_and_post(use_ready_queue=False)
+    assert full_auto.auto_generate_and_post_many(2, generate_workers=2, edit_workers=2)
+    assert bypassed == [True, True, True]
+
+    assert full_auto.auto_generate_and_post(use_ready_queue=False, use_llm_cache=True)
+    assert bypassed[-1] is False